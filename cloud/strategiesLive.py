@@ -1,5 +1,6 @@
 # strategies.py
 import pandas as pd
+import numpy as np
 def eth_strategy(df):
     """
     Ethereum strategy focused on trend following with multiple confirmations.
@@ -463,15 +464,20 @@ def calculate_adx(df, period=14):
     return adx
 
 def calculate_obv(df):
-    obv = pd.Series(index=df.index)
-    obv.iloc[0] = 0
-    
-    for i in range(1, len(df)):
-        if df['close'].iloc[i] > df['close'].iloc[i-1]:
-            obv.iloc[i] = obv.iloc[i-1] + df['volume'].iloc[i]
-        elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-            obv.iloc[i] = obv.iloc[i-1] - df['volume'].iloc[i]
-        else:
-            obv.iloc[i] = obv.iloc[i-1]
-    
-    return obv
+    """
+    On-balance volume, vectorised with NumPy.
+    Starts at 0 on the first candle; each later candle adds its volume on an
+    up-close, subtracts it on a down-close and carries over on an unchanged close.
+    """
+    close = df['close'].to_numpy(dtype=float)
+    volume = df['volume'].to_numpy(dtype=float)
+    if len(close) == 0:
+        return pd.Series(index=df.index, dtype=float)
+
+    # NaN closes compare False and count as unchanged, as in the old loop
+    step = np.where(close[1:] > close[:-1], volume[1:],
+                    np.where(close[1:] < close[:-1], -volume[1:], 0.0))
+    obv = np.empty(len(close))
+    obv[0] = 0
+    np.cumsum(step, out=obv[1:])
+    return pd.Series(obv, index=df.index)
@@ -1,9 +1,15 @@
 import os
+import sys
 import logging
 import pandas as pd
 from datetime import datetime
 import yaml
 from binance.client import Client
+
+# The trade simulation core lives in the main src/ tree
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+from backtest_core import simulate_trades
+
 # === Configuration ===
 # Load config from yaml
 config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
@@ -389,24 +395,9 @@ def run_backtest(coin, strategy_fn):
     df = fetch_data(symbol, interval, start_date, end_date)
     buy, sell = strategy_fn(df)
 
-    capital = 10000
-    trades = []
-    in_position = False
-    entry_price = 0
-
-    for i in range(len(df)):
-        if buy[i] and not in_position:
-            entry_price = buy[i]
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'buy', 'price': entry_price, 'profit': 0})
-            in_position = True
-        elif sell[i] and in_position:
-            exit_price = sell[i]
-            profit = (exit_price - entry_price) * (capital / entry_price)
-            capital += profit
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'sell', 'price': exit_price, 'profit': profit})
-            in_position = False
-
-    trades_df = pd.DataFrame(trades)
+    sim = simulate_trades(buy, sell, initial_capital=10000, close=df['close'].to_numpy())
+    capital = sim.final_capital
+    trades_df = sim.trades_frame(df['timestamp'])
     trades_df.to_csv(os.path.join(output_dir, f"{coin}_after_tariff_inbetween_trades.csv"), index=False)
 
     if trades_df.empty:
@@ -1,4 +1,5 @@
 import os
+import sys
 import logging
 import pandas as pd
 from datetime import datetime
@@ -6,6 +7,10 @@ import yaml
 from binance.client import Client
 import numpy as np
 
+# The trade simulation core lives in the main src/ tree
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src'))
+from backtest_core import simulate_trades
+
 # === Configuration ===
 # Load config from yaml
 config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
@@ -270,27 +275,6 @@ def doge_breakout_strategy(data, lookback=5, take_profit_pct=0.05, stop_loss_pct
     return buy_signals, sell_signals
 
 
-def calculate_average_volume(data, current_index, lookback_period):
-    """
-    Calculate average volume over a lookback period
-    
-    Args:
-        data (pandas.DataFrame): DataFrame with OHLCV data
-        current_index (int): Current index position
-        lookback_period (int): Number of periods to look back
-        
-    Returns:
-        float: Average volume
-    """
-    sum_volume = 0
-    start_index = max(0, current_index - lookback_period)
-    
-    for i in range(start_index, current_index):
-        sum_volume += data.iloc[i]['volume']
-    
-    return sum_volume / (current_index - start_index)
-
-
 # Enhanced version with trailing stop logic
 def doge_advanced_breakout_strategy(data, lookback=5, take_profit_pct=0.05, initial_stop_loss_pct=0.03, max_hold_periods=48):
     """
@@ -481,6 +465,9 @@ def link_vwma_strategy(data, short_period=20, long_period=50, stop_loss=0.05):
     # Calculate Volume-Weighted Moving Averages
     vwma_short = calculate_vwma(data, short_period)
     vwma_long = calculate_vwma(data, long_period)
+    avg_volume = calculate_average_volumes(data, 5)
+    close = data['close'].to_numpy(dtype=float)
+    volume = data['volume'].to_numpy(dtype=float)
     
     position = 0  # 0 = no position, 1 = long
     entry_price = 0
@@ -491,13 +478,13 @@ def link_vwma_strategy(data, short_period=20, long_period=50, stop_loss=0.05):
     
     # Strategy Implementation
     for i in range(long_period, len(data)):
-        current_price = data.iloc[i]['close']
+        current_price = close[i]
         
         # Buy signal: Short VWMA crosses above Long VWMA with volume confirmation
         if (vwma_short[i-1] <= vwma_long[i-1] and 
             vwma_short[i] > vwma_long[i] and 
             position == 0 and
-            data.iloc[i]['volume'] > calculate_average_volume(data, i, 5)):
+            volume[i] > avg_volume[i]):
             
             position = 1
             entry_price = current_price
@@ -518,7 +505,7 @@ def link_vwma_strategy(data, short_period=20, long_period=50, stop_loss=0.05):
     
     # Close any open position at the end
     if position == 1:
-        sell_signals[-1] = data.iloc[-1]['close']
+        sell_signals[-1] = close[-1]
     
     return buy_signals, sell_signals
 
@@ -539,6 +526,9 @@ def doge_rsi_strategy(data, rsi_period=14, buy_threshold=30, sell_threshold=70,
     """
     # Calculate RSI
     rsi = calculate_rsi(data, rsi_period)
+    avg_volume = calculate_average_volumes(data, 5)
+    close = data['close'].to_numpy(dtype=float)
+    volume = data['volume'].to_numpy(dtype=float)
     
     position = 0  # 0 = no position, 1 = long
     entry_price = 0
@@ -549,13 +539,13 @@ def doge_rsi_strategy(data, rsi_period=14, buy_threshold=30, sell_threshold=70,
     
     # Strategy Implementation
     for i in range(rsi_period + 1, len(data)):
-        current_price = data.iloc[i]['close']
+        current_price = close[i]
         
         # Buy signal: RSI crosses above oversold threshold with volume confirmation
         if (rsi[i-1] <= buy_threshold and 
             rsi[i] > buy_threshold and 
             position == 0 and
-            data.iloc[i]['volume'] > calculate_average_volume(data, i, 5)):
+            volume[i] > avg_volume[i]):
             
             position = 1
             entry_price = current_price
@@ -576,12 +566,21 @@ def doge_rsi_strategy(data, rsi_period=14, buy_threshold=30, sell_threshold=70,
     
     # Close any open position at the end
     if position == 1:
-        sell_signals[-1] = data.iloc[-1]['close']
+        sell_signals[-1] = close[-1]
     
     return buy_signals, sell_signals
 
 
 # Helper Functions
+def _rolling_sum(values, window):
+    """
+    Sum of every trailing window of a NumPy array in O(n) using a cumulative sum.
+    Entry k covers values[k:k + window], so the result has len(values) - window + 1 entries.
+    """
+    csum = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+    return csum[window:] - csum[:-window]
+
+
 def calculate_vwma(data, period):
     """
     Calculate Volume-Weighted Moving Average
@@ -593,23 +592,14 @@ def calculate_vwma(data, period):
     Returns:
         list: List of VWMA values with None for the first period-1 entries
     """
-    vwma = []
+    close = data['close'].to_numpy(dtype=float)
+    volume = data['volume'].to_numpy(dtype=float)
+    vwma = [None] * len(data)
     
-    for i in range(len(data)):
-        if i < period - 1:
-            vwma.append(None)
-        else:
-            sum_price_volume = 0
-            sum_volume = 0
-            
-            for j in range(period):
-                price = data.iloc[i-j]['close']
-                volume = data.iloc[i-j]['volume']
-                
-                sum_price_volume += price * volume
-                sum_volume += volume
-            
-            vwma.append(sum_price_volume / sum_volume)
+    if len(data) >= period:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = _rolling_sum(close * volume, period) / _rolling_sum(volume, period)
+        vwma[period - 1:] = values.tolist()
     
     return vwma
 
@@ -625,36 +615,23 @@ def calculate_rsi(data, period=14):
     Returns:
         list: List of RSI values with None for the first period entries
     """
-    rsi = []
-    changes = []
-    
-    # Calculate price changes
-    for i in range(1, len(data)):
-        changes.append(data.iloc[i]['close'] - data.iloc[i-1]['close'])
-    
-    # Calculate RSI
-    for i in range(len(data)):
-        if i < period:
-            rsi.append(None)
-        else:
-            gains = 0
-            losses = 0
-            
-            for j in range(period):
-                change = changes[i - period + j]
-                if change > 0:
-                    gains += change
-                else:
-                    losses -= change
-            
-            avg_gain = gains / period
-            avg_loss = losses / period
-            
-            if avg_loss == 0:
-                rsi.append(100)
-            else:
-                rs = avg_gain / avg_loss
-                rsi.append(100 - (100 / (1 + rs)))
+    close = data['close'].to_numpy(dtype=float)
+    rsi = [None] * len(data)
+    
+    if len(data) > period:
+        # Price changes; RSI at index i uses the `period` changes ending at i
+        changes = np.diff(close)
+        gains = _rolling_sum(np.where(changes > 0, changes, 0.0), period) / period
+        losses = _rolling_sum(np.where(changes < 0, -changes, 0.0), period) / period
+        
+        # Count down-moves exactly so a window without losses gives 100 rather
+        # than a value computed from a cumulative-sum rounding residue
+        has_loss = _rolling_sum(changes < 0, period) > 0
+        has_gain = _rolling_sum(changes > 0, period) > 0
+        gains = np.where(has_gain, gains, 0.0)
+        rs = gains / np.where(has_loss, losses, 1.0)
+        values = np.where(has_loss, 100 - (100 / (1 + rs)), 100.0)
+        rsi[period:] = values.tolist()
     
     return rsi
 
@@ -671,13 +648,29 @@ def calculate_average_volume(data, current_index, lookback_period):
     Returns:
         float: Average volume
     """
-    sum_volume = 0
     start_index = max(0, current_index - lookback_period)
+    volume = data['volume'].to_numpy(dtype=float)
+    return volume[start_index:current_index].sum() / (current_index - start_index)
+
+
+def calculate_average_volumes(data, lookback_period):
+    """
+    Average volume over the lookback period before every index, in one pass
     
-    for i in range(start_index, current_index):
-        sum_volume += data.iloc[i]['volume']
-    
-    return sum_volume / (current_index - start_index)
+    Args:
+        data (pandas.DataFrame): DataFrame with OHLCV data
+        lookback_period (int): Number of periods to look back
+        
+    Returns:
+        numpy.ndarray: Entry i equals calculate_average_volume(data, i, lookback_period)
+        (NaN at index 0, where there is no history)
+    """
+    volume = data['volume'].to_numpy(dtype=float)
+    csum = np.concatenate(([0.0], np.cumsum(volume)))
+    index = np.arange(len(volume))
+    start = np.maximum(0, index - lookback_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (csum[index] - csum[start]) / (index - start)
 
 
 # Example usage:
@@ -887,24 +880,9 @@ def run_backtest(coin, strategy_fn):
     df = fetch_data(symbol, interval, start_date, end_date)
     buy, sell = strategy_fn(df)
 
-    capital = 10000
-    trades = []
-    in_position = False
-    entry_price = 0
-
-    for i in range(len(df)):
-        if buy[i] and not in_position:
-            entry_price = buy[i]
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'buy', 'price': entry_price, 'profit': 0})
-            in_position = True
-        elif sell[i] and in_position:
-            exit_price = sell[i]
-            profit = (exit_price - entry_price) * (capital / entry_price)
-            capital += profit
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'sell', 'price': exit_price, 'profit': profit})
-            in_position = False
-
-    trades_df = pd.DataFrame(trades)
+    sim = simulate_trades(buy, sell, initial_capital=10000, close=df['close'].to_numpy())
+    capital = sim.final_capital
+    trades_df = sim.trades_frame(df['timestamp'])
     trades_df.to_csv(os.path.join(output_dir, f"{coin}_noupdate_tariff_trades.csv"), index=False)
 
     if trades_df.empty:
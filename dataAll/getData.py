@@ -1,11 +1,15 @@
 import pandas as pd
 import numpy as np
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import time
 import os
+import sys
 import yaml
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from kline_store import KlineStore
+
 # Load config file
 config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
 with open(config_path, 'r') as f:
@@ -16,89 +20,79 @@ data_dir = "crypto_data"  # Set default data directory
 if not os.path.exists(data_dir):
     os.makedirs(data_dir)
 
+class BinanceRestKlines:
+    """
+    Minimal Binance REST kline client for the kline store.
+
+    Pages through /api/v3/klines 1000 candles at a time. Kline requests only
+    cost a couple of weight units, so instead of sleeping between pages it
+    backs off only when Binance actually rate limits (HTTP 429/418).
+    """
+    url = 'https://api.binance.com/api/v3/klines'
+
+    def __init__(self):
+        self.session = requests.Session()
+
+    def get_historical_klines(self, symbol, interval, start_ts, end_ts):
+        all_klines = []
+
+        # Binance API limit is 1000 candles per request
+        while start_ts <= end_ts:
+            params = {
+                'symbol': symbol,
+                'interval': interval,
+                'startTime': start_ts,
+                'endTime': end_ts,
+                'limit': 1000
+            }
+
+            try:
+                response = self.session.get(self.url, params=params)
+                if response.status_code in (418, 429):
+                    wait = int(response.headers.get('Retry-After', 60))
+                    print(f"Rate limited by Binance, waiting {wait}s")
+                    time.sleep(wait)
+                    continue
+                response.raise_for_status()  # Raise exception for bad status codes
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                print(f"Error making request: {e}")
+                time.sleep(5)  # Wait before retrying
+                continue
+
+            if not data:
+                break
+
+            all_klines.extend(data)
+
+            # Update start_ts for the next request
+            start_ts = data[-1][0] + 1
+
+        return all_klines
+
+
+store = KlineStore(client=BinanceRestKlines())
+
 def get_historical_klines(symbol, interval, start_date, end_date=None):
     """
     Get historical klines (candlestick data) for a specific symbol and time interval.
+    Candles come from the local kline store; only ranges not stored yet are downloaded.
     
     Parameters:
     - symbol (str): Trading pair symbol (e.g., 'ETHUSDT')
     - interval (str): Kline interval (e.g., '1h', '4h', '1d')
-    - start_date (str): Start date in 'YYYY-MM-DD' format
-    - end_date (str): End date in 'YYYY-MM-DD' format (optional)
+    - start_date (str): Start date in 'YYYY-MM-DD' format (UTC)
+    - end_date (str): End date in 'YYYY-MM-DD' format (UTC, optional)
     
     Returns:
     - pandas.DataFrame: OHLCV data
     """
-    # Convert date strings to timestamps
-    start_ts = int(datetime.strptime(start_date, '%Y-%m-%d').timestamp() * 1000)
-    
-    if end_date:
-        end_ts = int(datetime.strptime(end_date, '%Y-%m-%d').timestamp() * 1000)
-    else:
-        end_ts = int(datetime.now().timestamp() * 1000)
-    
-    url = 'https://api.binance.com/api/v3/klines'
-    
-    # Initialize an empty list to store all klines
-    all_klines = []
-    
-    # Binance API limit is 1000 candles per request
-    # We need to make multiple requests for long time ranges
-    while start_ts < end_ts:
-        params = {
-            'symbol': symbol,
-            'interval': interval,
-            'startTime': start_ts,
-            'endTime': end_ts,
-            'limit': 1000
-        }
-        
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()  # Raise exception for bad status codes
-            data = response.json()
-            
-            if not data:
-                break
-            
-            all_klines.extend(data)
-            
-            # Update start_ts for the next request
-            start_ts = data[-1][0] + 1
-            
-            # To avoid hitting rate limits
-            time.sleep(1)  # Increased delay to avoid rate limiting
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Error making request: {e}")
-            time.sleep(5)  # Wait longer on error before retrying
-            continue
-    
-    if not all_klines:
+    ohlcv_df = store.load(symbol, interval, start_date, end_date or datetime.now(timezone.utc))
+
+    if ohlcv_df.empty:
         raise ValueError(f"No data retrieved for {symbol}")
-        
-    # Convert to DataFrame
-    columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 
-               'close_time', 'quote_asset_volume', 'number_of_trades',
-               'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore']
-    
-    df = pd.DataFrame(all_klines, columns=columns)
-    
-    # Convert timestamp to datetime
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    
-    # Convert numeric columns to appropriate types
-    numeric_cols = ['open', 'high', 'low', 'close', 'volume', 
-                    'quote_asset_volume', 'taker_buy_base_asset_volume', 
-                    'taker_buy_quote_asset_volume']
-    
-    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric)
-    
-    # Select only OHLCV columns
-    ohlcv_df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-    ohlcv_df = ohlcv_df.rename(columns={'timestamp': 'date'})
-    
-    return ohlcv_df
+
+    return ohlcv_df.rename(columns={'timestamp': 'date'})
 
 def fetch_and_save(coin, timeframe, start_date, end_date, description=""):
     """
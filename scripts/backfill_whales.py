@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Whale Alert backfill
+Crawls the last N days of Whale Alert transactions into the whale store
+(data/whales), a day at a time, as whaleTest.py did. Days already stored
+by an earlier run are skipped, so an interrupted crawl (rate limit,
+network error, Ctrl-C) picks up where it stopped when run again. Prints
+per-coin statistics and the current exchange flows from the store.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+import yaml
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from whale_poller import WhaleAlertPoller, DEFAULT_API_URL
+from whale_store import WhaleStore, DEFAULT_ROOT, DAY, backfill
+
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'))
+SUPPORTED_COINS = ['ETH', 'LINK', 'DOGE', 'ARB']
+
+
+async def run(args, whale_config):
+    store = WhaleStore(args.root)
+    poller = WhaleAlertPoller(whale_config['api_key'], min_value=args.min_value, symbols=SUPPORTED_COINS,
+                              api_url=whale_config.get('api_url', DEFAULT_API_URL))
+    end = int(time.time())
+    start = end - args.days * DAY
+    missing = store.missing_ranges(start, end)
+    print(f"🔍 Backfilling {args.days} days (min value ${args.min_value:,}): "
+          f"{sum(hi - lo for lo, hi in missing) / DAY:.1f} days not stored yet")
+    try:
+        report = await backfill(store, poller, start, end, pause=args.pause)
+    finally:
+        await poller.close()
+    print(f"📡 {poller.requests} API calls, {report['ranges']} days stored, "
+          f"{report['added']} new transactions{'' if report['complete'] else ' (incomplete, run again to resume)'}")
+
+    print("\n📈 Statistics by Coin:")
+    for coin in SUPPORTED_COINS:
+        records = store.load(coin, start, end)
+        if not len(records):
+            print(f"  • {coin}: no transactions")
+            continue
+        usd = records['amount_usd']
+        print(f"  • {coin}: {len(records)} transactions")
+        print(f"    - Total Value: ${usd.sum():,.2f}")
+        print(f"    - Average Value: ${usd.mean():,.2f}")
+        print(f"    - Max Value: ${usd.max():,.2f}")
+        flows = store.flows(coin)
+        print("    - Exchange flows: " + ", ".join(
+            f"{name} in ${f['inflow']:,.0f} / out ${f['outflow']:,.0f}" for name, f in flows.items()))
+    return report['complete']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill Whale Alert history into the whale store")
+    parser.add_argument('--days', type=int, default=10, help='Days back from now to cover')
+    parser.add_argument('--min-value', type=int, default=750000, help='Smallest transaction (USD)')
+    parser.add_argument('--pause', type=float, default=1.0, help='Seconds between days')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='Store folder')
+    parser.add_argument('--config', default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        whale_config = (yaml.safe_load(f) or {}).get('whaleAlert', {})
+    if not whale_config.get('api_key'):
+        print("❌ whaleAlert.api_key not found in config")
+        sys.exit(1)
+    sys.exit(0 if asyncio.run(run(args, whale_config)) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+OBV benchmark for the live strategies
+Checks the vectorised calculate_obv and the incremental indicators.OBV
+against the original per-row loop, then times them at several frame sizes
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from strategiesLive import calculate_obv
+from indicators import OBV
+
+
+def legacy_obv(df):
+    """The original per-row implementation, kept as the golden reference"""
+    obv = pd.Series(index=df.index, dtype=float)
+    obv.iloc[0] = 0
+
+    for i in range(1, len(df)):
+        if df['close'].iloc[i] > df['close'].iloc[i-1]:
+            obv.iloc[i] = obv.iloc[i-1] + df['volume'].iloc[i]
+        elif df['close'].iloc[i] < df['close'].iloc[i-1]:
+            obv.iloc[i] = obv.iloc[i-1] - df['volume'].iloc[i]
+        else:
+            obv.iloc[i] = obv.iloc[i-1]
+
+    return obv
+
+
+def incremental_obv(df):
+    obv = OBV()
+    return pd.Series([obv.update(c, v) for c, v in zip(df['close'], df['volume'])], index=df.index)
+
+
+def make_frame(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    # Round prices so unchanged closes (the "carry over" branch) actually occur
+    close = np.round(100 + np.cumsum(rng.normal(0, 0.5, rows)), 1)
+    volume = rng.uniform(1, 1000, rows)
+    return pd.DataFrame({'close': close, 'volume': volume})
+
+
+def timed(fn, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OBV implementations")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10_000, 1_000_000],
+                        help='Frame sizes to benchmark')
+    parser.add_argument('--legacy-max', type=int, default=10_000,
+                        help='Largest frame to run the slow legacy loop on (it takes minutes at 1M rows)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy':>12} {'vectorised':>12} {'incremental':>12} {'speedup':>10}")
+    for rows in args.sizes:
+        df = make_frame(rows)
+        repeat = 5 if rows <= 10_000 else 1
+
+        vec_time, vec = timed(calculate_obv, df, repeat)
+        inc_time, inc = timed(incremental_obv, df, 1)
+        assert np.array_equal(vec.to_numpy(), inc.to_numpy()), "incremental OBV differs from vectorised OBV"
+
+        if rows <= args.legacy_max:
+            legacy_time, legacy = timed(legacy_obv, df, 1 if rows > 1000 else repeat)
+            assert np.array_equal(vec.to_numpy(), legacy.to_numpy()), "vectorised OBV differs from legacy OBV"
+            legacy_str = f"{legacy_time * 1000:10.2f}ms"
+            speedup = f"{legacy_time / vec_time:9.0f}x"
+        else:
+            legacy_str = f"{'skipped':>12}"
+            speedup = f"{'-':>10}"
+
+        print(f"{rows:>10} {legacy_str} {vec_time * 1000:10.2f}ms {inc_time * 1000:10.2f}ms {speedup}")
+
+    print("✅ All implementations agree")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Live bot startup benchmark
+Measures what a container restart pays before the first tick:
+
+1. `python -X importtime -c "import live_trading_manager"`: total import
+   time, the slowest modules, and whether any module that should load
+   lazily (charting, sentiment, NLP, pandas) was imported.
+2. Cold start to first kline fetch: a fresh interpreter imports
+   live_trading_manager and starts the ETH pair, as `python
+   live_trading_manager.py` does. The time until its REST backfill reaches
+   a local klines stub is reported. The config points market data at the
+   stub, so nothing goes to Binance.
+
+Exits non-zero if a lazy module was imported at startup or a budget was exceeded
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LIVE_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+# Must not be imported by the trading process at startup
+LAZY_MODULES = ['matplotlib', 'pandas', 'praw', 'nltk', 'reddit_sentiment', 'telegram']
+
+# Child process: the live manager's startup with config.yaml swapped for the test config
+CHILD = """
+import sys
+import config_service
+config_service.config_service.path = sys.argv[1]
+import live_trading_manager
+live_trading_manager.start_bot('eth')
+live_trading_manager.scheduler.join()
+"""
+
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():  # skips the header line
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def import_profile(python):
+    result = subprocess.run([python, '-X', 'importtime', '-c', 'import live_trading_manager'],
+                            cwd=LIVE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import live_trading_manager failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def klines_stub(first_request):
+    """HTTP server answering /api/v3/klines with closed 15m candles; records when the first request lands"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if not first_request.is_set():
+                first_request.at = time.perf_counter()
+                first_request.set()
+            step = 900_000
+            start = (int(time.time() * 1000) // step - 300) * step
+            body = json.dumps([[start + i * step, "100", "101", "99", "100", "10", start + (i + 1) * step - 1]
+                               for i in range(300)]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the timed process was already stopped
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def cold_start(python, timeout):
+    first_request = threading.Event()
+    server = klines_stub(first_request)
+    url = f"http://127.0.0.1:{server.server_port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, 'config.yaml')
+        with open(config, 'w') as f:
+            json.dump({  # JSON is valid YAML
+                'trading': {'mode': 'test'},
+                'binance': {'api_key': 'benchmark', 'secret_key': 'benchmark'},
+                'market_data': {'rest_url': url, 'ws_url': url.replace('http', 'ws')},
+                'alerts': {'telegram': {'enabled': False}},
+                'eth_bot': {'enabled': True},
+            }, f)
+
+        started = time.perf_counter()
+        child = subprocess.Popen([python, '-c', CHILD, config], cwd=LIVE_DIR,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        try:
+            if not first_request.wait(timeout):
+                child.kill()
+                sys.exit(f"no kline request within {timeout}s:\n{child.communicate()[1][-2000:]}")
+            return first_request.at - started
+        finally:
+            child.kill()
+            child.wait()
+            server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure live bot import time and cold start to first kline fetch")
+    parser.add_argument('--runs', type=int, default=3, help='Cold starts to time (the best is reported)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest modules to list')
+    parser.add_argument('--import-budget-ms', type=float, help='Fail if importing live_trading_manager takes longer')
+    parser.add_argument('--start-budget-ms', type=float, help='Fail if the first kline fetch comes later')
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+    python = sys.executable
+
+    modules = import_profile(python)
+    total_ms = modules.get('live_trading_manager', 0) / 1000
+    print(f"import live_trading_manager: {total_ms:.0f} ms")
+    for name, cumulative in sorted(modules.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = sorted({name.split('.')[0] for name in modules} & set(LAZY_MODULES))
+    print(f"Lazy modules imported at startup: {', '.join(loaded) or 'none'}")
+
+    times = [cold_start(python, args.timeout) for _ in range(args.runs)]
+    start_ms = min(times) * 1000
+    print(f"Cold start to first kline fetch: {start_ms:.0f} ms "
+          f"(best of {args.runs}; all: {', '.join(f'{t * 1000:.0f}' for t in times)} ms)")
+
+    failed = bool(loaded)
+    if args.import_budget_ms is not None and total_ms > args.import_budget_ms:
+        print(f"❌ import time over budget ({args.import_budget_ms:.0f} ms)")
+        failed = True
+    if args.start_budget_ms is not None and start_ms > args.start_budget_ms:
+        print(f"❌ cold start over budget ({args.start_budget_ms:.0f} ms)")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Telegram alert latency check
+Runs a local stub of Telegram's sendMessage that answers slowly (and can
+answer 429 now and then), then compares how long the caller is blocked by
+the old inline requests.post against AlertDispatcher.enqueue, and checks
+that every alert still reaches the stub. One alert has Markdown that the
+stub rejects with a 400, as Telegram does, and must not take the alerts
+coalesced with it down too.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from alert_dispatcher import AlertDispatcher
+
+
+class TelegramStub(BaseHTTPRequestHandler):
+    delay = 0.5
+    rate_limit_ratio = 0.0
+    received = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(self.delay)
+        if random.random() < self.rate_limit_ratio:
+            self._reply(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 1}})
+            return
+        if body.get('parse_mode') == 'Markdown' and body['text'].count('_') % 2:
+            self._reply(400, {"ok": False, "error_code": 400,
+                              "description": "Bad Request: can't parse entities"})
+            return
+        TelegramStub.received.append(body['text'])
+        self._reply(200, {"ok": True})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubConfig:
+    def __init__(self, api_url):
+        self.snapshot = {"alerts": {"telegram": {"enabled": True, "token": "TEST", "chat_id": "1", "api_url": api_url}}}
+
+    def current(self):
+        return self.snapshot
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare blocking vs queued Telegram alerts against a slow stub")
+    parser.add_argument('--delay', type=float, default=0.5, help='Stub response time in seconds')
+    parser.add_argument('--alerts', type=int, default=20)
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.1, help='Share of requests answered with 429')
+    args = parser.parse_args()
+
+    TelegramStub.delay = args.delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TelegramStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}"
+
+    # Old behaviour: the trading thread waits for Telegram
+    blocking = []
+    for i in range(3):
+        start = time.perf_counter()
+        requests.post(f"{api_url}/botTEST/sendMessage", json={"chat_id": "1", "text": f"inline {i}"})
+        blocking.append(time.perf_counter() - start)
+    TelegramStub.received.clear()
+
+    # New behaviour: enqueue and return
+    TelegramStub.rate_limit_ratio = args.rate_limit_ratio
+    dispatcher = AlertDispatcher(config=StubConfig(api_url), coalesce_window=0.2, min_interval=0.1)
+    queued = []
+    expected = [f"alert {i}" if i != args.alerts // 2 else "alert with a stray _ marker" for i in range(args.alerts)]
+    for text in expected:
+        start = time.perf_counter()
+        dispatcher.enqueue(text)
+        queued.append(time.perf_counter() - start)
+        time.sleep(random.uniform(0, 0.1))  # bursts of trades across bots
+
+    assert dispatcher.drain(timeout=60), "alerts still queued after 60s"
+    delivered = [line for text in TelegramStub.received for line in text.split("\n\n")]
+    assert sorted(delivered) == sorted(expected), "some alerts were lost"
+    server.shutdown()
+
+    print(f"Inline post:  mean {sum(blocking) / len(blocking) * 1000:8.1f} ms blocked per alert")
+    print(f"Queued alert: p99  {percentile(queued, 0.99) * 1e6:8.1f} µs blocked per alert")
+    print(f"✅ {args.alerts} alerts delivered in {len(TelegramStub.received)} Telegram messages")
+    assert percentile(queued, 0.99) < 0.01, "enqueue blocked for more than 10ms"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Chart service check
+Renders a sentiment chart and a trade chart from synthetic data, both
+inline (as the handlers used to) and through ChartService. While they
+render, the event loop's lag is measured with a 5 ms ticker. Also checks
+that concurrent requests share one render and that a repeat request is
+served from the cache. With --out DIR the PNGs are written there for a look
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from chart_service import ChartService, render_sentiment_chart, sentiment_chart_args
+
+
+def sentiment_result(days=14):
+    return {
+        'coin': 'ETH',
+        'timestamp': datetime.now(),
+        'sentiment_distribution': {'very_negative': 3, 'negative': 5, 'neutral': 10, 'positive': 7, 'very_positive': 2},
+        'timeline_data': [{'date_str': (datetime.now() - timedelta(days=days - d)).strftime('%Y-%m-%d'),
+                           'weighted_sentiment': (d % 5 - 2) / 4} for d in range(days)],
+    }
+
+
+def write_trades(folder, days=15):
+    with open(os.path.join(folder, 'ETH_after_tariff_trades.csv'), 'w') as f:
+        f.write('timestamp,type,price,profit\n')
+        for d in range(days, 0, -1):
+            day = (datetime.now() - timedelta(days=d)).strftime('%Y-%m-%d')
+            f.write(f"{day} 10:00:00,BUY,100,\n{day} 12:00:00,SELL,{100 + d % 4 - 1},{d % 4 - 1}\n")
+
+
+async def max_lag(coro):
+    """Run coro while a 5 ms ticker measures how late the event loop wakes it"""
+    lags, done = [], asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - started
+    done.set()
+    await task
+    return result, elapsed, max(lags)
+
+
+async def main(out):
+    folder = tempfile.mkdtemp()
+    write_trades(folder)
+    service = ChartService(backup_dir=folder)
+    result = sentiment_result()
+
+    async def inline():
+        return render_sentiment_chart(*sentiment_chart_args(result))
+
+    # Inline first, so the worker's matplotlib import is not counted against the service below
+    _, elapsed, lag = await max_lag(inline())
+    print(f"Inline render:     {elapsed * 1000:6.0f} ms, max loop lag {lag * 1000:6.1f} ms")
+
+    (a, b, trades), elapsed, lag = await max_lag(asyncio.gather(
+        service.sentiment_chart(result), service.sentiment_chart(result), service.trade_chart('ETHUSDT', 30)))
+    print(f"Service (cold):    {elapsed * 1000:6.0f} ms, max loop lag {lag * 1000:6.1f} ms  (worker start + 2 charts)")
+    assert a and a == b and trades, "charts missing"
+    assert service.stats()['renders'] == 2, f"concurrent requests were not shared: {service.stats()}"
+
+    result['timestamp'] = datetime.now()  # new analysis run -> new version
+    _, elapsed, lag = await max_lag(service.sentiment_chart(result))
+    print(f"Service (warm):    {elapsed * 1000:6.0f} ms, max loop lag {lag * 1000:6.1f} ms")
+
+    started = time.perf_counter()
+    cached = await service.sentiment_chart(result)
+    print(f"Service (cached):  {(time.perf_counter() - started) * 1e6:6.0f} µs")
+    assert cached and service.stats()['hits'] == 1, service.stats()
+    print(f"Stats: {service.stats()}")
+
+    if out:
+        os.makedirs(out, exist_ok=True)
+        for name, png in (('sentiment.png', a), ('trades.png', trades)):
+            with open(os.path.join(out, name), 'wb') as f:
+                f.write(png)
+        print(f"PNGs written to {out}")
+    service.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check off-loop chart rendering and its cache")
+    parser.add_argument('--out', help='Folder to write the rendered PNGs to')
+    asyncio.run(main(parser.parse_args().out))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Metrics cache check
+Copies the liveBackup CSVs to a temporary folder and compares what the
+Telegram handlers show (metrics, recent trades, today's summary), read the
+old way with pandas and through MetricsCache. Then trades are appended the
+way the trade journal does, including a half-written line that the cache
+must not show until it is complete. The comparison is repeated to confirm
+that the cache follows the file and reads only the new bytes. Finally it
+times a pandas read against a cached lookup.
+"""
+
+import os
+import sys
+import csv
+import time
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from metrics_cache import MetricsCache, LIVE_BACKUP_DIR
+
+COINS = ['ETH', 'LINK', 'DOGE', 'ARB']
+
+
+# === What the handlers computed with pandas ===
+def pandas_view(folder, coin, tariff, today):
+    metrics_file = os.path.join(folder, f"{coin}_{tariff}_tariff_metrics.csv")
+    trades_file = os.path.join(folder, f"{coin}_{tariff}_tariff_trades.csv")
+    if not os.path.exists(metrics_file) or not os.path.exists(trades_file):
+        return None
+    metrics_df = pd.read_csv(metrics_file)
+    trades_df = pd.read_csv(trades_file)
+    metrics = [f"{metrics_df[c].iloc[0]}" for c in ('total_trades', 'win_rate', 'total_profit', 'final_capital')]
+    trades = []
+    for _, row in trades_df.tail(10).iterrows():
+        profit = row['profit'] if 'profit' in row and not pd.isna(row['profit']) else None
+        trades.append(f"{row['timestamp']} {row['type']} {row['price']:.2f} {profit if profit is None else f'{profit:.2f}'}")
+    trades_df['timestamp'] = pd.to_datetime(trades_df['timestamp'])
+    sells = trades_df[(trades_df['timestamp'].dt.date == today) & (trades_df['type'] == 'SELL')]
+    day = (len(sells[sells['profit'] > 0]), len(sells[sells['profit'] <= 0]), f"{sells['profit'].sum():.2f}")
+    return metrics, trades, day
+
+
+def cache_view(cache, coin, tariff, today):
+    metrics = cache.metrics(coin, tariff)
+    recent = cache.recent_trades(coin, tariff, 10)
+    if metrics is None or recent is None:
+        return None
+    trades = [f"{t.timestamp} {t.type} {t.price:.2f} {t.profit if t.profit is None else f'{t.profit:.2f}'}"
+              for t in recent]
+    day = cache.day(coin, tariff, today)
+    return ([f"{metrics[c]}" for c in ('total_trades', 'win_rate', 'total_profit', 'final_capital')],
+            trades, (day.wins, day.losses, f"{day.pnl:.2f}"))
+
+
+def compare(folder, cache, today, label):
+    mismatches = 0
+    for coin in COINS:
+        for tariff in ('before', 'after'):
+            expected, got = pandas_view(folder, coin, tariff, today), cache_view(cache, coin, tariff, today)
+            if expected != got:
+                mismatches += 1
+                print(f"  {coin} {tariff}: pandas {expected}\n  {' ' * len(coin + tariff)}  cache  {got}")
+    print(f"{label}: {'match' if not mismatches else f'{mismatches} MISMATCHES'}")
+    return mismatches
+
+
+def main():
+    folder = tempfile.mkdtemp()
+    for name in os.listdir(LIVE_BACKUP_DIR):
+        if name.endswith('.csv'):
+            shutil.copy(os.path.join(LIVE_BACKUP_DIR, name), folder)
+    today = datetime.now().date()
+    cache = MetricsCache(backup_dir=folder, check_interval=0)
+    failed = compare(folder, cache, today, "Initial load")
+
+    # Append trades as the journal does: csv.writer rows ending in \r\n
+    trades_file = os.path.join(folder, 'ETH_after_tariff_trades.csv')
+    before = cache.stats()['bytes_read']
+    now = datetime.now()
+    with open(trades_file, 'a', newline='') as f:
+        writer = csv.writer(f)
+        for i in range(6):
+            stamp = (now - timedelta(minutes=60 - i)).strftime('%Y-%m-%d %H:%M:%S')
+            writer.writerow([stamp, 'BUY', 2000 + i, ''] if i % 2 == 0 else [stamp, 'SELL', 2010 + i, 5 - i * 2])
+        f.write(f"{now.strftime('%Y-%m-%d %H:%M:%S')},SE")  # half-written line
+    appended = os.path.getsize(trades_file)
+    # pandas would read the partial line as a row; the cache waits for its newline
+    last = cache.recent_trades('ETH', 'after', 1)[-1]
+    partial_ok = (last.type, last.profit) == ('SELL', -5.0)
+    print(f"Partial line held back: {'yes' if partial_ok else f'NO (last trade {last})'}")
+    failed += not partial_ok
+    with open(trades_file, 'a', newline='') as f:
+        f.write("LL,2100.5,12.25\r\n")
+    failed += compare(folder, cache, today, "After completing the partial line")
+    print(f"Bytes read for the appends: {cache.stats()['bytes_read'] - before} "
+          f"(file is {os.path.getsize(trades_file)} bytes, {appended} before the last write)")
+
+    # A rewrite in place (same inode) must trigger a full reload
+    df = pd.read_csv(trades_file)
+    df.iloc[:-1].to_csv(trades_file, index=False)
+    failed += compare(folder, cache, today, "After rewriting the file")
+
+    # Timing
+    cache = MetricsCache(backup_dir=folder, check_interval=1.0)
+    cache_view(cache, 'ETH', 'after', today)
+    runs = 200
+    started = time.perf_counter()
+    for _ in range(runs):
+        pandas_view(folder, 'ETH', 'after', today)
+    pandas_time = (time.perf_counter() - started) / runs
+    started = time.perf_counter()
+    for _ in range(runs * 50):
+        cache_view(cache, 'ETH', 'after', today)
+    cached_time = (time.perf_counter() - started) / (runs * 50)
+    print(f"pandas read per view: {pandas_time * 1000:.2f} ms; cached lookup: {cached_time * 1e6:.1f} µs")
+    print(f"Stats: {cache.stats()}")
+
+    shutil.rmtree(folder)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
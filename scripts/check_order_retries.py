@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Order retry check for the shared Binance gateway
+Sends market orders through ExchangeGateway to a stub client that fails
+the way Binance can when an order's outcome is unknown:
+  1. the order fills but the response times out
+  2. the order fills but Binance answers 503 ("execution status unknown")
+  3. the request times out before it reaches the matching engine
+and checks that each order is filled exactly once. Without the lookup by
+newClientOrderId the gateway retried 1 and 2 blindly and filled twice.
+"""
+
+import os
+import sys
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+import exchange_gateway
+from exchange_gateway import ExchangeGateway, UNKNOWN_ORDER
+
+
+class StubAPIError(Exception):
+    """Shaped like binance.exceptions.BinanceAPIException"""
+
+    def __init__(self, status_code, code, message):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.status_code = status_code
+        self.code = code
+
+
+class StubClient:
+    """Just enough of binance.client.Client: market orders and get_order by client order id"""
+    failure = None  # 'timeout_after_fill', '503_after_fill' or 'timeout_before_fill', once
+
+    def __init__(self, api_key, secret_key):
+        self.response = None
+        self.orders = {}  # newClientOrderId -> order
+        self.fills = 0
+
+    def order_market_buy(self, **params):
+        failure, StubClient.failure = StubClient.failure, None
+        if failure == 'timeout_before_fill':
+            raise requests.Timeout('read timed out')
+        order_id = params.get('newClientOrderId')
+        if order_id in self.orders:
+            raise StubAPIError(400, -2010, 'Duplicate order sent.')
+        self.fills += 1
+        order = {'symbol': params['symbol'], 'clientOrderId': order_id, 'status': 'FILLED',
+                 'executedQty': str(params['quantity'])}
+        if order_id is not None:
+            self.orders[order_id] = order
+        if failure == 'timeout_after_fill':
+            raise requests.Timeout('read timed out')
+        if failure == '503_after_fill':
+            raise StubAPIError(503, -1000, 'Unknown error, please check your request or try again later.')
+        return order
+
+    def get_order(self, symbol, origClientOrderId):
+        order = self.orders.get(origClientOrderId)
+        if order is None:
+            raise StubAPIError(400, UNKNOWN_ORDER, 'Order does not exist.')
+        return order
+
+
+def main():
+    exchange_gateway.random.uniform = lambda a, b: 0  # no backoff sleeps
+    failed = False
+    for failure in ('timeout_after_fill', '503_after_fill', 'timeout_before_fill'):
+        gateway = ExchangeGateway(client_factory=StubClient)
+        StubClient.failure = failure
+        try:
+            order = gateway.call('order_market_buy', symbol='ETHUSDT', quantity=0.05)
+        except Exception as e:
+            order = None
+            print(f"  {failure}: raised {e}")
+        fills = gateway.client.fills
+        ok = fills == 1 and order is not None and order['status'] == 'FILLED'
+        print(f"{failure:22s} fills {fills}, order returned: {'yes' if order else 'no'}, "
+              f"retries {gateway.retries}: {'ok' if ok else 'FAILED'}")
+        failed |= not ok
+
+    if failed:
+        print("❌ An order was lost or filled twice")
+        sys.exit(1)
+    print("✅ Every order filled exactly once")
+
+
+if __name__ == '__main__':
+    main()
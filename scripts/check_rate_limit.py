@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Rate-limit check for the shared Binance gateway
+Runs a local stub of the Binance REST API that enforces a per-minute
+request-weight limit the way Binance does (X-MBX-USED-WEIGHT-1M header,
+429 with Retry-After once the limit is spent), then hammers it with kline
+fetches from many "symbols" plus a steady trickle of test orders:
+  1. without the gateway, every thread on its own session (the old setup)
+  2. through one ExchangeGateway
+and reports the 429s and how long the orders waited in each run
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from exchange_gateway import ExchangeGateway, WEIGHTS
+
+
+class BinanceStub(BaseHTTPRequestHandler):
+    limit = 600
+    lock = threading.Lock()
+    window = 0
+    used = 0
+    rejected = 0
+
+    def _handle(self):
+        path = urlsplit(self.path).path
+        weight = WEIGHTS['get_klines'] if path == '/api/v3/klines' else WEIGHTS['create_test_order']
+        with BinanceStub.lock:
+            window = int(time.time() // 60)
+            if window != BinanceStub.window:
+                BinanceStub.window, BinanceStub.used = window, 0
+            if BinanceStub.used + weight > BinanceStub.limit:
+                BinanceStub.rejected += 1
+                status, body = 429, {"code": -1003, "msg": "Too many requests"}
+            else:
+                BinanceStub.used += weight
+                status, body = 200, ([] if path == '/api/v3/klines' else {})
+            used = BinanceStub.used
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-MBX-USED-WEIGHT-1M', str(used))
+        if status == 429:
+            self.send_header('Retry-After', str(60 - int(time.time()) % 60))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+class StubClient:
+    """Just enough of binance.client.Client for the gateway"""
+    base_url = None
+
+    def __init__(self, api_key, secret_key):
+        self.session = requests.Session()
+        self.session.headers.update({'X-MBX-APIKEY': api_key or ''})
+        self.response = None
+
+    def create_test_order(self, **params):
+        self.response = self.session.post(f"{self.base_url}/api/v3/order/test", params=params, timeout=10)
+        self.response.raise_for_status()
+        return self.response.json()
+
+
+def run(base_url, duration, symbols, gateway=None):
+    """Kline threads plus one order thread for `duration` seconds; returns order latencies"""
+    stop = threading.Event()
+    latencies = []
+
+    def klines(symbol):
+        session = requests.Session()
+        while not stop.is_set():
+            params = {'symbol': symbol, 'interval': '1m', 'limit': 100}
+            if gateway is not None:
+                try:
+                    gateway.get(f"{base_url}/api/v3/klines", params=params, weight=WEIGHTS['get_klines'])
+                except requests.RequestException:
+                    pass
+            else:
+                session.get(f"{base_url}/api/v3/klines", params=params, timeout=10)
+
+    def orders():
+        client = StubClient(None, None)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                if gateway is not None:
+                    gateway.call('create_test_order', symbol='ETHUSDT', side='BUY', type='MARKET', quantity=0.05)
+                else:
+                    client.create_test_order(symbol='ETHUSDT', side='BUY', type='MARKET', quantity=0.05)
+                latencies.append(time.perf_counter() - start)
+            except requests.RequestException:
+                latencies.append(None)
+            stop.wait(0.5)
+
+    threads = [threading.Thread(target=klines, args=(f"SYM{i}USDT",), daemon=True) for i in range(symbols)]
+    threads.append(threading.Thread(target=orders, daemon=True))
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    return latencies
+
+
+def report(name, latencies):
+    failed = sum(1 for l in latencies if l is None)
+    done = sorted(l for l in latencies if l is not None)
+    worst = f"{done[-1] * 1000:.1f} ms" if done else "-"
+    print(f"{name}: {BinanceStub.rejected:5d} x 429 | orders {len(done)} ok, {failed} rejected, slowest {worst}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-bot sessions vs the shared gateway against a weight-limited stub")
+    parser.add_argument('--limit', type=int, default=600, help='Stub weight limit per minute')
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=5)
+    args = parser.parse_args()
+
+    BinanceStub.limit = args.limit
+    ThreadingHTTPServer.request_queue_size = 128  # the default backlog of 5 stalls connects for a second
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BinanceStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    StubClient.base_url = base_url
+
+    report("Per-bot sessions", run(base_url, args.duration, args.symbols))
+
+    # Fresh minute for the gateway run
+    time.sleep(60 - time.time() % 60 + 0.1)
+    BinanceStub.rejected = 0
+    gateway = ExchangeGateway(weight_limit=args.limit, client_factory=StubClient)
+    latencies = run(base_url, args.duration, args.symbols, gateway)
+    report("Shared gateway  ", latencies)
+    print(f"   gateway stats: {gateway.stats()}")
+
+    assert BinanceStub.rejected == 0, "gateway run still hit 429s"
+    assert latencies and None not in latencies, "an order was rejected"
+    print("✅ no 429s through the gateway and every order went through")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Reddit ingestion check
+Runs get_reddit_posts against a fake PRAW client that counts requests the
+way PRAW makes them: one per 100 listing items, read lazily, one per
+submission whose comment tree is loaded, and one per 100 fullnames passed
+to info(). Three ETH subreddits get a post every ten minutes for eight
+days, and new posts arrive between refreshes.
+
+The requests per refresh are compared with the old fetch (hot, new and top
+every time, plus a comment tree per matching post). The check confirms that:
+
+- a refresh after seeding only reads `new` down to the high-water mark;
+- every post the old fetch found in `new` and `top` is returned too;
+- comment counts match num_comments, and scores of recent posts are
+  brought up to date;
+- a second process (a fresh store over the same folder) starts from the
+  saved high-water marks instead of seeding again.
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+import reddit_store
+import reddit_sentiment
+from reddit_store import PostStore
+
+PAGE = 100
+SUBREDDITS = reddit_sentiment.COIN_SUBREDDITS['ETH']
+
+
+class FakeSubmission:
+    def __init__(self, api, post_id, subreddit, created_utc):
+        self._api = api
+        self.id = post_id
+        self.title = f"{'ETH' if random.random() < 0.6 else 'Market'} thoughts {post_id}"
+        self.selftext = random.choice(['Gas fees are great', 'Bearish on everything', 'Nice chart', ''])
+        self.score = random.randint(1, 500)
+        self.upvote_ratio = 0.9
+        self.num_comments = random.randint(0, 80)
+        self.created_utc = created_utc
+        self.url = f"https://reddit.com/r/{subreddit}/{post_id}"
+        self.permalink = f"/r/{subreddit}/comments/{post_id}"
+        self.stickied = random.random() < 0.01
+
+    @property
+    def comments(self):
+        self._api.requests += 1  # the whole comment tree
+        return [None] * self.num_comments
+
+
+class FakeSubredditApi:
+    def __init__(self, api, posts):
+        self._api = api
+        self._posts = posts  # newest first
+
+    def _listing(self, items, limit):
+        """Items read lazily, a request per page (PRAW caps limit=None at 1000)"""
+        items = items[:1000 if limit is None else limit]
+        if not items:
+            self._api.requests += 1
+        for i, item in enumerate(items):
+            if i % PAGE == 0:
+                self._api.requests += 1
+            yield item
+
+    def new(self, limit=100):
+        return self._listing(self._posts, limit)
+
+    def hot(self, limit=100):
+        now = time.time()
+        return self._listing(sorted(self._posts, key=lambda p: p.score / (1 + (now - p.created_utc) / 3600),
+                                    reverse=True), limit)
+
+    def top(self, limit=100, time_filter='week'):
+        cutoff = time.time() - {'day': 86400, 'week': 604800, 'month': 2592000}.get(time_filter, 604800)
+        recent = [p for p in self._posts if p.created_utc >= cutoff]
+        return self._listing(sorted(recent, key=lambda p: p.score, reverse=True), limit)
+
+
+class FakeReddit:
+    def __init__(self):
+        self.requests = 0
+        self.posts = {name: [] for name in SUBREDDITS}  # newest first
+        self.by_id = {}
+        self.ids = iter(range(1, 10 ** 9))
+
+    def add(self, name, created_utc):
+        post = FakeSubmission(self, f"p{next(self.ids)}", name, created_utc)
+        self.posts[name].insert(0, post)
+        self.by_id[post.id] = post
+
+    def subreddit(self, name):
+        return FakeSubredditApi(self, self.posts[name])
+
+    def info(self, fullnames):
+        self.requests += (len(fullnames) + PAGE - 1) // PAGE
+        return [self.by_id[name[3:]] for name in fullnames if name[3:] in self.by_id]
+
+
+def old_get_reddit_posts(reddit, coin, limit=100, timeframe='week'):
+    """What get_reddit_posts did: hot, new and top every time, and a comment tree per matching post"""
+    posts, seen = [], set()
+    time_filter = 604800
+    for name in reddit_sentiment.COIN_SUBREDDITS[coin]:
+        api = reddit.subreddit(name)
+        for sort_method, submissions in (('hot', api.hot(limit=limit)), ('new', api.new(limit=limit)),
+                                         ('top', api.top(limit=limit, time_filter=timeframe))):
+            for submission in submissions:
+                if time.time() - submission.created_utc > time_filter:
+                    continue
+                if (not submission.stickied
+                        and reddit_sentiment.is_coin_related(submission.title + ' ' + submission.selftext, coin)):
+                    posts.append({'id': submission.id, 'num_comments': len(list(submission.comments)),
+                                  'sort_method': sort_method})
+    for post in posts:
+        seen.add(post['id'])
+    return posts, seen
+
+
+def refresh(fake, label):
+    before = fake.requests
+    started = time.perf_counter()
+    posts = reddit_sentiment.get_reddit_posts('ETH')
+    elapsed = time.perf_counter() - started
+    requests = fake.requests - before
+    print(f"{label:34s} {requests:4d} requests, {len(posts):4d} posts, {elapsed * 1000:6.1f} ms")
+    return posts, requests
+
+
+def main():
+    random.seed(7)
+    failed = False
+    fake = FakeReddit()
+    now = time.time()
+    for name in SUBREDDITS:
+        for ts in range(int(now - 8 * 86400), int(now), 600):
+            fake.add(name, ts + random.random())
+
+    # The old fetch, on the same data
+    before = fake.requests
+    old_posts, old_ids = old_get_reddit_posts(fake, 'ETH')
+    old_requests = fake.requests - before
+    print(f"{'old fetch (every refresh)':34s} {old_requests:4d} requests, {len(old_ids):4d} posts")
+    old_listed = {post['id'] for post in old_posts if post['sort_method'] in ('new', 'top')}
+
+    root = tempfile.mkdtemp(prefix='reddit-')
+    reddit_store._store = PostStore(root)
+    reddit_sentiment.reddit = fake
+
+    posts, seed_requests = refresh(fake, 'seed (first refresh)')
+    ids = {post['id'] for post in posts}
+    ok = old_listed <= ids
+    print(f"  every post the old fetch found in new/top is returned: {'yes' if ok else 'NO'}")
+    failed |= not ok
+    ok = all(post['num_comments'] == fake.by_id[post['id']].num_comments for post in posts)
+    print(f"  comment counts from num_comments match the comment trees: {'yes' if ok else 'NO'}")
+    failed |= not ok
+
+    # An hour later: new posts, and the recent ones gained votes
+    incremental = []
+    for _ in range(3):
+        for name in SUBREDDITS:
+            for i in range(6):
+                fake.add(name, time.time() - 60 + i)
+        for post in fake.by_id.values():
+            if post.created_utc > time.time() - 86400:
+                post.score += 10
+        posts, requests = refresh(fake, 'incremental refresh')
+        incremental.append(requests)
+    ids = {post['id'] for post in posts}
+    newest = {fake.posts[name][0].id for name in SUBREDDITS}
+    related_newest = {i for i in newest if reddit_sentiment.is_coin_related(
+        fake.by_id[i].title + ' ' + fake.by_id[i].selftext, 'ETH') and not fake.by_id[i].stickied}
+    ok = related_newest <= ids
+    print(f"  newest posts picked up: {'yes' if ok else 'NO'}")
+    failed |= not ok
+    recent = [post for post in posts if post['created_utc'].timestamp() > time.time() - 86400]
+    ok = all(post['score'] == fake.by_id[post['id']].score for post in recent)
+    print(f"  scores of the last day's {len(recent)} posts are current: {'yes' if ok else 'NO'}")
+    failed |= not ok
+    worst = max(incremental)
+    print(f"  requests per refresh: old {old_requests}, now {worst} ({old_requests / worst:.0f}x fewer)")
+    failed |= worst * 10 > old_requests
+
+    # A new process over the same folder resumes from the saved marks
+    reddit_store._store = PostStore(root)
+    for name in SUBREDDITS:
+        fake.add(name, time.time())
+    posts, requests = refresh(fake, 'refresh in a new process')
+    ok = requests <= worst
+    print(f"  resumed from the saved high-water marks: {'yes' if ok else 'NO'}; {reddit_store._store.stats()}")
+    failed |= not ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Rolling kernel regression check for BeforeTariffs.py and IfNoUpdate.py
+Checks calculate_vwma, calculate_rsi and calculate_average_volumes of both
+modules against the original per-row loops on every stored
+before_tarrifs/crypto_data CSV, then runs link_vwma_strategy and
+doge_rsi_strategy on the loop values and on the kernels and checks that
+they emit the same signals.
+
+The kernels sum with cumulative sums, so they round differently from the
+loops: agreement is checked relative to the value (--rtol). The absolute
+difference scales with the price (ETH's VWMA is ~2e-9 off at ~2000 USD).
+The loops take a few minutes over all files; --files checks a subset.
+"""
+
+import os
+import ast
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(os.path.join(ROOT, 'src'))
+
+import strategiesArray
+
+DATA_GLOB = os.path.join(ROOT, 'src', 'before_tarrifs', 'crypto_data', '*.csv')
+MODULES = {
+    'BeforeTariffs': os.path.join(ROOT, 'src', 'BeforeTariffs.py'),
+    'IfNoUpdate': os.path.join(ROOT, 'crypto-trading-bot', 'src', 'IfNoUpdate.py'),
+}
+HELPERS = ('_rolling_sum', 'calculate_vwma', 'calculate_rsi', 'calculate_average_volume', 'calculate_average_volumes')
+STRATEGIES = ('link_vwma_strategy', 'doge_rsi_strategy')
+PERIODS = (5, 14, 20, 50)
+LOOKBACKS = (5, 20)
+
+
+# === The original loops, kept as the golden reference ===
+def legacy_vwma(data, period):
+    vwma = []
+
+    for i in range(len(data)):
+        if i < period - 1:
+            vwma.append(None)
+        else:
+            sum_price_volume = 0
+            sum_volume = 0
+
+            for j in range(period):
+                price = data.iloc[i-j]['close']
+                volume = data.iloc[i-j]['volume']
+
+                sum_price_volume += price * volume
+                sum_volume += volume
+
+            vwma.append(sum_price_volume / sum_volume)
+
+    return vwma
+
+
+def legacy_rsi(data, period=14):
+    rsi = []
+    changes = []
+
+    for i in range(1, len(data)):
+        changes.append(data.iloc[i]['close'] - data.iloc[i-1]['close'])
+
+    for i in range(len(data)):
+        if i < period:
+            rsi.append(None)
+        else:
+            gains = 0
+            losses = 0
+
+            for j in range(period):
+                change = changes[i - period + j]
+                if change > 0:
+                    gains += change
+                else:
+                    losses -= change
+
+            avg_gain = gains / period
+            avg_loss = losses / period
+
+            if avg_loss == 0:
+                rsi.append(100)
+            else:
+                rs = avg_gain / avg_loss
+                rsi.append(100 - (100 / (1 + rs)))
+
+    return rsi
+
+
+def legacy_average_volume(data, current_index, lookback_period):
+    sum_volume = 0
+    start_index = max(0, current_index - lookback_period)
+
+    for i in range(start_index, current_index):
+        sum_volume += data.iloc[i]['volume']
+
+    return sum_volume / (current_index - start_index)
+
+
+def legacy_average_volumes(data, lookback_period):
+    """The loop at every index (NaN at index 0, where it divides by zero)"""
+    return np.array([np.nan] + [legacy_average_volume(data, i, lookback_period) for i in range(1, len(data))])
+
+
+# === Loading ===
+def load_functions(path, names, namespace):
+    """
+    Run only the named top-level functions of a module
+
+    BeforeTariffs.py and IfNoUpdate.py read config/config.yaml and build a
+    Binance client when imported, so they cannot be imported here.
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    nodes = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name in names]
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), path, 'exec'), namespace)
+    return namespace
+
+
+def load_csv(path):
+    df = pd.read_csv(path)
+    return df.set_index(df.columns[0])
+
+
+# === Comparison ===
+def compare(expected, got, rtol):
+    """Max relative difference of two indicator series, or None if their warm-up or NaN positions differ"""
+    expected = np.array([np.nan if v is None else v for v in expected], dtype=float)
+    got = np.array([np.nan if v is None else v for v in got], dtype=float)
+    if expected.shape != got.shape or not np.array_equal(np.isnan(expected), np.isnan(got)):
+        return None
+    valid = ~np.isnan(expected)
+    if not valid.any():
+        return 0.0
+    return float(np.max(np.abs(got[valid] - expected[valid]) / np.maximum(np.abs(expected[valid]), 1e-300)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the rolling indicator kernels against the original loops")
+    parser.add_argument('--rtol', type=float, default=1e-9, help='Largest relative difference allowed')
+    parser.add_argument('--files', default=DATA_GLOB, help='CSV files to check (glob)')
+    args = parser.parse_args()
+
+    modules = {name: load_functions(path, HELPERS + STRATEGIES, {'np': np, 'signals': strategiesArray})
+               for name, path in MODULES.items()}
+    paths = sorted(glob.glob(args.files))
+    if not paths:
+        print(f"❌ No CSV files match {args.files}")
+        sys.exit(1)
+
+    failed = False
+    worst = {}
+    for path in paths:
+        data = load_csv(path)
+        start = time.perf_counter()
+        legacy = {('vwma', p): legacy_vwma(data, p) for p in PERIODS}
+        legacy.update({('rsi', p): legacy_rsi(data, p) for p in PERIODS})
+        legacy.update({('avg_volume', n): legacy_average_volumes(data, n) for n in LOOKBACKS})
+        legacy_time = time.perf_counter() - start
+
+        for name, module in modules.items():
+            start = time.perf_counter()
+            kernel = {('vwma', p): module['calculate_vwma'](data, p) for p in PERIODS}
+            kernel.update({('rsi', p): module['calculate_rsi'](data, p) for p in PERIODS})
+            kernel.update({('avg_volume', n): module['calculate_average_volumes'](data, n) for n in LOOKBACKS})
+            kernel_time = time.perf_counter() - start
+
+            bad = []
+            for key, expected in legacy.items():
+                diff = compare(expected, kernel[key], args.rtol)
+                if diff is None or diff > args.rtol:
+                    bad.append(f"{key[0]}({key[1]}): {'warm-up differs' if diff is None else f'{diff:.2e}'}")
+                else:
+                    worst[key[0]] = max(worst.get(key[0], 0.0), diff)
+
+            # The strategies on the loop values must trade exactly as on the kernels
+            reference = dict(module, calculate_vwma=legacy_vwma, calculate_rsi=legacy_rsi,
+                             calculate_average_volumes=legacy_average_volumes)
+            load_functions(MODULES[name], STRATEGIES, reference)
+            for strategy in STRATEGIES:
+                if module[strategy](data) != reference[strategy](data):
+                    bad.append(f"{strategy} signals differ")
+
+            print(f"{os.path.basename(path):52s} {name:13s} {len(data):5d} rows  "
+                  f"loops {legacy_time * 1000:8.1f}ms  kernels {kernel_time * 1000:6.2f}ms  "
+                  f"{'ok' if not bad else 'FAILED: ' + '; '.join(bad)}")
+            failed |= bool(bad)
+
+    print("Largest relative difference: " + ", ".join(f"{k} {v:.1e}" for k, v in worst.items()))
+    if failed:
+        print(f"❌ Kernels differ from the loops (rtol {args.rtol:g})")
+        sys.exit(1)
+    print(f"✅ Kernels match the loops within rtol {args.rtol:g} and the strategies emit the same signals")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Trade journal crash check
+Logs trades for two coins through TradeJournal in a temporary folder and
+kills the export part-way: after a coin's trades CSV and metrics CSV were
+written but before its watermark was saved. A second journal over the same
+files (the restarted bot) must then leave the CSVs exactly as an export
+without the crash would have: every trade once, in order, and totals that
+count each sell once. A third journal, opened with nothing left to export,
+must still serve each coin's totals from coin_stats().
+"""
+
+import os
+import sys
+import csv
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from trade_journal import TradeJournal, STARTING_CAPITAL
+
+COINS = ('ETH', 'LINK')
+
+
+class Crash(Exception):
+    pass
+
+
+def log_trades(journal, trades, count, rng):
+    for _ in range(count):
+        coin = rng.choice(COINS)
+        price = round(rng.uniform(10, 100), 2)
+        if trades[coin] and trades[coin][-1][1] == 'BUY':
+            pnl = round(price - trades[coin][-1][2], 4)
+            journal.append(f"{coin}USDT", 'sell', price, pnl)
+            trades[coin].append((None, 'SELL', price, pnl))
+        else:
+            journal.append(f"{coin}USDT", 'buy', price)
+            trades[coin].append((None, 'BUY', price, None))
+
+
+def read_csvs(export_dir, coin):
+    with open(os.path.join(export_dir, f"{coin}_after_tariff_trades.csv"), newline='') as f:
+        rows = [(r['type'], float(r['price']), float(r['profit']) if r['profit'] else None)
+                for r in csv.DictReader(f)]
+    with open(os.path.join(export_dir, f"{coin}_after_tariff_metrics.csv"), newline='') as f:
+        metrics = next(csv.DictReader(f))
+    return rows, metrics
+
+
+def main():
+    rng = random.Random(11)
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        path, export_dir = os.path.join(tmp, 'logs', 'trade_journal.jsonl'), os.path.join(tmp, 'liveBackup')
+        trades = {coin: [] for coin in COINS}
+
+        journal = TradeJournal(path, export_dir, flush_interval=3600, fsync_batch=10 ** 6)
+        log_trades(journal, trades, 40, rng)
+        journal.flush()
+        log_trades(journal, trades, 40, rng)
+
+        # Crash once the first coin's CSVs are written, before its watermark is saved
+        def crash(watermarks):
+            raise Crash()
+        journal._save_watermarks = crash
+        try:
+            journal.flush()
+        except Crash:
+            pass
+        os.close(journal._fd)  # the process dies: nothing else is flushed
+        journal._fd, journal._pending_export = None, []
+
+        restarted = TradeJournal(path, export_dir, flush_interval=3600, fsync_batch=10 ** 6)
+        restarted.flush()
+        restarted.close()
+
+        for coin in COINS:
+            rows, metrics = read_csvs(export_dir, coin)
+            expected = [(kind, price, pnl) for _, kind, price, pnl in trades[coin]]
+            pnls = [pnl for _, _, _, pnl in trades[coin] if pnl is not None]
+            ok_rows = rows == expected
+            ok_metrics = (int(metrics['total_trades']) == len(pnls)
+                          and abs(float(metrics['total_profit']) - sum(pnls)) < 1e-9
+                          and abs(float(metrics['final_capital']) - STARTING_CAPITAL - sum(pnls)) < 1e-9
+                          and abs(float(metrics['win_rate']) - sum(p > 0 for p in pnls) / len(pnls)) < 1e-12)
+            print(f"{coin}: {len(rows)} CSV rows for {len(expected)} trades, each once in order: "
+                  f"{'yes' if ok_rows else 'NO'}; metrics count each sell once: {'yes' if ok_metrics else 'NO'}")
+            failed |= not (ok_rows and ok_metrics)
+
+        # Everything is exported now: the totals must come back from the watermarks alone
+        reopened = TradeJournal(path, export_dir, flush_interval=3600, fsync_batch=10 ** 6)
+        for coin in COINS:
+            stats, (_, metrics) = reopened.coin_stats(coin), read_csvs(export_dir, coin)
+            ok = stats is not None and all(abs(float(stats[k]) - float(metrics[k])) < 1e-9 for k in metrics if k != 'coin')
+            print(f"{coin}: totals after a restart with nothing to export: {'match the metrics CSV' if ok else 'MISSING'}")
+            failed |= not ok
+        reopened.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Whale poller check
+Runs WhaleAlertPoller against a local fake of the Whale Alert
+/v1/transactions endpoint. The fake honours api_key, start, cursor and
+limit, and can refuse a cursor once. Transactions are added between polls
+in bursts bigger than a page, and the check confirms that:
+
+- every tracked transaction is delivered exactly once, in order;
+- untracked symbols never reach the callback;
+- after the first poll only new transactions are transferred (the rows
+  received are compared with the old fetch-the-latest-20 loop, which also
+  misses part of any burst over 20);
+- a refused cursor falls back to `start` without losing anything;
+- each poll's transactions reach the callback as one batch;
+- a page that times out mid-poll keeps the pages fetched before it.
+
+It also times SeenIds against the old deque membership scan.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import timeit
+import itertools
+from collections import deque
+
+import aiohttp
+from aiohttp import web
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from whale_poller import WhaleAlertPoller, SeenIds
+
+API_KEY = 'check-key'
+SYMBOLS = ['ETH', 'BTC', 'LINK', 'USDT', 'DOGE', 'XRP', 'ARB']
+TRACKED = {'ETH', 'LINK', 'DOGE', 'ARB'}
+OWNERS = [('exchange', 'unknown'), ('unknown', 'exchange'), ('exchange', 'exchange'), ('unknown', 'unknown'),
+          ('other', 'exchange')]
+
+
+class FakeWhaleAlert:
+    def __init__(self):
+        self.transactions = []  # kept in timestamp order by the callers
+        self.ids = itertools.count(1)
+        self.requests = 0
+        self.rows_sent = 0
+        self.refuse_next_cursor = False
+        self.fail_after = None  # answer 500 once this many more requests were served
+        self.hang_after = None  # stall past the client timeout once this many more requests were served
+
+    def add(self, n, timestamp=None):
+        """n transactions at `timestamp` (default now); owners cycle through out-, in- and non-flows"""
+        timestamp = int(time.time()) if timestamp is None else timestamp
+        for _ in range(n):
+            tx_id = next(self.ids)
+            from_type, to_type = OWNERS[tx_id % len(OWNERS)]
+            self.transactions.append({
+                'id': str(tx_id), 'blockchain': 'ethereum', 'symbol': SYMBOLS[tx_id % len(SYMBOLS)].lower(),
+                'timestamp': timestamp, 'amount': 1000 + tx_id, 'amount_usd': 1_500_000 + tx_id,
+                'from': {'owner': 'binance' if from_type == 'exchange' else 'unknown', 'owner_type': from_type},
+                'to': {'owner': 'coinbase' if to_type == 'exchange' else 'unknown', 'owner_type': to_type},
+            })
+
+    async def handle(self, request):
+        self.requests += 1
+        if self.fail_after is not None:
+            if self.fail_after == 0:
+                return web.json_response({'result': 'error', 'message': 'server error'}, status=500)
+            self.fail_after -= 1
+        if self.hang_after is not None:
+            self.hang_after -= 1
+            if self.hang_after < 0:
+                self.hang_after = None
+                await asyncio.sleep(2)
+        q = request.query
+        if q.get('api_key') != API_KEY:
+            return web.json_response({'result': 'error', 'message': 'invalid api_key'}, status=401)
+        limit = int(q.get('limit', 100))
+        txs = [tx for tx in self.transactions if tx['timestamp'] >= int(q.get('start', 0))]
+        if 'end' in q:
+            txs = [tx for tx in txs if tx['timestamp'] <= int(q['end'])]
+        if 'cursor' in q:
+            if self.refuse_next_cursor:
+                self.refuse_next_cursor = False
+                return web.json_response({'result': 'error', 'message': 'invalid cursor'}, status=400)
+            txs = [tx for tx in txs if int(tx['id']) > int(q['cursor'])]
+        if 'start' not in q and 'cursor' not in q:
+            txs = txs[-limit:]  # the latest, as the old loop asked for
+        page = txs[:limit]
+        self.rows_sent += len(page)
+        body = {'result': 'success', 'count': len(page), 'transactions': page}
+        if page:
+            body['cursor'] = page[-1]['id']
+        return web.json_response(body)
+
+
+async def old_loop_poll(session, url, seen):
+    """What whale_alert_loop did: the latest 20, de-duplicated against a deque"""
+    async with session.get(url, params={'api_key': API_KEY, 'limit': 20}) as resp:
+        data = await resp.json()
+    new = []
+    for tx in data.get('transactions', []):
+        if tx['id'] in seen:
+            continue
+        seen.append(tx['id'])
+        if tx['symbol'].upper() in TRACKED:
+            new.append(tx)
+    return new
+
+
+async def main():
+    fake = FakeWhaleAlert()
+    app = web.Application()
+    app.router.add_get('/v1/transactions', fake.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    api_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    failed = False
+
+    poller = WhaleAlertPoller(API_KEY, symbols=TRACKED, api_url=api_url, interval=0.05, page_limit=10)
+    batches = []
+
+    async def on_transactions(transactions):
+        batches.append(transactions)
+
+    bursts = [30, 0, 45, 7, 0, 60]
+    fake.add(5)
+    expected = []
+    task = asyncio.create_task(poller.run(on_transactions))
+    await asyncio.sleep(0.2)
+    for i, burst in enumerate(bursts):
+        if i == 3:
+            fake.refuse_next_cursor = True
+        first = len(fake.transactions)
+        fake.add(burst)
+        expected += [tx['id'] for tx in fake.transactions[first:] if tx['symbol'].upper() in TRACKED]
+        await asyncio.sleep(0.2)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    delivered = [tx['id'] for batch in batches for tx in batch]
+    initial = [tx['id'] for tx in fake.transactions[:5] if tx['symbol'].upper() in TRACKED]
+    print(f"New poller: {fake.requests} requests, {fake.rows_sent} rows received, "
+          f"{len(delivered)} transactions delivered in {len(batches)} batches; {poller.stats()}")
+    ok = delivered == initial + expected
+    print(f"  every tracked transaction exactly once, in order: {'yes' if ok else 'NO'}")
+    untracked = [tx for batch in batches for tx in batch if tx['symbol'].upper() not in TRACKED]
+    print(f"  untracked symbols delivered: {len(untracked)}")
+    failed |= not ok or bool(untracked)
+
+    # The old loop over the same bursts
+    old = FakeWhaleAlert()
+    old.add(5)
+    app = web.Application()
+    app.router.add_get('/v1/transactions', old.handle)
+    runner_old = web.AppRunner(app)
+    await runner_old.setup()
+    site_old = web.TCPSite(runner_old, '127.0.0.1', 0)
+    await site_old.start()
+    url = f"http://127.0.0.1:{site_old._server.sockets[0].getsockname()[1]}/v1/transactions"
+    async with aiohttp.ClientSession() as session:
+        seen, old_delivered = deque(maxlen=500), []
+        old_delivered += await old_loop_poll(session, url, seen)
+        for burst in bursts:
+            old.add(burst)
+            old_delivered += await old_loop_poll(session, url, seen)
+            old_delivered += await old_loop_poll(session, url, seen)  # same number of polls per burst
+    print(f"Old loop:   {old.requests} requests, {old.rows_sent} rows received, "
+          f"{len(old_delivered)} of {len(initial) + len(expected)} tracked transactions delivered")
+
+    # A later page times out: the pages before it must still be delivered, and the rest on the next poll
+    fake.transactions = []
+    poller = WhaleAlertPoller(API_KEY, symbols=TRACKED, api_url=api_url, interval=60, page_limit=10, timeout=0.5)
+    fake.add(35, timestamp=int(time.time()) - 5)
+    fake.hang_after = 2
+    first_poll = await poller.poll()
+    second_poll = await poller.poll()
+    await poller.close()
+    expected = [tx['id'] for tx in fake.transactions if tx['symbol'].upper() in TRACKED]
+    delivered = [tx['id'] for tx in first_poll + second_poll]
+    ok = delivered == expected and len(first_poll) > 0
+    print(f"Timeout on page 3: {len(first_poll)} delivered from pages 1-2, {len(second_poll)} on the next poll; "
+          f"every tracked transaction exactly once: {'yes' if ok else 'NO'}")
+    failed |= not ok
+
+    await runner.cleanup()
+    await runner_old.cleanup()
+
+    # De-duplication cost with a full history of ids
+    ids = [str(i) for i in range(5000)]
+    seen_ids = SeenIds(5000)
+    for tx_id in ids:
+        seen_ids.add(tx_id)
+    window = deque(ids[-500:], maxlen=500)
+    missing = 'not-seen'
+    deque_us = timeit.timeit(lambda: missing in window, number=20000) / 20000 * 1e6
+    set_us = timeit.timeit(lambda: missing in seen_ids, number=20000) / 20000 * 1e6
+    print(f"Membership check: deque(500) {deque_us:.2f} µs, SeenIds(5000) {set_us:.3f} µs")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Whale store check
+Backfills three days from the fake Whale Alert endpoint of
+check_whale_poller.py into a temporary WhaleStore, with the server failing
+part-way through, then resumes the crawl. Checks that:
+
+- the resumed crawl only asks for the days that were not stored yet;
+- the store holds every tracked transaction exactly once;
+- flows() matches a brute-force scan of all stored rows, for every window;
+- live transactions (appended) and late ones (merged) update the flows;
+- a second store over the same folder, as another process would open it,
+  picks up rows appended after it loaded;
+- two processes writing the same month at once, one appending live rows
+  and one merging late ones, lose no rows.
+
+It also times flows() against the brute-force scan.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import timeit
+import multiprocessing
+
+import numpy as np
+from aiohttp import web
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from whale_poller import WhaleAlertPoller
+from whale_store import WhaleStore, WINDOWS, DAY, backfill, flow_direction
+from check_whale_poller import FakeWhaleAlert, API_KEY, TRACKED
+
+
+def brute_force(store, symbol, now):
+    """Flows recomputed from every stored row"""
+    records = store.load(symbol)
+    direction = np.array([flow_direction(f, t) for f, t in zip(records['from_type'].tolist(),
+                                                                records['to_type'].tolist())])
+    result = {}
+    for name, seconds in WINDOWS.items():
+        inside = (records['timestamp'] > now - seconds) & (records['timestamp'] <= now)
+        result[name] = {'inflow': float(records['amount_usd'][inside & (direction > 0)].sum()),
+                        'outflow': float(records['amount_usd'][inside & (direction < 0)].sum()),
+                        'count': int((inside & (direction != 0)).sum())}
+    return result
+
+
+def same_flows(store, now):
+    for symbol in TRACKED:
+        got, want = store.flows(symbol, now), brute_force(store, symbol, now)
+        for name in WINDOWS:
+            if (got[name]['count'] != want[name]['count']
+                    or abs(got[name]['inflow'] - want[name]['inflow']) > 1e-3
+                    or abs(got[name]['outflow'] - want[name]['outflow']) > 1e-3):
+                print(f"  {symbol} {name}: store {got[name]} vs scan {want[name]}")
+                return False
+    return True
+
+
+def stored_ids(store):
+    return sorted(int(i) for symbol in TRACKED for i in store.load(symbol)['id'].tolist())
+
+
+def write_batches(root, transactions, batch):
+    """One writer process: its own store over the shared folder, a batch per add()"""
+    store = WhaleStore(root, check_interval=0)
+    for i in range(0, len(transactions), batch):
+        store.add(transactions[i:i + batch])
+
+
+def concurrent_writers(now):
+    """Live appends and late merges into the same month from two processes"""
+    fake = FakeWhaleAlert()
+    for ts in range(now - 20000, now):
+        fake.add(1, timestamp=ts)
+    live = [tx for tx in fake.transactions if tx['timestamp'] >= now - 10000]
+    late = [tx for tx in fake.transactions if tx['timestamp'] < now - 10000][::-1]
+    root = tempfile.mkdtemp(prefix='whales-')
+    writers = [multiprocessing.Process(target=write_batches, args=(root, txs, 50)) for txs in (live, late)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    expected = sorted(int(tx['id']) for tx in fake.transactions if tx['symbol'].upper() in TRACKED)
+    return stored_ids(WhaleStore(root)) == expected
+
+
+async def main():
+    fake = FakeWhaleAlert()
+    app = web.Application()
+    app.router.add_get('/v1/transactions', fake.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    api_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    failed = False
+
+    # Three days of history, a burst every minute, ending now
+    now = int(time.time())
+    start = (now - 3 * DAY) // DAY * DAY
+    for ts in range(start, now, 60):
+        fake.add(3, timestamp=ts)
+
+    root = tempfile.mkdtemp(prefix='whales-')
+    store = WhaleStore(root)
+    poller = WhaleAlertPoller(API_KEY, symbols=TRACKED, api_url=api_url, page_limit=100)
+
+    # First crawl dies part-way through the second day (a day is 44 pages)
+    fake.fail_after = 60
+    first = await backfill(store, poller, start, now, pause=0)
+    fake.fail_after = None
+    covered = store.covered_ranges()
+    print(f"Backfill 1: {first}, covered {[(lo - start) / DAY for lo, hi in covered]} .. "
+          f"{[(hi - start) / DAY for lo, hi in covered]} days")
+
+    missing = store.missing_ranges(start, now)
+    requested = []
+    original = poller.history
+
+    async def history(lo, hi):
+        requested.append((lo, hi))
+        return await original(lo, hi)
+
+    poller.history = history
+    second = await backfill(store, poller, start, now, pause=0)
+    print(f"Backfill 2: {second}")
+    resumed_only_missing = all(any(m_lo <= lo and hi <= m_hi for m_lo, m_hi in missing) for lo, hi in requested)
+    print(f"  resumed crawl asked only for missing days: {'yes' if resumed_only_missing else 'NO'}")
+    third = await backfill(store, poller, start, now, pause=0)
+    print(f"  third run requests: {third['ranges']}")
+    failed |= not (first['complete'] is False and second['complete'] and resumed_only_missing
+                   and third['ranges'] == 0)
+
+    expected = sorted(int(tx['id']) for tx in fake.transactions if tx['symbol'].upper() in TRACKED)
+    ids = stored_ids(store)
+    ok = ids == expected
+    print(f"  store holds every tracked transaction once: {'yes' if ok else 'NO'} ({len(ids)} rows)")
+    failed |= not ok
+
+    ok = same_flows(store, now)
+    print(f"  flows() match a full scan: {'yes' if ok else 'NO'}")
+    failed |= not ok
+
+    # A reader in another process, loaded before the live rows arrive
+    reader = WhaleStore(root, check_interval=0)
+    reader.flows('ETH', now)
+
+    # Live transactions (appended) and a late one (merged into the month)
+    fake.transactions = []
+    fake.add(20, timestamp=now)
+    fake.add(5, timestamp=now - 1800)
+    added = store.add(fake.transactions)
+    added_again = store.add(fake.transactions)
+    print(f"Live adds: {added} stored, {added_again} on repeat")
+    ok = same_flows(store, now + 1)
+    print(f"  flows() match a full scan after live adds: {'yes' if ok else 'NO'}")
+    failed |= not ok or added_again != 0
+    ok = same_flows(reader, now + 1)
+    print(f"  second store sees the new rows: {'yes' if ok else 'NO'}")
+    failed |= not ok
+
+    ok = concurrent_writers(now)
+    print(f"Two processes appending and merging the same month keep every row: {'yes' if ok else 'NO'}")
+    failed |= not ok
+
+    # Cost per lookup
+    store_us = timeit.timeit(lambda: store.flows('ETH', now + 1), number=2000) / 2000 * 1e6
+    scan_ms = timeit.timeit(lambda: brute_force(store, 'ETH', now + 1), number=20) / 20 * 1e3
+    print(f"flows('ETH'): {store_us:.1f} µs from the windows, {scan_ms:.1f} ms scanning "
+          f"{len(store.load('ETH'))} rows")
+
+    await poller.close()
+    await runner.cleanup()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
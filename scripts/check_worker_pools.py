@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Worker pools check
+Simulates the Telegram bot's loop: a slow sentiment request (network wait
+plus CPU-bound scoring) runs while /metrics presses arrive every 50 ms.
+The presses' latency and the loop lag are measured twice: with the
+sentiment work called inline, as the handlers used to, and through
+WorkerPools. Also checks that a command over its timeout raises
+CommandTimeout, that the concurrency limit holds, that a worker process
+dying mid-call leaves a working pool and a free slot, and that
+LoopLagMonitor logs a stall with the blocking call in the stack.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'live'))
+
+from concurrent.futures.process import BrokenProcessPool
+
+from worker_pools import WorkerPools, LoopLagMonitor, CommandTimeout
+
+
+def slow_sentiment(wait=0.5, work=1_500_000):
+    """Stand-in for get_coin_sentiment: a network wait, then pure-Python scoring"""
+    time.sleep(wait)
+    total = 0
+    for i in range(work):
+        total += i % 7
+    return total
+
+
+def metrics_lookup():
+    return sum(range(1000))
+
+
+async def presses(pools, stop, latencies):
+    """A press every 50 ms; its latency runs from when it was due until it is answered"""
+    while not stop.is_set():
+        due = time.perf_counter() + 0.05
+        await asyncio.sleep(0.05)
+        if pools is None:
+            metrics_lookup()
+        else:
+            await pools.run('metrics', metrics_lookup)
+        latencies.append(time.perf_counter() - due)
+
+
+async def scenario(pools):
+    monitor = LoopLagMonitor(threshold=0.1, interval=0.02)
+    monitor.start()
+    stop, latencies = asyncio.Event(), []
+    clicks = asyncio.create_task(presses(pools, stop, latencies))
+    await asyncio.sleep(0.1)
+
+    started = time.perf_counter()
+    if pools is None:
+        slow_sentiment()
+    else:
+        await pools.run('sentiment', slow_sentiment)
+    elapsed = time.perf_counter() - started
+
+    await asyncio.sleep(0.1)
+    stop.set()
+    await clicks
+    monitor.stop()
+    return elapsed, max(latencies), monitor.max_lag, monitor.stalls
+
+
+class StackCapture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+async def main():
+    capture = StackCapture()
+    logging.getLogger('worker_pools').addHandler(capture)
+    failed = False
+
+    for label, pools in (('inline', None), ('pools', WorkerPools())):
+        if pools is not None:
+            await pools.run('sentiment', slow_sentiment, 0, 1)  # start the worker process first
+        elapsed, latency, lag, stalls = await scenario(pools)
+        print(f"{label:7s} sentiment {elapsed * 1000:5.0f} ms | worst /metrics press {latency * 1000:6.1f} ms "
+              f"| max loop lag {lag * 1000:6.1f} ms | stalls {stalls}")
+        if pools is None:
+            stacks = [m for m in capture.messages if 'blocked for' in m]
+            found = any('slow_sentiment' in m for m in stacks)
+            print(f"        watchdog stack names the blocking call: {'yes' if found else 'NO'}")
+            failed |= not found
+        else:
+            failed |= stalls > 0
+            pools.shutdown()
+
+    # Timeouts and limits
+    pools = WorkerPools(limits={'slow': ('io', 1, 0.2)})
+    try:
+        await pools.run('slow', time.sleep, 0.5)
+        print("timeout: NOT raised")
+        failed = True
+    except CommandTimeout as e:
+        print(f"timeout: {e}")
+    # The timed-out call still holds the only slot, so the next one waits for it
+    pools.limits['slow'] = ('io', 1, 2)
+    started = time.perf_counter()
+    try:
+        await pools.run('slow', time.sleep, 0)
+        waited = time.perf_counter() - started
+        print(f"limit:   next call waited {waited * 1000:.0f} ms for the slot")
+        failed |= waited < 0.1
+    except CommandTimeout as e:
+        print(f"limit:   {e}")
+    print(f"stats:   {pools.stats()}")
+    pools.shutdown()
+
+    # The cpu worker dies while running a call: the next call must get a fresh pool and the slot back
+    pools = WorkerPools()
+    try:
+        await pools.run('sentiment', os._exit, 1)
+        print("crash:   BrokenProcessPool NOT raised")
+        failed = True
+    except BrokenProcessPool:
+        print(f"crash:   broken pool dropped right away: {'yes' if pools._cpu is None else 'NO'}")
+        failed |= pools._cpu is not None
+    try:
+        result = await pools.run('sentiment', slow_sentiment, 0, 10)
+    except Exception as e:
+        result = f"{type(e).__name__} {e}"
+    ok = result == slow_sentiment(0, 10) and not pools.stats()['running']
+    print(f"crash:   next call after the worker died returned {result!r}, running {pools.stats()['running']}: "
+          f"{'ok' if ok else 'FAILED'}")
+    failed |= not ok
+    pools.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
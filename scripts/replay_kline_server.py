@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Local Binance kline replay server for testing the live bots offline
+Serves the two endpoints MarketDataService uses, driven by a simulated clock:
+  ws://HOST:PORT/stream?streams=ethusdt@kline_15m/...   combined kline stream
+  http://HOST:PORT/api/v3/klines?symbol=..&interval=..  REST backfill
+Candles come from the local kline store (data/klines) or, with --synthetic,
+from a seeded random walk. Point the bots at it with:
+  market_data:
+    ws_url: ws://127.0.0.1:8765
+    rest_url: http://127.0.0.1:8765
+"""
+
+import os
+import sys
+import json
+import zlib
+import asyncio
+import logging
+import argparse
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from websockets.asyncio.server import serve
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from kline_store import KlineStore, INTERVAL_MS, to_ms
+
+
+class Replay:
+    def __init__(self, args):
+        self.args = args
+        self.store = KlineStore()
+        self.start = to_ms(args.start)
+        self.end = to_ms(args.end)
+        self.step = INTERVAL_MS[args.step]
+        replay_from = to_ms(args.replay_from) if args.replay_from else self.start + 7 * 86_400_000
+        self.clock = replay_from - replay_from % self.step
+        self.series = {}
+        self.clients = {}  # connection -> set of stream names
+
+    def candles(self, symbol, interval):
+        """(n x 6) array of open_time, open, high, low, close, volume"""
+        key = (symbol, interval)
+        if key not in self.series:
+            if self.args.synthetic:
+                self.series[key] = self._synthetic(symbol, interval)
+            else:
+                self.series[key] = np.asarray(self.store.load_array(symbol, interval, self.start, self.end, sync=False))
+                if len(self.series[key]) == 0:
+                    print(f"⚠️  No stored candles for {symbol} {interval}; fetch them with the kline store or use --synthetic")
+        return self.series[key]
+
+    def _synthetic(self, symbol, interval):
+        step = INTERVAL_MS[interval]
+        open_time = np.arange(self.start - self.start % step, self.end + 1, step, dtype=float)
+        rng = np.random.default_rng(zlib.crc32(f"{symbol}{interval}".encode()))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(open_time))))
+        open_ = np.concatenate(([close[0]], close[:-1]))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, len(close)))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, len(close)))
+        volume = rng.uniform(100, 1000, len(close))
+        return np.column_stack([open_time, open_, high, low, close, volume])
+
+    def closed(self, symbol, interval, limit):
+        """The last `limit` candles that have closed by the replay clock"""
+        rows = self.candles(symbol, interval)
+        hi = np.searchsorted(rows[:, 0] + INTERVAL_MS[interval], self.clock, side='right') if len(rows) else 0
+        return rows[max(0, hi - limit):hi]
+
+    # === REST ===
+    def process_request(self, connection, request):
+        url = urlsplit(request.path)
+        if url.path != '/api/v3/klines':
+            return None  # carry on with the websocket handshake
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        symbol, interval = query['symbol'].upper(), query['interval']
+        step = INTERVAL_MS[interval]
+        rows = self.closed(symbol, interval, min(int(query.get('limit', 500)), 1000))
+        klines = [
+            [int(r[0]), f"{r[1]:.8f}", f"{r[2]:.8f}", f"{r[3]:.8f}", f"{r[4]:.8f}", f"{r[5]:.8f}", int(r[0]) + step - 1]
+            for r in rows
+        ]
+        return connection.respond(HTTPStatus.OK, json.dumps(klines))
+
+    # === Websocket ===
+    async def handler(self, connection):
+        query = parse_qs(urlsplit(connection.request.path).query)
+        streams = {s for s in query.get('streams', [''])[0].split('/') if s}
+        self.clients[connection] = streams
+        print(f"🔌 Client connected: {sorted(streams)}")
+        try:
+            async for message in connection:
+                msg = json.loads(message)
+                if msg.get('method') == 'SUBSCRIBE':
+                    streams.update(msg['params'])
+                elif msg.get('method') == 'UNSUBSCRIBE':
+                    streams.difference_update(msg['params'])
+                await connection.send(json.dumps({'result': None, 'id': msg.get('id')}))
+        finally:
+            self.clients.pop(connection, None)
+            print("🔌 Client disconnected")
+
+    def kline_event(self, stream, symbol, interval, row):
+        step = INTERVAL_MS[interval]
+        return json.dumps({'stream': stream, 'data': {
+            'e': 'kline', 'E': self.clock, 's': symbol,
+            'k': {
+                't': int(row[0]), 'T': int(row[0]) + step - 1, 's': symbol, 'i': interval,
+                'o': f"{row[1]:.8f}", 'h': f"{row[2]:.8f}", 'l': f"{row[3]:.8f}",
+                'c': f"{row[4]:.8f}", 'v': f"{row[5]:.8f}", 'x': True,
+            },
+        }})
+
+    async def run_clock(self):
+        ticks = 0
+        while self.clock <= self.end:
+            await asyncio.sleep(self.args.speed)
+            self.clock += self.step
+            ticks += 1
+
+            for connection, streams in list(self.clients.items()):
+                for stream in list(streams):
+                    name, interval = stream.split('@kline_')
+                    if self.clock % INTERVAL_MS[interval]:
+                        continue
+                    rows = self.closed(name.upper(), interval, 1)
+                    if len(rows) and int(rows[-1][0]) + INTERVAL_MS[interval] == self.clock:
+                        await connection.send(self.kline_event(stream, name.upper(), interval, rows[-1]))
+
+            if self.args.disconnect_every and ticks % self.args.disconnect_every == 0:
+                print("✂️  Dropping all connections")
+                for connection in list(self.clients):
+                    await connection.close()
+        print("🏁 Replay finished")
+
+
+async def serve_replay(args):
+    replay = Replay(args)
+    # REST replies are sent from process_request, which websockets logs as a failed handshake
+    logging.getLogger('websockets.server').setLevel(logging.CRITICAL)
+    async with serve(replay.handler, args.host, args.port, process_request=replay.process_request):
+        print(f"▶️  Replaying from {args.replay_from or 'start + 7 days'} at {args.speed}s per {args.step} on ws://{args.host}:{args.port}")
+        await replay.run_clock()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay klines over a Binance-compatible stream and REST endpoint")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--start', default='2025-03-01', help='First candle available to REST backfills')
+    parser.add_argument('--end', default='2025-04-01', help='Replay stops after this date')
+    parser.add_argument('--replay-from', help='Where the simulated clock starts (defaults to start + 7 days)')
+    parser.add_argument('--step', default='1m', help='Simulated time advanced per tick')
+    parser.add_argument('--speed', type=float, default=1.0, help='Real seconds per tick')
+    parser.add_argument('--synthetic', action='store_true', help='Generate random-walk candles instead of reading the store')
+    parser.add_argument('--disconnect-every', type=int, default=0,
+                        help='Drop all connections every N ticks to exercise the REST fallback')
+    args = parser.parse_args()
+    asyncio.run(serve_replay(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Replay a live pair's rules over history
+Runs live_replay.replay on klines from the local KlineStore (downloaded on
+first use) or on a synthetic random walk, and prints the bot's trade stats.
+With --check N it also replays the first N candles one candle at a time
+the way BotEngine runs a pair: LiveStrategy with the pair's frame, handed
+the last `frame` candles on every tick, and BotEngine.tick's trade rules.
+It then compares the trades and times both paths.
+
+With --framed N it counts, over the first N candles, the ticks where that
+engine's entry/exit signals differ from the old *_strategy(df) functions
+evaluated on the last `frame` candles (EWM and MACD carry weight from
+before the frame in the engine; see LiveStrategy).
+
+    python scripts/replay_live_rules.py eth --start 2023-01-01 --end 2025-01-01
+    python scripts/replay_live_rules.py link --synthetic 100000 --check 5000 --framed 2000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(HERE, '..', 'src', 'live'))
+sys.path.append(os.path.join(HERE, '..', 'src'))
+
+from bot_engine import bot_settings
+from live_replay import replay, _close_times
+import strategiesLive
+from strategiesLive import LiveStrategy
+from market_data import INTERVAL_MS
+
+
+def synthetic_klines(n, interval, seed=0):
+    """Random walk with the occasional volume spike, so the rules do fire"""
+    rng = np.random.default_rng(seed)
+    step = INTERVAL_MS[interval]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = close * (1 + rng.normal(0, 0.004, n))
+    high = np.maximum(close, open_) * (1 + np.abs(rng.normal(0, 0.004, n)))
+    low = np.minimum(close, open_) * (1 - np.abs(rng.normal(0, 0.004, n)))
+    volume = rng.uniform(100, 1000, n) * np.where(rng.random(n) < 0.1, 4, 1)
+    start = 1_600_000_000_000 // step * step
+    timestamp = start + np.arange(n) * step
+    return pd.DataFrame({'timestamp': timestamp, 'open': open_, 'high': high, 'low': low,
+                         'close': close, 'volume': volume, 'close_time': timestamp + step - 1})
+
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time']
+
+
+def live_loop(coin, df, settings):
+    """The live engine's view: one tick per candle on the last `frame` candles, as BotEngine runs it"""
+    frame = settings['frame']
+    strategy = LiveStrategy(settings['strategy'], frame)
+    candles = list(df[COLUMNS].itertuples(index=False, name=None))
+    times = _close_times(df, settings['interval'])
+
+    buys, sells = [], []
+    in_position, entry_price, last_trade = False, 0.0, 0.0
+    for i in range(len(candles)):
+        entry, exit_, price = strategy.on_candles(candles[max(0, i - frame + 1):i + 1])
+        ready = times[i] - last_trade > settings['cooldown']
+        if settings['exit'] == 'tp_sl':
+            exit_ = price >= entry_price * (1 + settings['tp_pct']) or price <= entry_price * (1 - settings['sl_pct'])
+        if not in_position and entry and ready:
+            buys.append(i)
+            in_position, entry_price, last_trade = True, price, times[i]
+        elif in_position and exit_ and ready:
+            sells.append(i)
+            in_position, entry_price, last_trade = False, 0.0, times[i]
+    return buys, sells
+
+
+def framed_differences(df, settings):
+    """Ticks where the engine's (entry, exit) differ from the *_strategy(df) function on the last `frame` candles"""
+    frame = settings['frame']
+    strategy = LiveStrategy(settings['strategy'], frame)
+    framed_fn = getattr(strategiesLive, f"{settings['strategy']}_strategy")
+    candles = list(df[COLUMNS].itertuples(index=False, name=None))
+    differ = ticks = 0
+    for i in range(1, len(candles)):
+        window = candles[max(0, i - frame + 1):i + 1]
+        live = strategy.on_candles(window)[:2]
+        framed = framed_fn(pd.DataFrame(window, columns=COLUMNS))[:2]
+        ticks += 1
+        differ += tuple(bool(x) for x in live) != tuple(bool(x) for x in framed)
+    return differ, ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a live pair's entry/exit rules over kline history")
+    parser.add_argument('coin', help="Pair name, e.g. eth")
+    parser.add_argument('--symbol', help="Defaults to the pair's configured symbol")
+    parser.add_argument('--interval', help="Defaults to the pair's configured interval")
+    parser.add_argument('--start', default='2024-01-01')
+    parser.add_argument('--end', default='2025-01-01')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='Use N random-walk candles instead of the store')
+    parser.add_argument('--check', type=int, default=0, metavar='N',
+                        help='Compare with the per-candle live loop on the first N candles')
+    parser.add_argument('--framed', type=int, default=0, metavar='N',
+                        help='Count signal differences from the fixed-frame functions on the first N candles')
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in (('symbol', args.symbol), ('interval', args.interval)) if v}
+    settings = dict(bot_settings(args.coin, {}), **overrides)
+
+    if args.synthetic:
+        df = synthetic_klines(args.synthetic, settings['interval'])
+    else:
+        from kline_store import KlineStore
+        df = KlineStore().load(settings['symbol'], settings['interval'], args.start, args.end)
+        df['timestamp'] = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype('int64')
+    print(f"{settings['symbol']} {settings['interval']}: {len(df)} candles")
+
+    t0 = time.perf_counter()
+    result = replay(args.coin, df, **overrides)
+    elapsed = time.perf_counter() - t0
+    print(f"Replay: {elapsed * 1000:.1f} ms ({elapsed / max(len(df), 1) * 1e6:.2f} µs per candle)")
+    for key, value in result.summary().items():
+        print(f"  {key}: {value}")
+
+    if args.check:
+        part = df.iloc[:args.check].reset_index(drop=True)
+        head = replay(args.coin, part, **overrides)
+        t0 = time.perf_counter()
+        buys, sells = live_loop(args.coin, part, result.settings)
+        loop = time.perf_counter() - t0
+        same = list(head.buys) == buys and list(head.sells) == sells
+        print(f"Per-candle live loop on {len(part)} candles: {loop * 1000:.0f} ms "
+              f"({loop / len(part) * 1e6:.0f} µs per candle); "
+              f"trades {'match' if same else 'DIFFER'} ({len(buys)} buys, {len(sells)} sells)")
+        if not same:
+            sys.exit(1)
+
+    if args.framed:
+        t0 = time.perf_counter()
+        differ, ticks = framed_differences(df.iloc[:args.framed].reset_index(drop=True), result.settings)
+        print(f"Fixed-frame functions on {ticks} ticks: signals differ on {differ} "
+              f"({differ / max(ticks, 1):.2%}), {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,10 @@
 import os
 import logging
 import pandas as pd
-from datetime import datetime
 import yaml
 from binance.client import Client
+from kline_store import KlineStore
+from backtest_core import simulate_trades
 # === Configuration ===
 # Load config from yaml
 config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
@@ -16,10 +17,11 @@ interval = '1h'
 output_dir = 'liveBackup'
 os.makedirs(output_dir, exist_ok=True)
 
-client = Client(
+# Klines are served from the local store; the Binance client is only created when a range is missing
+store = KlineStore(client_factory=lambda: Client(
     config['binance']['test_api_key'],
     config['binance']['test_secret_key']
-)
+))
 
 # === Define Strategies ===
 def eth_tariff_bollinger_reversion(data):
@@ -152,40 +154,16 @@ def doge_sentiment_defense(df):
 
 # === Backtest Runner ===
 def fetch_data(symbol, interval, start, end):
-    start_fmt = datetime.strptime(start, '%Y-%m-%d').strftime('%d %b, %Y')
-    end_fmt = datetime.strptime(end, '%Y-%m-%d').strftime('%d %b, %Y')
-    klines = client.get_historical_klines(symbol, interval, start_fmt, end_fmt)
-    df = pd.DataFrame(klines, columns=[
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'qav', 'num_trades', 'tbbav', 'tbqav', 'ignore'
-    ])
-    df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+    return store.load(symbol, interval, start, end)
 
 def run_backtest(coin, strategy_fn):
     symbol = f"{coin}USDT"
     df = fetch_data(symbol, interval, start_date, end_date)
     buy, sell = strategy_fn(df)
 
-    capital = 10000
-    trades = []
-    in_position = False
-    entry_price = 0
-
-    for i in range(len(df)):
-        if buy[i] and not in_position:
-            entry_price = buy[i]
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'buy', 'price': entry_price, 'profit': 0})
-            in_position = True
-        elif sell[i] and in_position:
-            exit_price = sell[i]
-            profit = (exit_price - entry_price) * (capital / entry_price)
-            capital += profit
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'sell', 'price': exit_price, 'profit': profit})
-            in_position = False
-
-    trades_df = pd.DataFrame(trades)
+    sim = simulate_trades(buy, sell, initial_capital=10000, close=df['close'].to_numpy())
+    capital = sim.final_capital
+    trades_df = sim.trades_frame(df['timestamp'])
     trades_df.to_csv(os.path.join(output_dir, f"{coin}_after_tariff_trades.csv"), index=False)
 
     if trades_df.empty:
@@ -1,9 +1,11 @@
 import os
 import logging
 import pandas as pd
-from datetime import datetime
 import yaml
 from binance.client import Client
+from kline_store import KlineStore
+from backtest_core import simulate_trades
+import strategiesArray as signals
 import numpy as np
 
 # === Configuration ===
@@ -18,10 +20,11 @@ interval = '1h'
 output_dir = 'liveBackup'
 os.makedirs(output_dir, exist_ok=True)
 
-client = Client(
+# Klines are served from the local store; the Binance client is only created when a range is missing
+store = KlineStore(client_factory=lambda: Client(
     config['binance']['test_api_key'],
     config['binance']['test_secret_key']
-)
+))
 
 def eth_volatility_breakout_strategy(data_path, initial_capital=10000):
     """
@@ -83,20 +86,12 @@ def eth_volatility_breakout_strategy(data_path, initial_capital=10000):
         rs = gain / loss
         df['rsi'] = 100 - (100 / (1 + rs))
     
-    # Volume trend confirmation
-    df['obv'] = 0
-    obv = 0
-    for i, row in df.iterrows():
-        if i == df.index[0]:
-            continue
-            
-        prev_close = df.loc[df.index[df.index.get_loc(i) - 1], 'close']
-        if row['close'] > prev_close:
-            obv += row['volume']
-        elif row['close'] < prev_close:
-            obv -= row['volume']
-        
-        df.at[i, 'obv'] = obv
+    # Volume trend confirmation (on-balance volume, starting at 0)
+    close = df['close'].to_numpy(dtype=float)
+    volume = df['volume'].to_numpy(dtype=float)
+    obv_step = np.where(close[1:] > close[:-1], volume[1:],
+                        np.where(close[1:] < close[:-1], -volume[1:], 0.0))
+    df['obv'] = np.concatenate(([0.0], np.cumsum(obv_step)))
         
     df['obv_ema10'] = df['obv'].ewm(span=10, adjust=False).mean()
     
@@ -269,27 +264,6 @@ def doge_breakout_strategy(data, lookback=5, take_profit_pct=0.05, stop_loss_pct
     return buy_signals, sell_signals
 
 
-def calculate_average_volume(data, current_index, lookback_period):
-    """
-    Calculate average volume over a lookback period
-    
-    Args:
-        data (pandas.DataFrame): DataFrame with OHLCV data
-        current_index (int): Current index position
-        lookback_period (int): Number of periods to look back
-        
-    Returns:
-        float: Average volume
-    """
-    sum_volume = 0
-    start_index = max(0, current_index - lookback_period)
-    
-    for i in range(start_index, current_index):
-        sum_volume += data.iloc[i]['volume']
-    
-    return sum_volume / (current_index - start_index)
-
-
 # Enhanced version with trailing stop logic
 def doge_advanced_breakout_strategy(data, lookback=5, take_profit_pct=0.05, initial_stop_loss_pct=0.03, max_hold_periods=48):
     """
@@ -528,6 +502,9 @@ def link_vwma_strategy(data, short_period=20, long_period=50, stop_loss=0.05):
     # Calculate Volume-Weighted Moving Averages
     vwma_short = calculate_vwma(data, short_period)
     vwma_long = calculate_vwma(data, long_period)
+    avg_volume = calculate_average_volumes(data, 5)
+    close = data['close'].to_numpy(dtype=float)
+    volume = data['volume'].to_numpy(dtype=float)
     
     position = 0  # 0 = no position, 1 = long
     entry_price = 0
@@ -538,13 +515,13 @@ def link_vwma_strategy(data, short_period=20, long_period=50, stop_loss=0.05):
     
     # Strategy Implementation
     for i in range(long_period, len(data)):
-        current_price = data.iloc[i]['close']
+        current_price = close[i]
         
         # Buy signal: Short VWMA crosses above Long VWMA with volume confirmation
         if (vwma_short[i-1] <= vwma_long[i-1] and 
             vwma_short[i] > vwma_long[i] and 
             position == 0 and
-            data.iloc[i]['volume'] > calculate_average_volume(data, i, 5)):
+            volume[i] > avg_volume[i]):
             
             position = 1
             entry_price = current_price
@@ -565,7 +542,7 @@ def link_vwma_strategy(data, short_period=20, long_period=50, stop_loss=0.05):
     
     # Close any open position at the end
     if position == 1:
-        sell_signals[-1] = data.iloc[-1]['close']
+        sell_signals[-1] = close[-1]
     
     return buy_signals, sell_signals
 
@@ -586,6 +563,9 @@ def doge_rsi_strategy(data, rsi_period=14, buy_threshold=30, sell_threshold=70,
     """
     # Calculate RSI
     rsi = calculate_rsi(data, rsi_period)
+    avg_volume = calculate_average_volumes(data, 5)
+    close = data['close'].to_numpy(dtype=float)
+    volume = data['volume'].to_numpy(dtype=float)
     
     position = 0  # 0 = no position, 1 = long
     entry_price = 0
@@ -596,13 +576,13 @@ def doge_rsi_strategy(data, rsi_period=14, buy_threshold=30, sell_threshold=70,
     
     # Strategy Implementation
     for i in range(rsi_period + 1, len(data)):
-        current_price = data.iloc[i]['close']
+        current_price = close[i]
         
         # Buy signal: RSI crosses above oversold threshold with volume confirmation
         if (rsi[i-1] <= buy_threshold and 
             rsi[i] > buy_threshold and 
             position == 0 and
-            data.iloc[i]['volume'] > calculate_average_volume(data, i, 5)):
+            volume[i] > avg_volume[i]):
             
             position = 1
             entry_price = current_price
@@ -623,12 +603,13 @@ def doge_rsi_strategy(data, rsi_period=14, buy_threshold=30, sell_threshold=70,
     
     # Close any open position at the end
     if position == 1:
-        sell_signals[-1] = data.iloc[-1]['close']
+        sell_signals[-1] = close[-1]
     
     return buy_signals, sell_signals
 
 
 # Helper Functions
+# The rolling kernels live in strategiesArray (shared with the parameter sweep); these keep the list form
 def calculate_vwma(data, period):
     """
     Calculate Volume-Weighted Moving Average
@@ -640,23 +621,10 @@ def calculate_vwma(data, period):
     Returns:
         list: List of VWMA values with None for the first period-1 entries
     """
-    vwma = []
+    vwma = [None] * len(data)
     
-    for i in range(len(data)):
-        if i < period - 1:
-            vwma.append(None)
-        else:
-            sum_price_volume = 0
-            sum_volume = 0
-            
-            for j in range(period):
-                price = data.iloc[i-j]['close']
-                volume = data.iloc[i-j]['volume']
-                
-                sum_price_volume += price * volume
-                sum_volume += volume
-            
-            vwma.append(sum_price_volume / sum_volume)
+    if len(data) >= period:
+        vwma[period - 1:] = signals.vwma(data, period)[period - 1:].tolist()
     
     return vwma
 
@@ -672,36 +640,10 @@ def calculate_rsi(data, period=14):
     Returns:
         list: List of RSI values with None for the first period entries
     """
-    rsi = []
-    changes = []
-    
-    # Calculate price changes
-    for i in range(1, len(data)):
-        changes.append(data.iloc[i]['close'] - data.iloc[i-1]['close'])
+    rsi = [None] * len(data)
     
-    # Calculate RSI
-    for i in range(len(data)):
-        if i < period:
-            rsi.append(None)
-        else:
-            gains = 0
-            losses = 0
-            
-            for j in range(period):
-                change = changes[i - period + j]
-                if change > 0:
-                    gains += change
-                else:
-                    losses -= change
-            
-            avg_gain = gains / period
-            avg_loss = losses / period
-            
-            if avg_loss == 0:
-                rsi.append(100)
-            else:
-                rs = avg_gain / avg_loss
-                rsi.append(100 - (100 / (1 + rs)))
+    if len(data) > period:
+        rsi[period:] = signals.simple_rsi(data, period)[period:].tolist()
     
     return rsi
 
@@ -718,13 +660,24 @@ def calculate_average_volume(data, current_index, lookback_period):
     Returns:
         float: Average volume
     """
-    sum_volume = 0
     start_index = max(0, current_index - lookback_period)
+    volume = data['volume'].to_numpy(dtype=float)
+    return volume[start_index:current_index].sum() / (current_index - start_index)
+
+
+def calculate_average_volumes(data, lookback_period):
+    """
+    Average volume over the lookback period before every index, in one pass
     
-    for i in range(start_index, current_index):
-        sum_volume += data.iloc[i]['volume']
-    
-    return sum_volume / (current_index - start_index)
+    Args:
+        data (pandas.DataFrame): DataFrame with OHLCV data
+        lookback_period (int): Number of periods to look back
+        
+    Returns:
+        numpy.ndarray: Entry i equals calculate_average_volume(data, i, lookback_period)
+        (NaN at index 0, where there is no history)
+    """
+    return signals.average_volume_before(data, lookback_period)
 
 
 # Example usage:
@@ -918,40 +871,16 @@ def optimize_doge_strategy(data):
 
 # === Backtest Runner ===
 def fetch_data(symbol, interval, start, end):
-    start_fmt = datetime.strptime(start, '%Y-%m-%d').strftime('%d %b, %Y')
-    end_fmt = datetime.strptime(end, '%Y-%m-%d').strftime('%d %b, %Y')
-    klines = client.get_historical_klines(symbol, interval, start_fmt, end_fmt)
-    df = pd.DataFrame(klines, columns=[
-        'timestamp', 'open', 'high', 'low', 'close', 'volume',
-        'close_time', 'qav', 'num_trades', 'tbbav', 'tbqav', 'ignore'
-    ])
-    df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+    return store.load(symbol, interval, start, end)
 
 def run_backtest(coin, strategy_fn):
     symbol = f"{coin}USDT"
     df = fetch_data(symbol, interval, start_date, end_date)
     buy, sell = strategy_fn(df)
 
-    capital = 10000
-    trades = []
-    in_position = False
-    entry_price = 0
-
-    for i in range(len(df)):
-        if buy[i] and not in_position:
-            entry_price = buy[i]
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'buy', 'price': entry_price, 'profit': 0})
-            in_position = True
-        elif sell[i] and in_position:
-            exit_price = sell[i]
-            profit = (exit_price - entry_price) * (capital / entry_price)
-            capital += profit
-            trades.append({'timestamp': df['timestamp'][i], 'type': 'sell', 'price': exit_price, 'profit': profit})
-            in_position = False
-
-    trades_df = pd.DataFrame(trades)
+    sim = simulate_trades(buy, sell, initial_capital=10000, close=df['close'].to_numpy())
+    capital = sim.final_capital
+    trades_df = sim.trades_frame(df['timestamp'])
     trades_df.to_csv(os.path.join(output_dir, f"{coin}_before_tariff_trades.csv"), index=False)
 
     if trades_df.empty:
@@ -0,0 +1,212 @@
+# backtest_core.py
+"""
+Trade simulation shared by the backtest runners.
+
+Replays buy/sell signals with the same long-only rules every runner used to
+implement in its own loop: a buy opens a position when flat, a sell closes
+it when long (a bar carrying both signals therefore flips the position),
+and each exit compounds the whole capital by exit / entry. The position
+state machine is resolved with array operations over the signal bars, so
+cost grows with the number of trades rather than the number of candles.
+"""
+import numpy as np
+import pandas as pd
+
+TRADE_DTYPE = np.dtype([('bar', np.int64), ('type', np.int8), ('price', np.float64), ('profit', np.float64)])
+
+BUY = 1
+SELL = -1
+
+
+def signal_array(signal, prices=None):
+    """
+    Normalise one side of a strategy's signals to (mask, price) arrays.
+
+    Accepts the legacy list of price-or-None (any truthy value is a signal,
+    exactly like `if buy[i]`), a float array of prices (NaN or 0 means no
+    signal) or a boolean mask, which takes its fill prices from `prices`.
+    """
+    if isinstance(signal, np.ndarray) and signal.dtype == bool:
+        if prices is None:
+            raise ValueError("Boolean signal masks need the prices to fill at")
+        return signal, np.where(signal, np.asarray(prices, dtype=float), np.nan)
+
+    if isinstance(signal, np.ndarray) and signal.dtype.kind in 'fiu':
+        price = signal.astype(float)
+        return (price != 0) & ~np.isnan(price), price
+
+    mask = np.fromiter((bool(x) for x in signal), dtype=bool, count=len(signal))
+    price = np.array([x if x else np.nan for x in signal], dtype=float)
+    return mask, price
+
+
+def positions(buy_mask, sell_mask):
+    """
+    Per-bar position (1 long, 0 flat) after each bar's signals are applied.
+
+    A bar with only a buy sets the position to 1, only a sell sets it to 0,
+    and a bar with both flips it. Flips are resolved by counting them since
+    the last one-sided signal, which fixes the state before them.
+    """
+    n = len(buy_mask)
+    idx = np.flatnonzero(buy_mask | sell_mask)
+    if len(idx) == 0:
+        return np.zeros(n, dtype=np.int8)
+
+    both = buy_mask[idx] & sell_mask[idx]
+    fixed = ~both
+    # Index (within idx) of the latest one-sided event, -1 = start of data (flat)
+    last_fixed = np.where(fixed, np.arange(len(idx)), -1)
+    np.maximum.accumulate(last_fixed, out=last_fixed)
+    base = np.where(last_fixed >= 0, buy_mask[idx][np.maximum(last_fixed, 0)], False).astype(np.int64)
+
+    flips = np.cumsum(both)
+    flips_before = np.where(last_fixed >= 0, flips[np.maximum(last_fixed, 0)], 0)
+    event_state = (base + flips - flips_before) % 2
+
+    # Carry each event's state forward until the next event
+    pos = np.zeros(n, dtype=np.int8)
+    owner = np.searchsorted(idx, np.arange(n), side='right') - 1
+    has_event = owner >= 0
+    pos[has_event] = event_state[owner[has_event]]
+    return pos
+
+
+class TradeSimulation:
+    """
+    Result of simulate_trades.
+
+    Attributes:
+        trades: Structured array (bar, type, price, profit); type is BUY or SELL
+        position: int8 position per bar
+        equity: Capital per bar, marked to the close while in a position
+        final_capital: Capital after the last closed trade
+    """
+
+    def __init__(self, trades, position, equity, initial_capital, final_capital):
+        self.trades = trades
+        self.position = position
+        self.equity = equity
+        self.initial_capital = initial_capital
+        self.final_capital = final_capital
+
+    def trades_frame(self, timestamps):
+        """Trades in the runners' CSV layout: timestamp, type ('buy'/'sell'), price, profit"""
+        if len(self.trades) == 0:
+            return pd.DataFrame()
+        profit = self.trades['profit']
+        if not (self.trades['type'] == SELL).any():
+            profit = profit.astype(np.int64)  # only the opening buy, whose profit is written as 0
+        return pd.DataFrame({
+            'timestamp': np.asarray(timestamps)[self.trades['bar']],
+            'type': np.where(self.trades['type'] == BUY, 'buy', 'sell'),
+            'price': self.trades['price'],
+            'profit': profit,
+        })
+
+
+def simulate_trades(buy, sell, initial_capital=10000, close=None):
+    """
+    Run the long-only trade simulation over a pair of signal series.
+
+    Args:
+        buy, sell: Legacy price-or-None lists, price arrays or boolean masks (see signal_array)
+        initial_capital (float): Starting capital
+        close (array): Close prices, used to fill boolean masks and to mark the equity curve
+
+    Returns:
+        TradeSimulation
+    """
+    buy_mask, buy_price = signal_array(buy, close)
+    sell_mask, sell_price = signal_array(sell, close)
+    if len(buy_mask) != len(sell_mask):
+        raise ValueError("Buy/sell length mismatch!")
+
+    pos = positions(buy_mask, sell_mask)
+    prev = np.concatenate(([0], pos[:-1]))
+    entry_bars = np.flatnonzero((pos == 1) & (prev == 0))
+    exit_bars = np.flatnonzero((pos == 0) & (prev == 1))
+
+    entries = buy_price[entry_bars]
+    exits = sell_price[exit_bars]
+
+    # Compounding is inherently sequential; this loops over closed trades only,
+    # with the same arithmetic as the old per-bar loops so results match exactly
+    profits = np.empty(len(exit_bars))
+    capital_after = np.empty(len(exit_bars))
+    capital = initial_capital
+    for k in range(len(exit_bars)):
+        profit = (exits[k] - entries[k]) * (capital / entries[k])
+        capital += profit
+        profits[k] = profit
+        capital_after[k] = capital
+
+    trades = np.empty(len(entry_bars) + len(exit_bars), dtype=TRADE_DTYPE)
+    trades['bar'][0::2] = entry_bars
+    trades['type'][0::2] = BUY
+    trades['price'][0::2] = entries
+    trades['profit'][0::2] = 0.0
+    trades['bar'][1::2] = exit_bars
+    trades['type'][1::2] = SELL
+    trades['price'][1::2] = exits
+    trades['profit'][1::2] = profits
+
+    # Realised capital per bar, plus the open position marked to the close
+    n = len(pos)
+    closed = np.searchsorted(exit_bars, np.arange(n), side='right')
+    realised = np.concatenate(([initial_capital], capital_after))[closed]
+    equity = realised.astype(float)
+    if close is not None:
+        close = np.asarray(close, dtype=float)
+        open_trade = np.searchsorted(entry_bars, np.arange(n), side='right') - 1
+        long = pos == 1
+        entry_at = entries[open_trade[long]]
+        equity[long] = realised[long] + (close[long] - entry_at) * (realised[long] / entry_at)
+
+    return TradeSimulation(trades, pos, equity, initial_capital, float(capital))
+
+
+def compute_metrics(sim):
+    """
+    Summary metrics for a simulation, with the same definitions and rounding
+    as Backtester.compute_metrics in fourCoinsBacktest2.py.
+    """
+    if len(sim.trades) == 0:
+        return {
+            'final_capital': sim.final_capital,
+            'total_trades': 0,
+            'win_rate': 0,
+            'profit_factor': float('inf'),
+            'sharpe_ratio': 0,
+            'drawdown': 0,
+            'total_profit': 0
+        }
+
+    profit = sim.trades['profit'][sim.trades['type'] == SELL]
+    wins = profit[profit > 0]
+    losses = profit[profit <= 0]
+
+    win_rate = len(wins) / len(profit) if len(profit) > 0 else 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_factor = np.float64(wins.sum()) / abs(losses.sum()) if len(losses) > 0 else float('inf')
+
+    sharpe = 0
+    if len(profit) > 0:
+        returns = profit / sim.final_capital
+        std = returns.std(ddof=1) if len(returns) > 1 else np.nan
+        sharpe = (returns.mean() / std) * (252 ** 0.5) if std != 0 else 0
+
+    # Max drawdown of the realised capital after each trade
+    capital_curve = sim.initial_capital + np.cumsum(sim.trades['profit'])
+    peak = np.maximum.accumulate(capital_curve)
+    max_drawdown = ((peak - capital_curve) / peak).max()
+
+    return {
+        'final_capital': round(sim.final_capital, 2),
+        'total_trades': len(profit),
+        'win_rate': round(win_rate, 2),
+        'profit_factor': round(profit_factor, 2),
+        'sharpe_ratio': round(sharpe, 2),
+        'drawdown': round(max_drawdown * 100, 2),
+        'total_profit': round(sim.final_capital - sim.initial_capital, 2)
+    }
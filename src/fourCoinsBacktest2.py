@@ -1,10 +1,17 @@
 import os
 import logging
+import traceback
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
 import yaml
+import numpy as np
 import pandas as pd
 from binance.client import Client
-from strategiesIndividual import STRATEGY_MAP
+from strategiesArray import SIGNAL_MAP
+from kline_store import KlineStore
+from backtest_core import simulate_trades, compute_metrics, BUY, SELL
 
 # Load config.yaml
 config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'))
@@ -17,8 +24,8 @@ os.makedirs(log_dir, exist_ok=True)
 log_file = os.path.join(log_dir, f'full_backtest_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
 logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s | %(levelname)s | %(message)s')
 
-# Binance client
-client = Client(config['binance']['test_api_key'], config['binance']['test_secret_key'])
+# Klines are served from the local store; the Binance client is only created when a range is missing
+store = KlineStore(client_factory=lambda: Client(config['binance']['test_api_key'], config['binance']['test_secret_key']))
 
 class Backtester:
     def __init__(self, coin, timeframe, strategy_fn, start_date, end_date):
@@ -32,20 +39,15 @@ class Backtester:
         self.trades = []
 
     def fetch_data(self):
-        start_fmt = datetime.strptime(self.start_date, '%Y-%m-%d').strftime('%d %b, %Y')
-        end_fmt = datetime.strptime(self.end_date, '%Y-%m-%d').strftime('%d %b, %Y')
-        klines = client.get_historical_klines(self.symbol, self.interval, start_fmt, end_fmt)
-        df = pd.DataFrame(klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume',
-                                           'close_time', 'qav', 'num_trades', 'tbbav', 'tbqav', 'ignore'])
-        df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
+        return store.load(self.symbol, self.interval, self.start_date, self.end_date)
 
     def run_strategy(self, df):
         result = self.strategy_fn(df)
         
-        # Support both formats: (buy, sell) OR (df, metrics)
-        if isinstance(result, tuple) and isinstance(result[0], pd.DataFrame):
+        # Support int8 action arrays, (buy, sell) lists OR (df, metrics)
+        if isinstance(result, np.ndarray):
+            buy, sell = result == BUY, result == SELL
+        elif isinstance(result, tuple) and isinstance(result[0], pd.DataFrame):
             df = result[0]
             actions = df['action'].tolist()
             buy = [price if action == 'BUY' else None for price, action in zip(df['close'], actions)]
@@ -56,99 +58,175 @@ class Backtester:
         # Add assertion to catch broken strategies
         assert len(buy) == len(df) and len(sell) == len(df), "Buy/sell length mismatch!"
         
-        in_position = False
-        entry_price = 0
-        trade_data = []
-
-        for i in range(len(df)):
-            if buy[i] and not in_position:
-                entry_price = buy[i]
-                trade_data.append({
-                    'timestamp': df['timestamp'][i],
-                    'type': 'buy',
-                    'price': entry_price,
-                    'profit': 0
-                })
-                in_position = True
-            elif sell[i] and in_position:
-                exit_price = sell[i]
-                profit = (exit_price - entry_price) * (self.capital / entry_price)
-                self.capital += profit
-                trade_data.append({
-                    'timestamp': df['timestamp'][i],
-                    'type': 'sell', 
-                    'price': exit_price,
-                    'profit': profit
-                })
-                in_position = False
-
-        self.trades = pd.DataFrame(trade_data)
+        sim = simulate_trades(buy, sell, initial_capital=self.capital, close=df['close'].to_numpy())
+        self.sim = sim
+        self.capital = sim.final_capital
+        self.equity = sim.equity
+        self.trades = sim.trades_frame(df['timestamp'])
         
-        # Save trades to CSV
-        filename = f"{self.symbol}_{self.strategy_fn.__name__}_trades.csv"
+        # Save trades to CSV, one file per scenario: workers run the same coin and
+        # strategy over several timeframes and periods at once
+        period = '_'.join(str(d).replace(' ', 'T').replace(':', '') for d in (self.start_date, self.end_date))
+        filename = f"{self.symbol}_{self.strategy_fn.__name__}_{self.interval}_{period}_trades.csv"
         filepath = os.path.join("trades_indiv_logs", filename)
-        self.trades.to_csv(filepath, index=False)
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        self.trades.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, filepath)
 
     def compute_metrics(self):
-        if len(self.trades) == 0:
-            return {
-                'final_capital': self.capital,
-                'total_trades': 0,
-                'win_rate': 0,
-                'profit_factor': float('inf'),
-                'sharpe_ratio': 0,
-                'drawdown': 0,
-                'total_profit': 0
-            }
-
-        sell_trades = self.trades[self.trades['type'] == 'sell']
-        wins = sell_trades[sell_trades['profit'] > 0]
-        losses = sell_trades[sell_trades['profit'] <= 0]
-        
-        win_rate = len(wins) / len(sell_trades) if len(sell_trades) > 0 else 0
-        profit_factor = wins['profit'].sum() / abs(losses['profit'].sum()) if len(losses) > 0 else float('inf')
-        
-        sharpe = 0
-        if len(sell_trades) > 0:
-            returns = sell_trades['profit'] / self.capital
-            sharpe = (returns.mean() / returns.std()) * (252 ** 0.5) if returns.std() != 0 else 0
-
-        # Calculate max drawdown
-        capital_curve = self.initial_capital + self.trades['profit'].cumsum()
-        peak = capital_curve.expanding().max()
-        drawdown = (peak - capital_curve) / peak
-        max_drawdown = drawdown.max()
-
-        return {
-            'final_capital': round(self.capital, 2),
-            'total_trades': len(sell_trades),
-            'win_rate': round(win_rate, 2),
-            'profit_factor': round(profit_factor, 2),
-            'sharpe_ratio': round(sharpe, 2),
-            'drawdown': round(max_drawdown * 100, 2),
-            'total_profit': round(self.capital - self.initial_capital, 2)
-        }
+        return compute_metrics(self.sim)
+
+# === Parallel scenario runner ===
+SCENARIO_KEYS = ('coin', 'strategy', 'timeframe', 'start_date', 'end_date')
+
+
+def _error_row(scenario, error):
+    row = {k: scenario[k] for k in SCENARIO_KEYS}
+    row['error'] = error
+    return row
+
+
+def _run_scenario(task):
+    """Worker: build the kline frame from the shared buffer, run one strategy and return its metrics row"""
+    row = {k: task[k] for k in SCENARIO_KEYS}
+    try:
+        shm = shared_memory.SharedMemory(name=task['shm_name'])
+        try:
+            rows = np.ndarray((task['rows'], 6), dtype=np.float64, buffer=shm.buf, offset=task['offset'])
+            df = pd.DataFrame({
+                'timestamp': pd.to_datetime(rows[:, 0].astype('int64'), unit='ms'),
+                'open': rows[:, 1].copy(),
+                'high': rows[:, 2].copy(),
+                'low': rows[:, 3].copy(),
+                'close': rows[:, 4].copy(),
+                'volume': rows[:, 5].copy(),
+            })
+            del rows
+        finally:
+            shm.close()
+
+        bt = Backtester(task['coin'], task['timeframe'], SIGNAL_MAP[task['coin']][task['strategy']],
+                        task['start_date'], task['end_date'])
+        bt.run_strategy(df)
+        row.update(bt.compute_metrics())
+        row['error'] = None
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+        row['traceback'] = traceback.format_exc()
+    return row
+
+
+def run_scenarios(scenarios, workers=None):
+    """
+    Run backtest scenarios across a process pool.
+
+    Klines for every scenario are loaded once in the parent (from the kline
+    store) and packed into a single shared-memory buffer; workers attach to
+    it read-only instead of receiving pickled DataFrames. A scenario that
+    raises, or whose klines cannot be loaded, is reported in the 'error'
+    column rather than stopping the sweep. If a worker process dies, the
+    pool is lost with every scenario still queued on it; those are run
+    again, each in its own process, so only the one that kills its worker
+    is reported as an error.
+
+    Args:
+        scenarios (list): Dicts with coin, strategy, timeframe, start_date, end_date
+        workers (int): Process count (defaults to the number of CPUs)
+
+    Returns:
+        pd.DataFrame: One metrics row per scenario, in input order
+    """
+    # Load each distinct symbol/timeframe/range once
+    arrays, load_errors = {}, {}
+    for sc in scenarios:
+        key = (sc['coin'], sc['timeframe'], sc['start_date'], sc['end_date'])
+        if key not in arrays and key not in load_errors:
+            try:
+                arrays[key] = store.load_array(sc['coin'] + 'USDT', sc['timeframe'], sc['start_date'], sc['end_date'])
+            except Exception as e:
+                load_errors[key] = f"Kline load failed: {type(e).__name__}: {e}"
+                logging.error(f"❌ Could not load {sc['coin']} {sc['timeframe']} klines: {e}")
+
+    offsets = {}
+    total = 0
+    for key, arr in arrays.items():
+        offsets[key] = total
+        total += arr.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1))
+    try:
+        for key, arr in arrays.items():
+            np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf, offset=offsets[key])[:] = arr
+
+        tasks = [None] * len(scenarios)
+        results = [None] * len(scenarios)
+        for i, sc in enumerate(scenarios):
+            key = (sc['coin'], sc['timeframe'], sc['start_date'], sc['end_date'])
+            if key in load_errors:
+                results[i] = _error_row(sc, load_errors[key])
+            else:
+                tasks[i] = dict(sc, shm_name=shm.name, offset=offsets[key], rows=len(arrays[key]))
+
+        pending = [i for i, task in enumerate(tasks) if task is not None]
+        isolate = False
+        while pending:
+            broken = []
+            for batch in ([[i] for i in pending] if isolate else [pending]):
+                with ProcessPoolExecutor(max_workers=1 if isolate else workers or os.cpu_count()) as pool:
+                    futures = {pool.submit(_run_scenario, tasks[i]): i for i in batch}
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        try:
+                            results[i] = future.result()
+                        except BrokenProcessPool:
+                            broken.append(i)
+                        except Exception as e:
+                            results[i] = _error_row(tasks[i], f"{type(e).__name__}: {e}")
+            if isolate:
+                # Run on its own and its worker still died (e.g. killed or out of memory)
+                for i in broken:
+                    results[i] = _error_row(tasks[i], "BrokenProcessPool: the worker process died")
+                break
+            if broken:
+                logging.warning(f"⚠️ A worker process died; re-running {len(broken)} unfinished scenarios one by one")
+            pending, isolate = broken, True
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame(results)
+
 
 def main():
     all_scenarios = config['backtest']['backtest_periods']
+    scenarios = []
     for coin, entries in all_scenarios.items():
         for scenario in entries:
-            strategy_name = scenario['strategy']
-            timeframe = scenario['timeframe']
-            start = scenario['start_date']
-            end = scenario['end_date']
-            strategy_fn = STRATEGY_MAP[coin][strategy_name]
+            scenarios.append({
+                'coin': coin,
+                'strategy': scenario['strategy'],
+                'timeframe': scenario['timeframe'],
+                'start_date': scenario['start_date'],
+                'end_date': scenario['end_date'],
+            })
 
-            bt = Backtester(coin, timeframe, strategy_fn, start, end)
-            try:
-                df = bt.fetch_data()
-                bt.run_strategy(df)
-                metrics = bt.compute_metrics()
-                logging.info(f"\n=== {coin.upper()} | {strategy_name} ===")
-                for k, v in metrics.items():
-                    logging.info(f"{k}: {v}")
-            except Exception as e:
-                logging.error(f"❌ Error in {coin}-{strategy_name}: {str(e)}")
+    results = run_scenarios(scenarios, workers=config['backtest'].get('workers'))
+
+    metric_cols = [c for c in results.columns if c not in ('coin', 'strategy', 'timeframe', 'start_date', 'end_date', 'error', 'traceback')]
+    for _, row in results.iterrows():
+        if pd.notna(row['error']):
+            logging.error(f"❌ Error in {row['coin']}-{row['strategy']}: {row['error']}")
+            if isinstance(row.get('traceback'), str):
+                logging.error(row['traceback'])
+            continue
+        logging.info(f"\n=== {row['coin'].upper()} | {row['strategy']} ===")
+        for k in metric_cols:
+            logging.info(f"{k}: {row[k]}")
+
+    results_file = os.path.join(log_dir, f'backtest_results_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+    results.drop(columns=['traceback'], errors='ignore').to_csv(results_file, index=False)
+    logging.info(f"📊 Results table saved to {results_file}")
+    return results
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,227 @@
+# kline_store.py
+"""
+Local on-disk kline store shared by the backtesters.
+
+Candles are kept under <root>/<SYMBOL>/<interval>/<YYYY-MM>.npy as one
+column-major float64 array per month (columns: open_time, open, high, low,
+close, volume), so a partition can be memory-mapped and a single column read
+without touching the others. A small coverage.json per symbol/interval
+records which time ranges have already been requested from Binance; a read
+only downloads the parts of the range that are not covered yet, so repeated
+backtests over the same periods run offline after the first warm-up.
+
+The exchange client is pluggable: anything with python-binance's
+get_historical_klines(symbol, interval, start_ms, end_ms) signature works,
+which lets a local fake stand in for Binance.
+
+Like get_historical_klines, start and end are both inclusive: a range ending
+on '2024-03-01' includes the candle that opens at midnight that day.
+"""
+import os
+import json
+import time
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'klines'))
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000, '3d': 259_200_000,
+    '1w': 604_800_000,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def to_ms(value):
+    """Convert a 'YYYY-MM-DD' string (UTC), datetime or ms integer to epoch milliseconds"""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _month_key(ms):
+    dt = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+    return f"{dt.year:04d}-{dt.month:02d}"
+
+
+def _month_start_ms(key):
+    year, month = map(int, key.split('-'))
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _next_month_key(key):
+    year, month = map(int, key.split('-'))
+    year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}"
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _subtract_ranges(start, end, covered):
+    """Parts of [start, end) not inside any covered [s, e) range"""
+    missing = []
+    cursor = start
+    for s, e in covered:
+        if e <= cursor:
+            continue
+        if s >= end:
+            break
+        if s > cursor:
+            missing.append((cursor, min(s, end)))
+        cursor = max(cursor, e)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class KlineStore:
+    def __init__(self, root=DEFAULT_ROOT, client=None, client_factory=None):
+        """
+        Args:
+            root (str): Directory holding the partitions
+            client: Object with get_historical_klines(symbol, interval, start_ms, end_ms);
+                    only needed when a requested range is not on disk yet
+            client_factory: Zero-argument callable returning such a client, called on the
+                    first download so fully cached runs never connect to the exchange
+        """
+        self.root = root
+        self.client = client
+        self.client_factory = client_factory
+
+    # === Paths and metadata ===
+    def _series_dir(self, symbol, interval):
+        return os.path.join(self.root, symbol.upper(), interval)
+
+    def _partition_path(self, symbol, interval, key):
+        return os.path.join(self._series_dir(symbol, interval), f"{key}.npy")
+
+    def _coverage_path(self, symbol, interval):
+        return os.path.join(self._series_dir(symbol, interval), 'coverage.json')
+
+    def _load_coverage(self, symbol, interval):
+        path = self._coverage_path(symbol, interval)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _save_coverage(self, symbol, interval, ranges):
+        path = self._coverage_path(symbol, interval)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(_merge_ranges(ranges), f)
+        os.replace(tmp, path)
+
+    def missing_ranges(self, symbol, interval, start, end):
+        """Sub-ranges [s, e) (ms) of start..end that have never been fetched"""
+        return _subtract_ranges(to_ms(start), to_ms(end) + 1, self._load_coverage(symbol, interval))
+
+    # === Partitions ===
+    def _read_partition(self, symbol, interval, key, mmap=True):
+        path = self._partition_path(symbol, interval, key)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r' if mmap else None)
+
+    def _write_rows(self, symbol, interval, rows):
+        """Merge rows (n x 6 array) into their monthly partitions, de-duplicating by open time"""
+        if len(rows) == 0:
+            return
+        os.makedirs(self._series_dir(symbol, interval), exist_ok=True)
+        keys = np.array([_month_key(ms) for ms in rows[:, 0]])
+        for key in np.unique(keys):
+            new = rows[keys == key]
+            existing = self._read_partition(symbol, interval, key, mmap=False)
+            if existing is not None:
+                new = np.concatenate([existing, new])
+            # Later rows win, so a re-fetched candle replaces the stored one
+            _, last_idx = np.unique(new[::-1, 0], return_index=True)
+            merged = new[::-1][last_idx]
+            path = self._partition_path(symbol, interval, key)
+            tmp = path + '.tmp.npy'
+            np.save(tmp, np.asfortranarray(merged))
+            os.replace(tmp, path)
+
+    # === Fetching ===
+    def _fetch(self, symbol, interval, start, end):
+        if self.client is None and self.client_factory is not None:
+            self.client = self.client_factory()
+        if self.client is None:
+            raise RuntimeError(f"{symbol} {interval} range {start}-{end} is not cached and no client is configured")
+        klines = self.client.get_historical_klines(symbol, interval, start, end - 1)
+        if not klines:
+            return np.empty((0, len(COLUMNS)))
+        return np.array([k[:6] for k in klines], dtype=float)
+
+    def sync(self, symbol, interval, start, end):
+        """Download whatever part of start..end is missing from disk. Returns the number of new candles."""
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        start, end = to_ms(start), to_ms(end) + 1
+        # Only closed candles count as covered; a still-open one is fetched again next time
+        end = min(end, int(time.time() * 1000) - INTERVAL_MS[interval] + 1)
+
+        coverage = self._load_coverage(symbol, interval)
+        fetched = 0
+        for gap_start, gap_end in _subtract_ranges(start, end, coverage):
+            logger.info(f"Fetching {symbol} {interval} {gap_start}-{gap_end} from exchange")
+            rows = self._fetch(symbol, interval, gap_start, gap_end)
+            self._write_rows(symbol, interval, rows)
+            coverage.append([gap_start, gap_end])
+            self._save_coverage(symbol, interval, coverage)
+            fetched += len(rows)
+        return fetched
+
+    # === Reading ===
+    def load_array(self, symbol, interval, start, end, sync=True):
+        """
+        Candles with start <= open_time <= end as an (n x 6) float64 array
+        (open_time, open, high, low, close, volume), oldest first.
+        """
+        start, end = to_ms(start), to_ms(end)
+        if sync:
+            self.sync(symbol, interval, start, end)
+        end += 1
+
+        parts = []
+        key = _month_key(start)
+        while _month_start_ms(key) < end:
+            part = self._read_partition(symbol, interval, key)
+            if part is not None:
+                lo, hi = np.searchsorted(part[:, 0], [start, end])
+                if hi > lo:
+                    parts.append(part[lo:hi])
+            key = _next_month_key(key)
+
+        if not parts:
+            return np.empty((0, len(COLUMNS)))
+        return np.concatenate(parts)
+
+    def load(self, symbol, interval, start, end, sync=True):
+        """Same as load_array, as a DataFrame with a datetime 'timestamp' column"""
+        rows = self.load_array(symbol, interval, start, end, sync=sync)
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms')
+        return df
@@ -0,0 +1,229 @@
+# alert_dispatcher.py
+"""
+Background Telegram alert sender for the live bots.
+
+telegram_alert() used to POST to Telegram inline, so a slow API call held
+up the trading code right after an order. Now it only enqueues the message
+(O(1), never blocks) and a single worker thread delivers it over one pooled
+requests.Session:
+
+- Bursts are coalesced: messages that arrive within `coalesce_window` of
+  each other go out as one Telegram message (split at Telegram's 4096
+  character limit).
+- Sends are spaced at least `min_interval` apart, and a 429 from Telegram
+  pauses the worker for the retry_after it asks for.
+- Network errors and 5xx responses are retried with jittered exponential
+  backoff; other 4xx responses (bad token, bad Markdown) are not.
+- A 400 (usually one alert's Markdown that Telegram cannot parse) would
+  lose the whole coalesced batch, so its alerts are resent one by one,
+  and an alert that is still rejected goes out as plain text.
+- The queue is bounded; when it is full the oldest message is dropped so
+  the newest alerts (usually the most relevant) still go out.
+
+Token, chat_id and the enabled flag are read from the config snapshot at
+send time. `alerts.telegram.api_url` overrides the API host, which lets a
+local stub stand in for Telegram (see scripts/check_alert_latency.py).
+"""
+import time
+import queue
+import random
+import atexit
+import logging
+import threading
+
+import requests
+
+from config_service import config_service
+
+DEFAULT_API_URL = 'https://api.telegram.org'
+MAX_MESSAGE_LENGTH = 4096
+
+logger = logging.getLogger(__name__)
+
+
+def group_messages(messages):
+    """Group messages into as few lists as fit Telegram's length limit once joined"""
+    groups, current, length = [], [], 0
+    for message in messages:
+        message = message[:MAX_MESSAGE_LENGTH]
+        if length and length + 2 + len(message) > MAX_MESSAGE_LENGTH:
+            groups.append(current)
+            current, length = [], 0
+        if length:
+            current.append(message)
+            length += 2 + len(message)
+        else:
+            current, length = [message], len(message)
+    if length:
+        groups.append(current)
+    return groups
+
+
+def chunk_messages(messages):
+    """Join messages into as few texts as fit Telegram's length limit"""
+    return ["\n\n".join(group) for group in group_messages(messages)]
+
+
+def _bad_request(error):
+    return error.response is not None and error.response.status_code == 400
+
+
+class AlertDispatcher:
+    def __init__(self, config=config_service, max_queue=200, coalesce_window=1.0, min_interval=1.0,
+                 max_retries=5, timeout=10):
+        """
+        Args:
+            config: Object whose current() returns the config snapshot
+            max_queue (int): Messages held before the oldest is dropped
+            coalesce_window (float): Seconds to wait for more messages to batch into one send
+            min_interval (float): Minimum seconds between two sends (Telegram allows ~1/s per chat)
+            max_retries (int): Attempts per batch before it is dropped
+            timeout (float): HTTP timeout per request
+        """
+        self.config = config
+        self.coalesce_window = coalesce_window
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.sent = 0
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._last_send = 0.0
+        self._thread = threading.Thread(target=self._run, name='telegram-alerts', daemon=True)
+        self._thread.start()
+        atexit.register(self.drain, 5)
+
+    def _settings(self):
+        return self.config.current().get("alerts", {}).get("telegram", {})
+
+    # === Producer side ===
+    def enqueue(self, message):
+        """Queue a message for delivery. Returns immediately."""
+        if not self._settings().get("enabled", False):
+            return False
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return True
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.dropped += 1
+                    logger.warning("Telegram alert queue full, dropped the oldest alert")
+                except queue.Empty:
+                    pass
+
+    def drain(self, timeout=None):
+        """Wait until every queued alert was sent or given up on"""
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout)
+
+    # === Worker ===
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Coalesce whatever arrives shortly after the first message
+            deadline = time.monotonic() + self.coalesce_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            for group in group_messages(batch):
+                try:
+                    self._deliver(group)
+                except Exception as e:
+                    logger.error(f"[TELEGRAM ALERT ERROR] {e}")
+                    print(f"[TELEGRAM ALERT ERROR] {e}")
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _deliver(self, messages):
+        """Send coalesced messages as one text; on a 400, send them one by one, then as plain text"""
+        try:
+            self._send("\n\n".join(messages))
+            return
+        except requests.HTTPError as e:
+            if not _bad_request(e):
+                raise
+            error = e
+
+        if len(messages) == 1:
+            logger.warning(f"Telegram rejected an alert ({error}), resending it without Markdown")
+            self._send(messages[0], parse_mode=None)
+            return
+
+        logger.warning(f"Telegram rejected {len(messages)} coalesced alerts ({error}), sending them one by one")
+        for message in messages:
+            try:
+                self._deliver([message])
+            except Exception as e:
+                logger.error(f"[TELEGRAM ALERT ERROR] {e}")
+                print(f"[TELEGRAM ALERT ERROR] {e}")
+
+    def _send(self, text, parse_mode="Markdown"):
+        settings = self._settings()
+        token = settings.get("token")
+        chat_id = settings.get("chat_id")
+        if not token or not chat_id:
+            logger.warning("Telegram token or chat_id missing")
+            return
+
+        url = f"{settings.get('api_url', DEFAULT_API_URL)}/bot{token}/sendMessage"
+        payload = {"chat_id": chat_id, "text": text}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+
+        for attempt in range(self.max_retries):
+            wait = self.min_interval - (time.monotonic() - self._last_send)
+            if wait > 0:
+                time.sleep(wait)
+            self._last_send = time.monotonic()
+
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = e
+            else:
+                if response.ok:
+                    self.sent += 1
+                    logger.info(f"Telegram alert sent: {text[:50]}...")
+                    return
+                if response.status_code == 429:
+                    try:
+                        retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+                    except ValueError:
+                        retry_after = 1
+                    logger.warning(f"Telegram rate limit hit, retrying in {retry_after}s")
+                    time.sleep(retry_after)
+                    continue
+                if response.status_code < 500:
+                    response.raise_for_status()  # not worth retrying
+                error = requests.HTTPError(f"{response.status_code} from Telegram")
+
+            backoff = min(2 ** attempt, 30) * random.uniform(0.5, 1.5)
+            logger.warning(f"Telegram send failed (attempt {attempt + 1}/{self.max_retries}): {error}. Retrying in {backoff:.1f}s")
+            time.sleep(backoff)
+
+        raise RuntimeError(f"giving up on alert after {self.max_retries} attempts")
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Process-wide dispatcher, started on first use"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher()
+        return _dispatcher
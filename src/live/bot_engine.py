@@ -0,0 +1,377 @@
+# bot_engine.py
+"""
+One trading engine for every live pair.
+
+The engine replaces eth_bot.py, link_bot.py, matic_bot.py, doge_bot.py and
+arb_bot.py. Those were copies of one loop that differed only in symbol,
+strategy and config section. Each coin is now a row in one table, and a
+single worker task runs all of them:
+
+- Pairs come from config.yaml. Any `{coin}_bot` section is a pair; BOT_DEFAULTS
+  holds the old per-file defaults for the original five coins. A new coin
+  needs only a config section naming one of the LIVE_STRATEGIES:
+
+      sol_bot:
+        enabled: true
+        strategy: eth       # reuse the ETH rules
+        quantity: 1
+        interval: '15m'
+
+- Per-pair position and trade settings live in one numpy structured array
+  (STATE_DTYPE). Buy/sell/TP/SL/cooldown decisions for every pair whose
+  candle closed are taken in one vectorised pass.
+- The worker waits on all subscribed kline streams at once with
+  MarketDataService.next_close_any. On each wake it evaluates only the
+  pairs with a new closed candle. Pairs that share a symbol and interval
+  share one frame.
+- Orders, state saves, trade logs and alerts work as before: the shared
+  gateway, state_utils, log_trade and telegram_alert. Each coin still
+  logs to its own {COIN}_live.log.
+
+start_bot/stop_bot switch one pair on or off without touching the others.
+The worker itself runs as the 'engine' task on the BotScheduler, which
+restarts it if it crashes.
+"""
+import time
+import asyncio
+import logging
+import threading
+import traceback
+
+import numpy as np
+from binance.enums import SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET
+
+from bot_base import load_config, log_trade, telegram_alert
+from exchange_gateway import get_gateway
+from state_utils import load_state, save_state
+from strategiesLive import LiveStrategy, LIVE_STRATEGIES
+
+# Defaults of the old per-coin bot files; the {coin}_bot config section overrides them
+BOT_DEFAULTS = {
+    'eth': {'interval': '15m', 'quantity': 0.05, 'tp_pct': 0.04, 'sl_pct': 0.03, 'exit': 'tp_sl'},
+    'link': {'interval': '1h', 'quantity': 15, 'tp_pct': 0.05, 'sl_pct': 0.02},
+    'matic': {'interval': '1h', 'quantity': 30, 'tp_pct': 0.045, 'sl_pct': 0.025},
+    'doge': {'interval': '1h', 'quantity': 500, 'tp_pct': 0.06, 'sl_pct': 0.035, 'frame': 60},
+    'arb': {'interval': '1h', 'quantity': 30, 'tp_pct': 0.045, 'sl_pct': 0.025},
+}
+GENERIC_DEFAULTS = {
+    'interval': '1h',
+    'quantity': 0,
+    'tp_pct': 0.05,
+    'sl_pct': 0.02,
+    'cooldown': 180,
+    'frame': 100,     # closed candles the strategy seeds from (longer windows stay NaN)
+    'exit': 'signal', # 'signal': sell on the exit signal only, 'tp_sl': on take profit / stop loss only
+}
+
+# One row per pair
+STATE_DTYPE = np.dtype([
+    ('active', '?'),
+    ('in_position', '?'),
+    ('tp_sl', '?'),
+    ('entry_price', 'f8'),
+    ('last_trade_time', 'f8'),
+    ('win_count', 'i4'),
+    ('total_trades', 'i4'),
+    ('quantity', 'f8'),
+    ('tp_pct', 'f8'),
+    ('sl_pct', 'f8'),
+    ('cooldown', 'f8'),
+    ('last_candle', 'i8'),  # open time of the last candle evaluated
+])
+
+logger = logging.getLogger(__name__)
+
+
+def bot_settings(coin, config):
+    """Settings of one pair: generic defaults < BOT_DEFAULTS < the config section"""
+    settings = dict(GENERIC_DEFAULTS, **BOT_DEFAULTS.get(coin, {}))
+    settings.update(config.get(f'{coin}_bot', {}))
+    settings.setdefault('symbol', f"{coin.upper()}USDT")
+    settings.setdefault('strategy', coin)
+    return settings
+
+
+def configured_bots(config):
+    """Every coin the engine can trade: the built-in five plus any {coin}_bot section with a known strategy"""
+    coins = list(BOT_DEFAULTS)
+    for name in config:
+        if name.endswith('_bot') and name[:-4] not in coins:
+            if bot_settings(name[:-4], config)['strategy'] in LIVE_STRATEGIES:
+                coins.append(name[:-4])
+    return coins
+
+
+class Slot:
+    """The non-numeric part of a pair's row"""
+    __slots__ = ('coin', 'symbol', 'interval', 'frame', 'strategy', 'logger')
+
+    def __init__(self, coin, get_logger):
+        self.coin = coin
+        self.symbol = None
+        self.interval = None
+        self.frame = None
+        self.strategy = None
+        self.logger = get_logger(coin.upper())
+
+
+class BotEngine:
+    def __init__(self, get_logger, market_data=None):
+        """
+        Args:
+            get_logger: Callable returning the logger for a coin (e.g. bot_base.get_logger)
+            market_data (MarketDataService): Shared kline feed (set by run() when started by the scheduler)
+        """
+        self.get_logger = get_logger
+        self.market_data = market_data
+        self.table = np.zeros(0, dtype=STATE_DTYPE)
+        self.slots = []
+        self.rows = {}  # coin -> row in table/slots
+        self.stopped = set()
+        self.loop = None
+        self._wake = None
+        self._warmup = None
+        self._config_version = None
+        self._lock = threading.Lock()
+
+    # === Pair control (any thread) ===
+    def _row(self, coin):
+        row = self.rows.get(coin)
+        if row is None:
+            row = len(self.slots)
+            self.table = np.resize(self.table, row + 1)
+            self.table[row] = np.zeros(1, dtype=STATE_DTYPE)[0]
+            self.table['last_candle'][row] = -1
+            self.slots.append(Slot(coin, self.get_logger))
+            self.rows[coin] = row
+            self._configure(row, load_config())
+            self._load_state(row)
+        return row
+
+    def start_bot(self, coin):
+        if coin not in configured_bots(load_config()):
+            return f"Unknown bot: {coin}"
+        with self._lock:
+            row = self._row(coin)
+            if self.table['active'][row]:
+                return f"{coin.upper()} bot already running."
+            self.table['active'][row] = True
+            self.table['last_candle'][row] = -1  # evaluate right away, like a freshly started bot
+            self.stopped.discard(coin)
+        self.slots[row].logger.info(f"🟢 {coin.upper()} bot started.")
+        self._notify()
+        return f"{coin.upper()} bot started."
+
+    def stop_bot(self, coin):
+        with self._lock:
+            row = self.rows.get(coin)
+            if row is None or not self.table['active'][row]:
+                return f"{coin.upper()} bot not running."
+            self.table['active'][row] = False
+            self.stopped.add(coin)
+        self.slots[row].logger.info(f"🛑 {coin.upper()} bot stopped.")
+        self._notify()
+        return f"{coin.upper()} bot stopped."
+
+    def is_running(self, coin):
+        row = self.rows.get(coin)
+        return row is not None and bool(self.table['active'][row])
+
+    def stop_requested(self, coin):
+        return coin in self.stopped
+
+    def _notify(self):
+        """Wake the worker so it picks up a started or stopped pair"""
+        loop, wake = self.loop, self._wake
+        if loop is not None and wake is not None:
+            loop.call_soon_threadsafe(wake.set)
+
+    # === Table maintenance ===
+    def _configure(self, row, config):
+        slot = self.slots[row]
+        settings = bot_settings(slot.coin, config)
+        entry = self.table[row:row + 1]
+        entry['quantity'] = settings['quantity']
+        entry['tp_pct'] = settings['tp_pct']
+        entry['sl_pct'] = settings['sl_pct']
+        entry['cooldown'] = settings['cooldown']
+        entry['tp_sl'] = settings['exit'] == 'tp_sl'
+        slot.frame = settings['frame']
+        if (settings['symbol'], settings['interval'], settings['strategy']) != (slot.symbol, slot.interval, getattr(slot.strategy, 'name', None)):
+            # New stream or rules: start the indicators over on the next candle
+            slot.symbol, slot.interval = settings['symbol'], settings['interval']
+            slot.strategy = LiveStrategy(settings['strategy'], settings['frame'])
+            entry['last_candle'] = -1
+        slot.strategy.frame = settings['frame']
+
+    def _set(self, row, **fields):
+        # Always write to the current table; start_bot may have grown it since the row was read
+        with self._lock:
+            for name, value in fields.items():
+                self.table[name][row] = value
+
+    def _load_state(self, row):
+        state = load_state(self.slots[row].symbol)
+        entry = self.table[row:row + 1]
+        entry['in_position'] = state.get("in_position", False)
+        entry['entry_price'] = state.get("entry_price", 0)
+        entry['last_trade_time'] = state.get("last_trade_time", 0)
+        entry['win_count'] = state.get("win_count", 0)
+        entry['total_trades'] = state.get("total_trades", 0)
+
+    def _save_state(self, row):
+        entry = self.table[row]
+        save_state(self.slots[row].symbol, {
+            "in_position": bool(entry['in_position']),
+            "entry_price": float(entry['entry_price']),
+            "last_trade_time": float(entry['last_trade_time']),
+            "win_count": int(entry['win_count']),
+            "total_trades": int(entry['total_trades'])
+        })
+
+    def subscriptions(self):
+        """(symbol, interval) of every active pair"""
+        with self._lock:
+            return sorted({(self.slots[row].symbol, self.slots[row].interval)
+                           for row in np.flatnonzero(self.table['active'])})
+
+    # === Evaluation (worker thread) ===
+    def due_rows(self):
+        """Active pairs with a closed candle they have not been evaluated on"""
+        with self._lock:
+            rows = np.flatnonzero(self.table['active'])
+            last_candle = self.table['last_candle'][rows]
+            streams = [(self.slots[row].symbol, self.slots[row].interval) for row in rows]
+        due = []
+        for row, last, (symbol, interval) in zip(rows, last_candle, streams):
+            buffer = self.market_data.buffers.get((symbol, interval))
+            if buffer is None:
+                buffer = self.market_data.subscribe(symbol, interval)
+            if last < 0 or buffer.last_open_time() > last:
+                due.append(row)
+        return np.array(due, dtype=np.intp)
+
+    def tick(self):
+        config = load_config()
+        if getattr(config, 'version', None) != self._config_version:
+            with self._lock:
+                for row in range(len(self.slots)):
+                    self._configure(row, config)
+            self._config_version = getattr(config, 'version', None)
+        mode = config.get('trading', {}).get('mode', 'test')
+
+        rows = self.due_rows()
+        if not len(rows):
+            return
+
+        # Strategies for every due pair; pairs on the same stream share one read of the buffer
+        frames = {}
+        entries = np.zeros(len(rows), dtype=bool)
+        exits = np.zeros(len(rows), dtype=bool)
+        price = np.full(len(rows), np.nan)
+        for i, row in enumerate(rows):
+            slot = self.slots[row]
+            try:
+                key = (slot.symbol, slot.interval, slot.frame)
+                if key not in frames:
+                    frames[key] = self.market_data.candles(*key)
+                candles = frames[key]
+                if not candles:
+                    continue
+                entries[i], exits[i], price[i] = slot.strategy.on_candles(candles)
+                self._set(row, last_candle=candles[-1][0])
+            except Exception as e:
+                slot.logger.error(f"❌ Exception: {type(e).__name__} - {str(e)}")
+                slot.logger.error(traceback.format_exc())
+
+        # Trade decisions for all of them at once
+        state = self.table[rows]
+        now = time.time()
+        ready = now - state['last_trade_time'] > state['cooldown']
+        tp_sl = state['tp_sl'] & ((price >= state['entry_price'] * (1 + state['tp_pct']))
+                                  | (price <= state['entry_price'] * (1 - state['sl_pct'])))
+        buys = ~state['in_position'] & entries & ready
+        sells = state['in_position'] & np.where(state['tp_sl'], tp_sl, exits) & ready
+
+        for i, row in enumerate(rows):
+            if np.isnan(price[i]):
+                continue
+            try:
+                if buys[i]:
+                    self._buy(row, float(price[i]), mode)
+                elif sells[i]:
+                    self._sell(row, float(price[i]), mode)
+                elif state['in_position'][i]:
+                    self.slots[row].logger.info("🕐 Holding position...")
+                else:
+                    self.slots[row].logger.info("No action taken.")
+            except Exception as e:
+                self.slots[row].logger.error(f"❌ Exception: {type(e).__name__} - {str(e)}")
+                self.slots[row].logger.error(traceback.format_exc())
+
+    def _buy(self, row, price, mode):
+        slot = self.slots[row]
+        quantity = float(self.table['quantity'][row])
+        if mode == "live":
+            get_gateway().call('order_market_buy', symbol=slot.symbol, quantity=quantity)
+            slot.logger.info(f"🟢 LIVE BUY ORDER PLACED at {price}")
+        else:
+            get_gateway().call('create_test_order', symbol=slot.symbol, side=SIDE_BUY, type=ORDER_TYPE_MARKET, quantity=quantity)
+            slot.logger.info(f"🧪 TEST BUY ORDER at {price}")
+
+        self._set(row, in_position=True, entry_price=price, last_trade_time=time.time())
+        self._save_state(row)
+        log_trade(slot.symbol, 'buy', price)
+        telegram_alert(f"🟢 *{slot.symbol} BUY* at `${price}`")
+
+    def _sell(self, row, price, mode):
+        slot = self.slots[row]
+        quantity = float(self.table['quantity'][row])
+        if mode == "live":
+            get_gateway().call('order_market_sell', symbol=slot.symbol, quantity=quantity)
+            slot.logger.info(f"🔴 LIVE SELL ORDER PLACED at {price}")
+        else:
+            get_gateway().call('create_test_order', symbol=slot.symbol, side=SIDE_SELL, type=ORDER_TYPE_MARKET, quantity=quantity)
+            slot.logger.info(f"🧪 TEST SELL ORDER at {price}")
+
+        state = self.table[row]
+        pnl = price - float(state['entry_price'])
+        win_count = int(state['win_count']) + (1 if pnl > 0 else 0)
+        total_trades = int(state['total_trades']) + 1
+        self._set(row, in_position=False, entry_price=0, last_trade_time=time.time(),
+                  win_count=win_count, total_trades=total_trades)
+        self._save_state(row)
+        log_trade(slot.symbol, 'sell', price, pnl)
+        slot.logger.info(f"📊 PnL: {round(pnl, 3)} | Win Rate: {win_count}/{total_trades}")
+        telegram_alert(
+            f"🔴 *{slot.symbol} SELL* at `${price}`\n"
+            f"PnL: `${round(pnl, 3)}`\n"
+            f"Win Rate: `{win_count}/{total_trades}`"
+        )
+
+    # === Worker ===
+    async def run(self, logger, stop_event, market_data):
+        """Scheduler entry point: evaluate every active pair on each candle close until stopped"""
+        self.market_data = market_data
+        self.loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+
+        # Shared Client, connection pool and rate limit for every pair. The Client
+        # pings Binance when it is built, so it warms up in the background and the
+        # first kline backfill does not wait for it (an early order would)
+        def warmed_up(task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f"⚠️ Binance client warm-up failed ({task.exception()}); retrying on first use")
+
+        self._warmup = asyncio.ensure_future(asyncio.to_thread(getattr, get_gateway(), 'client'))
+        self._warmup.add_done_callback(warmed_up)
+        logger.info("🟢 Bot engine started.")
+
+        while not stop_event.is_set():
+            self._wake.clear()
+            # Blocking REST and order calls run off the event loop
+            await asyncio.to_thread(self.tick)
+            # Wait for the next close on any active pair (or a pair being started/stopped)
+            await market_data.next_close_any(self.subscriptions(), stop_event, self._wake)
+
+        logger.info("🛑 Bot engine stopped.")
@@ -0,0 +1,126 @@
+# bot_scheduler.py
+"""
+Asyncio scheduler for the live bots.
+
+Every bot runs as a task on one event loop, which lives in a single
+background thread started on first use, so live_trading_manager and the
+Telegram bot (which has its own loop) can both call start_bot/stop_bot from
+their own threads. A bot coroutine awaits its next candle close between
+ticks and does its blocking REST and order calls in asyncio.to_thread, so
+an idle bot costs no thread and no wakeups.
+
+Stopping is cooperative: stop_bot sets the bot's asyncio.Event, which ends
+its wait for the next candle, and the bot returns after finishing the tick
+it is in. Supervision uses task done-callbacks: a bot that crashes, or
+returns without being asked to stop, is restarted after restart_delay.
+"""
+import asyncio
+import threading
+import concurrent.futures
+
+
+class BotScheduler:
+    def __init__(self, bots, market_data, get_logger, restart_delay=30):
+        """
+        Args:
+            bots (dict): Bot name -> coroutine function (logger, stop_event, market_data)
+            market_data (MarketDataService): Shared kline feed passed to every bot
+            get_logger: Callable returning the logger for a bot name
+            restart_delay (float): Seconds to wait before restarting a crashed bot
+        """
+        self.bots = bots
+        self.market_data = market_data
+        self.get_logger = get_logger
+        self.restart_delay = restart_delay
+        self.tasks = {}
+        self.stop_events = {}
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # === Event loop ===
+    def ensure_loop(self):
+        """Start the scheduler's event loop thread if it is not running yet"""
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self.loop.run_forever, name='bot-scheduler', daemon=True)
+                self._thread.start()
+        return self.loop
+
+    def _call(self, fn, *args):
+        """Run fn(*args) on the loop thread and return its result"""
+        loop = self.ensure_loop()
+        if threading.current_thread() is self._thread:
+            return fn(*args)
+        future = concurrent.futures.Future()
+
+        def run():
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        loop.call_soon_threadsafe(run)
+        return future.result(timeout=10)
+
+    def spawn(self, coro):
+        """Run a background coroutine (e.g. the config watcher) on the scheduler loop"""
+        return asyncio.run_coroutine_threadsafe(coro, self.ensure_loop())
+
+    def join(self):
+        """Block the calling thread for as long as the scheduler loop runs"""
+        self.ensure_loop()
+        self._thread.join()
+
+    # === Bot control ===
+    def start_bot(self, name):
+        if name not in self.bots:
+            return f"Unknown bot: {name}"
+        self.market_data.start()  # no-op once the stream is running
+        return self._call(self._start, name)
+
+    def stop_bot(self, name):
+        return self._call(self._stop, name)
+
+    def is_running(self, name):
+        task = self.tasks.get(name)
+        return task is not None and not task.done()
+
+    def stop_requested(self, name):
+        return name in self.stop_events and self.stop_events[name].is_set()
+
+    def _start(self, name):
+        if self.is_running(name):
+            return f"{name.upper()} bot already running."
+
+        stop_event = asyncio.Event()
+        self.stop_events[name] = stop_event
+        task = self.loop.create_task(self.bots[name](self.get_logger(name.upper()), stop_event, self.market_data),
+                                     name=f"{name}-bot")
+        task.add_done_callback(lambda t: self._on_done(name, t))
+        self.tasks[name] = task
+        return f"{name.upper()} bot started."
+
+    def _stop(self, name):
+        # Also covers a crashed bot waiting for its restart
+        if name in self.stop_events and not self.stop_events[name].is_set():
+            self.stop_events[name].set()
+            return f"{name.upper()} bot stopping..."
+        return f"{name.upper()} bot not running."
+
+    # === Supervision ===
+    def _on_done(self, name, task):
+        if self.tasks.get(name) is not task or task.cancelled() or self.stop_events[name].is_set():
+            return
+
+        error = task.exception()
+        if error is not None:
+            self.get_logger(name.upper()).error(f"[{name.upper()} BOT CRASHED] {error}")
+        print(f"[{name.upper()} Watchdog] ⚠️ Bot {'crashed' if error else 'exited'}. Restarting in {self.restart_delay}s...")
+        self.loop.call_later(self.restart_delay, self._restart, name, task)
+
+    def _restart(self, name, task):
+        # Skip if the bot was started or stopped by hand in the meantime
+        if self.tasks.get(name) is task and not self.stop_events[name].is_set():
+            self._start(name)
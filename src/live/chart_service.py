@@ -0,0 +1,288 @@
+# chart_service.py
+"""
+Off-thread chart rendering for the Telegram bot.
+
+generate_trade_chart and generate_sentiment_chart used to draw with
+pyplot's global figure state inside the async Telegram handlers. Every
+render blocked the event loop for a few hundred milliseconds, and two
+renders at once could draw into each other's figure. Now:
+
+- Rendering uses matplotlib's object-oriented Figure API: one Figure per
+  chart, no pyplot and no shared state. render_trade_chart and
+  render_sentiment_chart are plain functions that take picklable inputs
+  and return PNG bytes. They can run anywhere.
+- ChartService runs them in a small worker process pool, so neither
+  matplotlib's CPU time nor the GIL reaches the bot's event loop.
+  Workers are spawned, not forked, so they never inherit the bot's
+  threads and locks. They import matplotlib on their first chart.
+- PNGs are cached (LRU) under a key made of the chart type, its
+  parameters and the version of its data:
+  - for trade charts, the trades CSV's mtime and size, plus the window
+    start rounded to the hour;
+  - for sentiment charts, the analysis timestamp.
+  A repeated request for unchanged data is answered from memory without
+  touching the pool. Concurrent requests for the same chart share one
+  render.
+
+Handlers await trade_chart()/sentiment_chart(). Both resolve to PNG
+bytes, or None when there is nothing to draw or rendering failed.
+"""
+import os
+import io
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+LIVE_BACKUP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'liveBackup'))
+
+logger = logging.getLogger(__name__)
+
+
+# === Renderers (run in the worker processes) ===
+def _png(fig):
+    buf = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format='png', dpi=100)
+    return buf.getvalue()
+
+
+def render_trade_chart(trades_file, coin, days, now=None):
+    """
+    Cumulative profit of a coin's sell trades over the last `days` days
+
+    Args:
+        trades_file (str): The coin's {COIN}_after_tariff_trades.csv
+        coin (str): Coin symbol (e.g. "ETH"), used in the title
+        days (int): Number of days to include
+        now (datetime): End of the window (defaults to now)
+
+    Returns:
+        bytes: PNG image data, or None when there is nothing to plot
+    """
+    import pandas as pd
+    from matplotlib.figure import Figure
+
+    if not os.path.exists(trades_file):
+        logger.warning(f"No trade data found for {coin}")
+        return None
+
+    trades_df = pd.read_csv(trades_file)
+    if trades_df.empty:
+        logger.warning(f"Empty trade data for {coin}")
+        return None
+
+    trades_df['timestamp'] = pd.to_datetime(trades_df['timestamp'])
+    start_date = (now or datetime.now()) - timedelta(days=days)
+    filtered_df = trades_df[trades_df['timestamp'] >= start_date]
+    if filtered_df.empty:
+        logger.warning(f"No recent trades for {coin} in the last {days} days")
+        return None
+
+    sell_trades = filtered_df[(filtered_df['type'] == 'SELL') & (~filtered_df['profit'].isna())]
+    if sell_trades.empty:
+        logger.warning(f"No sell trades with profit data for {coin}")
+        return None
+    cumulative_profit = sell_trades['profit'].cumsum()
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    ax.plot(sell_trades['timestamp'], cumulative_profit, 'b-', linewidth=2)
+    ax.fill_between(sell_trades['timestamp'], 0, cumulative_profit, alpha=0.3, color='blue')
+    ax.set_title(f'{coin} Profit/Loss Over Time (Last {days} Days)', fontsize=16)
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel('Cumulative Profit ($)', fontsize=12)
+    ax.grid(True, alpha=0.3)
+    return _png(fig)
+
+
+def render_sentiment_chart(coin, distribution, timeline):
+    """
+    Sentiment distribution bars and the daily sentiment timeline
+
+    Args:
+        coin (str): Coin symbol
+        distribution (dict): {sentiment category: number of posts}
+        timeline (list): (date_str, weighted_sentiment) per day
+
+    Returns:
+        bytes: PNG image data
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 8))
+    ax1, ax2 = fig.subplots(2, 1)
+
+    # Chart 1: Sentiment Distribution
+    colors = ['#d7301f', '#fc8d59', '#fee08b', '#78c679', '#1a9641']
+    bars = ax1.bar(list(distribution.keys()), list(distribution.values()), color=colors)
+    ax1.set_title(f"Sentiment Distribution for {coin}")
+    ax1.set_ylabel('Number of Posts')
+    ax1.grid(axis='y', linestyle='--', alpha=0.7)
+    for bar in bars:
+        height = bar.get_height()
+        ax1.annotate(f'{height}',
+                     xy=(bar.get_x() + bar.get_width() / 2, height),
+                     xytext=(0, 3),  # 3 points vertical offset
+                     textcoords="offset points",
+                     ha='center', va='bottom')
+
+    # Chart 2: Sentiment Timeline
+    if timeline:
+        dates = [date for date, _ in timeline]
+        sentiments = [sentiment for _, sentiment in timeline]
+        point_colors = ['#d7301f' if s < -0.2 else '#fee08b' if s < 0.2 else '#1a9641' for s in sentiments]
+
+        ax2.plot(dates, sentiments, marker='o', linestyle='-', color='#5a9bd5')
+        ax2.scatter(dates, sentiments, c=point_colors, s=50, zorder=5)
+        ax2.axhline(y=0, color='gray', linestyle='--', alpha=0.7)
+
+        # Color zones for the sentiment categories
+        ax2.axhspan(-1, -0.2, alpha=0.1, color='red')
+        ax2.axhspan(-0.2, 0.2, alpha=0.1, color='yellow')
+        ax2.axhspan(0.2, 1, alpha=0.1, color='green')
+
+        ax2.set_title(f"Sentiment Timeline for {coin}")
+        ax2.set_ylabel('Sentiment Score')
+        ax2.set_xlabel('Date')
+        ax2.grid(True, linestyle='--', alpha=0.7)
+        for label in ax2.get_xticklabels():
+            label.set_rotation(45)
+            label.set_horizontalalignment('right')
+    else:
+        ax2.text(0.5, 0.5, "No timeline data available",
+                 horizontalalignment='center', verticalalignment='center',
+                 transform=ax2.transAxes)
+    return _png(fig)
+
+
+def sentiment_chart_args(sentiment_result):
+    """render_sentiment_chart arguments from an analyze_coin_sentiment result"""
+    timeline = [(record['date_str'], float(record['weighted_sentiment']))
+                for record in sentiment_result.get('timeline_data') or []]
+    return sentiment_result['coin'], dict(sentiment_result['sentiment_distribution']), timeline
+
+
+# === Service (bot process) ===
+class ChartService:
+    def __init__(self, workers=1, cache_size=64, backup_dir=LIVE_BACKUP_DIR):
+        """
+        Args:
+            workers (int): Rendering processes
+            cache_size (int): PNGs kept in memory
+            backup_dir (str): Folder with the {COIN}_after_tariff_trades.csv files
+        """
+        self.workers = workers
+        self.cache_size = cache_size
+        self.backup_dir = backup_dir
+        self.hits = 0
+        self.renders = 0
+
+        self._cache = OrderedDict()  # key -> PNG bytes (or None: nothing to plot)
+        self._pending = {}           # key -> concurrent.futures.Future of a running render
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def _submit(self, key, fn, *args):
+        """Cached PNG, or the future of a render shared by everyone asking for this key"""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key], None
+            future = self._pending.get(key)
+            if future is not None:
+                return None, future
+            try:
+                future = self._executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM); start a fresh pool
+                self._pool.shutdown(wait=False)
+                self._pool = None
+                future = self._executor().submit(fn, *args)
+            self._pending[key] = future
+            self.renders += 1
+        # Outside the lock: the callback runs right away if the render already finished
+        future.add_done_callback(lambda f: self._store(key, f))
+        return None, future
+
+    def _store(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return  # failures are not cached; the next request retries
+            self._cache[key] = future.result()
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def render(self, key, fn, *args):
+        """
+        PNG for `key`, rendered by fn(*args) in the pool on a cache miss
+
+        Returns:
+            bytes: PNG image data, or None if fn had nothing to draw or failed
+        """
+        png, future = self._submit(key, fn, *args)
+        if future is None:
+            return png
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.error(f"Error rendering chart {key[0]}: {type(e).__name__} - {str(e)}")
+            return None
+
+    # === Charts ===
+    async def trade_chart(self, symbol, days=30):
+        """Cumulative profit chart of a coin (same output as bot_base.generate_trade_chart)"""
+        coin = symbol.upper().replace('USDT', '')
+        trades_file = os.path.join(self.backup_dir, f"{coin}_after_tariff_trades.csv")
+        try:
+            st = os.stat(trades_file)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+        # The window moves with the clock; an hour's drift is close enough for a cached chart
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+        return await self.render(('trades', coin, days, version, now), render_trade_chart, trades_file, coin, days, now)
+
+    async def sentiment_chart(self, sentiment_result):
+        """Chart of an analyze_coin_sentiment result; cached per coin and analysis run"""
+        args = sentiment_chart_args(sentiment_result)
+        timestamp = sentiment_result.get('timestamp')
+        version = timestamp.isoformat() if timestamp is not None else time.time()
+        return await self.render(('sentiment', args[0], version), render_sentiment_chart, *args)
+
+    def stats(self):
+        with self._lock:
+            return {"cached": len(self._cache), "hits": self.hits, "renders": self.renders,
+                    "rendering": len(self._pending)}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_chart_service():
+    """Process-wide chart service (its worker starts on the first render)"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ChartService()
+        return _service
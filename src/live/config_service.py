@@ -0,0 +1,206 @@
+# config_service.py
+"""
+Cached config.yaml for the live bots.
+
+The file is parsed once into an immutable ConfigSnapshot and only parsed
+again when its mtime or size changes. Readers call current(), which returns
+the published snapshot without taking a lock; at most once every
+`check_interval` seconds it also stats the file to spot an edit. A reload
+is validated against SCHEMA before it is published, so every bot moves to
+the new settings at once and a broken edit leaves the last good config in
+place (with an error in the log) instead of half-applying.
+
+Snapshots behave like the dict yaml.safe_load returned (config.get(...),
+config['binance'][...]), but nested sections are read-only mappings and
+lists are tuples, so no caller can change the config another bot sees.
+"""
+import os
+import time
+import logging
+import threading
+from types import MappingProxyType
+
+import yaml
+
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'))
+
+INTERVALS = ('1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '8h', '12h', '1d')
+
+# Expected types of the settings the live code reads; unknown keys are allowed.
+# A tuple lists the allowed values, a type the allowed type.
+NUMBER = (int, float)
+BOT_SCHEMA = {
+    'enabled': bool,
+    'quantity': NUMBER,
+    'tp_pct': NUMBER,
+    'sl_pct': NUMBER,
+    'interval': INTERVALS,
+    'max_trades': int,
+    'cooldown': NUMBER,
+    'symbol': str,
+    'strategy': str,
+    'exit': ('signal', 'tp_sl'),
+    'frame': int,
+}
+SCHEMA = {
+    'trading': {'mode': ('test', 'live')},
+    'binance': {'api_key': str, 'secret_key': str, 'enable_rate_limit': bool, 'weight_limit': int},
+    'alerts': {'telegram': dict},
+    'market_data': {'ws_url': str, 'rest_url': str, 'buffer_size': int},
+}
+
+# Used when the very first load fails, like bot_base.load_config always did
+FALLBACK_CONFIG = {
+    "trading": {"mode": "test"},
+    "alerts": {"telegram": {"enabled": False}}
+}
+
+logger = logging.getLogger(__name__)
+
+
+def freeze(value):
+    """Deep read-only copy of parsed YAML: dicts become mappingproxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _check(section_name, section, schema):
+    errors = []
+    if not isinstance(section, dict):
+        return [f"{section_name}: expected a mapping, got {type(section).__name__}"]
+    for key, expected in schema.items():
+        if key not in section:
+            continue
+        value = section[key]
+        if isinstance(expected, tuple) and all(isinstance(v, str) for v in expected):
+            if value not in expected:
+                errors.append(f"{section_name}.{key}: {value!r} is not one of {', '.join(expected)}")
+        elif isinstance(value, bool) and expected is not bool:
+            errors.append(f"{section_name}.{key}: expected a number, got a boolean")
+        elif not isinstance(value, expected):
+            errors.append(f"{section_name}.{key}: unexpected type {type(value).__name__}")
+    return errors
+
+
+def validate(config):
+    """List of problems with a parsed config (empty when it is usable)"""
+    if not isinstance(config, dict):
+        return ["config root must be a mapping"]
+    errors = []
+    for name, schema in SCHEMA.items():
+        if name in config:
+            errors += _check(name, config[name], schema)
+    for name, section in config.items():
+        if name.endswith('_bot'):
+            errors += _check(name, section, BOT_SCHEMA)
+    return errors
+
+
+class ConfigSnapshot:
+    """Immutable parsed config; use it like the dict from yaml.safe_load"""
+    __slots__ = ('data', 'version', 'mtime', 'loaded_at')
+
+    def __init__(self, data, version, mtime):
+        object.__setattr__(self, 'data', freeze(data))
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'mtime', mtime)
+        object.__setattr__(self, 'loaded_at', time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is read-only")
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def items(self):
+        return self.data.items()
+
+
+class ConfigService:
+    def __init__(self, path=CONFIG_PATH, check_interval=5.0):
+        """
+        Args:
+            path (str): YAML file to serve
+            check_interval (float): Minimum seconds between mtime checks
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._signature = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def current(self):
+        """Latest good snapshot; reloads first if the file changed since the last check"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - self._checked >= self.check_interval:
+            snapshot = self.reload()
+        return snapshot
+
+    def reload(self, force=False):
+        """Re-read the file if it changed (or always with force). Returns the current snapshot."""
+        with self._lock:
+            self._checked = time.monotonic()
+            signature = self._file_signature()
+            if self._snapshot is not None and signature == self._signature and not force:
+                return self._snapshot
+
+            previous = self._snapshot
+            try:
+                with open(self.path, 'r') as f:
+                    data = yaml.safe_load(f) or {}
+                errors = validate(data)
+                if errors:
+                    raise ValueError("; ".join(errors))
+            except Exception as e:
+                logger.error(f"Error loading config: {str(e)}")
+                if previous is None:
+                    self._snapshot = ConfigSnapshot(FALLBACK_CONFIG, 0, None)
+                # Remember the bad file so it is not re-parsed on every check
+                self._signature = signature
+                return self._snapshot
+
+            version = previous.version + 1 if previous is not None else 1
+            self._snapshot = ConfigSnapshot(data, version, signature[0] if signature else None)
+            self._signature = signature
+            logger.info(f"Config loaded successfully (version {version})")
+            snapshot = self._snapshot
+
+        if previous is not None:
+            for callback in list(self._listeners):
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.error(f"Config listener failed: {e}")
+        return snapshot
+
+    def subscribe(self, callback):
+        """Call callback(snapshot) after each successful reload"""
+        self._listeners.append(callback)
+
+
+# The live bots' config, shared by every module in the process
+config_service = ConfigService()
@@ -0,0 +1,341 @@
+# exchange_gateway.py
+"""
+Shared Binance gateway for the live bots.
+
+Every bot used to open its own Client (its own HTTP session) and retried
+failed calls with a blind sleep, so nothing knew how much of Binance's
+request-weight budget the process had already spent; adding symbols meant
+429s. Now all REST traffic - the bots' orders and the market-data
+backfill - goes through one ExchangeGateway:
+
+- One python-binance Client and one keep-alive requests.Session, shared
+  by every bot thread.
+- A token bucket holding the per-minute weight budget. Each call takes
+  its weight (WEIGHTS) before it is sent. The bucket is corrected from the
+  X-MBX-USED-WEIGHT-1M header on every response, so weight spent by other
+  processes on the same IP is counted too.
+- Priorities: order calls always go first. Market-data calls may not dip
+  into the last `reserve` share of the budget, so an order never waits
+  behind a backfill storm.
+- A 429/418 pauses every caller for the Retry-After Binance asks for.
+  Network errors and 5xx responses are retried with jittered exponential
+  backoff, but only while the retry budget lasts (about one retry per ten
+  successful calls), so retries cannot snowball into a ban. Other 4xx
+  errors (bad quantity, insufficient balance) are raised right away.
+- Orders are not blindly retried: after a timeout or a 5xx the order may
+  have been filled anyway, and sending it again would double the
+  position. Every new order carries a newClientOrderId, and before a
+  retry the gateway looks it up with get_order. If Binance has it, that
+  order is returned; only an "order does not exist" answer sends it
+  again.
+
+`binance.enable_rate_limit: false` in config.yaml turns the local bucket
+off; the used-weight tracking and the 429 handling stay on.
+"""
+import time
+import uuid
+import heapq
+import random
+import logging
+import itertools
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config_service import config_service
+
+# Priorities, lower goes first
+ORDER = 0
+MARKET_DATA = 1
+
+# Request weight of the endpoints the live code uses (Binance spot, per call)
+WEIGHTS = {
+    'order_market_buy': 1,
+    'order_market_sell': 1,
+    'create_order': 1,
+    'create_test_order': 1,
+    'get_order': 4,
+    'cancel_order': 1,
+    'get_klines': 2,
+    'get_symbol_ticker': 2,
+    'get_account': 20,
+    'get_exchange_info': 20,
+}
+ORDER_METHODS = {'order_market_buy', 'order_market_sell', 'create_order', 'create_test_order', 'cancel_order'}
+NEW_ORDER_METHODS = {'order_market_buy', 'order_market_sell', 'create_order'}  # not safe to send twice
+
+UNKNOWN_ORDER = -2013  # Binance error code for "Order does not exist."
+
+DEFAULT_WEIGHT_LIMIT = 6000  # Binance spot REQUEST_WEIGHT per minute
+
+logger = logging.getLogger(__name__)
+
+
+def _status_code(error):
+    """HTTP status of a failed call (BinanceAPIException or requests.HTTPError), None for network errors"""
+    status = getattr(error, 'status_code', None)
+    if status is None and getattr(error, 'response', None) is not None:
+        status = getattr(error.response, 'status_code', None)
+    return status
+
+
+def _retry_after(error, default=60):
+    response = getattr(error, 'response', None)
+    try:
+        return float(response.headers.get('Retry-After', default))
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+
+class ExchangeGateway:
+    def __init__(self, api_key=None, secret_key=None, weight_limit=DEFAULT_WEIGHT_LIMIT, enabled=True,
+                 reserve=0.2, safety=0.9, max_retries=3, client_factory=None):
+        """
+        Args:
+            api_key (str): Binance API key
+            secret_key (str): Binance secret key
+            weight_limit (int): Request weight Binance allows per minute
+            enabled (bool): Enforce the local token bucket
+            reserve (float): Share of the budget only order calls may use
+            safety (float): Share of weight_limit the bucket hands out (headroom for other clients)
+            max_retries (int): Retries per call on network errors, 5xx and 429
+            client_factory (callable): Builds the Client (defaults to binance.client.Client)
+        """
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.enabled = enabled
+        self.capacity = weight_limit * safety
+        self.rate = self.capacity / 60.0
+        self.reserve = self.capacity * reserve
+        self.max_retries = max_retries
+        self.client_factory = client_factory
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.used_weight = 0
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._tokens = self.capacity
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._retry_tokens = 10.0
+
+    @classmethod
+    def from_config(cls, config):
+        cfg = config.get('binance', {})
+        return cls(api_key=cfg.get('api_key'),
+                   secret_key=cfg.get('secret_key'),
+                   weight_limit=cfg.get('weight_limit', DEFAULT_WEIGHT_LIMIT),
+                   enabled=cfg.get('enable_rate_limit', True))
+
+    # === Client ===
+    @property
+    def client(self):
+        """The shared Client, created on first use (its constructor pings Binance)"""
+        with self._client_lock:
+            if self._client is None:
+                factory = self.client_factory
+                if factory is None:
+                    from binance.client import Client as factory
+                client = factory(self.api_key, self.secret_key)
+                # Send the client's signed calls over the shared connection pool
+                own_session = getattr(client, 'session', None)
+                if own_session is not None:
+                    self.session.headers.update(own_session.headers)
+                    own_session.close()
+                    client.session = self.session
+                self._client = client
+            return self._client
+
+    # === Token bucket ===
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self, weight, priority=MARKET_DATA):
+        """Block until `weight` can be spent; higher-priority callers are served first"""
+        weight = min(weight, self.capacity)
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._paused_until - now
+                    if wait <= 0:
+                        if self._waiters[0] != ticket:
+                            wait = None  # woken when the caller ahead is through
+                        elif not self.enabled:
+                            return
+                        else:
+                            floor = 0 if priority == ORDER else self.reserve
+                            if self._tokens - weight >= floor:
+                                self._tokens -= weight
+                                return
+                            wait = (weight + floor - self._tokens) / self.rate
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def _record(self, headers):
+        """Sync the bucket with the weight Binance says this IP has used this minute"""
+        if headers is None:
+            return
+        used = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('x-mbx-used-weight-1m')
+        if used is None:
+            return
+        used = int(used)
+        with self._cond:
+            self.used_weight = used
+            self._tokens = min(self._tokens, self.capacity - used)
+        if used > self.capacity:
+            logger.warning(f"⚠️ Binance used weight at {used}, close to the limit")
+
+    def _pause(self, seconds):
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+            self._cond.notify_all()
+
+    # === Calls ===
+    def _execute(self, name, fn, weight, priority, headers_of, before_retry=None):
+        """
+        Run fn through the bucket, retrying network errors, 5xx and 429
+
+        Args:
+            before_retry (callable): Called before every retry; a result other than None is returned instead
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt and before_retry is not None:
+                result = before_retry()
+                if result is not None:
+                    return result
+            self.acquire(weight, priority)
+            try:
+                result = fn()
+            except Exception as e:
+                self._record(headers_of(e))
+                status = _status_code(e)
+                if status in (418, 429):
+                    # Binance bans the IP if calls continue after a 429
+                    self.rate_limited += 1
+                    delay = _retry_after(e)
+                    self._pause(delay)
+                    logger.warning(f"⛔ Binance rate limit ({status}) on {name}; pausing all calls for {delay:.0f}s")
+                elif status is not None and status < 500:
+                    raise
+                if attempt == self.max_retries or not self._take_retry():
+                    logger.error(f"Binance call {name} failed after {attempt + 1} attempts: {str(e)}")
+                    raise
+                self.retries += 1
+                backoff = min(2 ** attempt, 30) * random.uniform(0.5, 1.5)
+                logger.warning(f"Binance call {name} failed (attempt {attempt + 1}/{self.max_retries + 1}): {str(e)}. Retrying in {backoff:.1f}s...")
+                time.sleep(backoff)
+            else:
+                self.calls += 1
+                self._record(headers_of(result))
+                with self._cond:
+                    self._retry_tokens = min(10.0, self._retry_tokens + 0.1)
+                return result
+
+    def _take_retry(self):
+        with self._cond:
+            if self._retry_tokens < 1:
+                logger.warning("Binance retry budget exhausted; not retrying")
+                return False
+            self._retry_tokens -= 1
+            return True
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a Client method through the rate limiter with retries
+
+        Args:
+            method (str): Client method name, e.g. 'order_market_buy'
+
+        Returns:
+            Whatever the Client method returns
+        """
+        client = self.client
+        fn = getattr(client, method)
+        priority = ORDER if method in ORDER_METHODS else MARKET_DATA
+
+        def headers_of(_):
+            response = getattr(client, 'response', None)
+            return getattr(response, 'headers', None)
+
+        before_retry = None
+        if method in NEW_ORDER_METHODS:
+            symbol = kwargs.get('symbol')
+            client_order_id = kwargs.setdefault('newClientOrderId', f"gw-{uuid.uuid4().hex}")
+
+            def before_retry():
+                # The failed attempt may have reached the matching engine anyway
+                if symbol is None:
+                    raise RuntimeError(f"{method} failed and cannot be looked up without symbol=; not retrying")
+                return self._find_order(symbol, client_order_id, headers_of)
+
+        return self._execute(method, lambda: fn(*args, **kwargs), WEIGHTS.get(method, 1), priority, headers_of,
+                             before_retry)
+
+    def _find_order(self, symbol, client_order_id, headers_of):
+        """An order placed with `client_order_id`, or None if Binance has no such order"""
+        get_order = self.client.get_order
+        try:
+            order = self._execute('get_order', lambda: get_order(symbol=symbol, origClientOrderId=client_order_id),
+                                  WEIGHTS['get_order'], ORDER, headers_of)
+        except Exception as e:
+            if getattr(e, 'code', None) == UNKNOWN_ORDER:
+                return None
+            logger.error(f"Could not check whether order {client_order_id} was placed, not resending it: {str(e)}")
+            raise
+        logger.warning(f"Order {client_order_id} on {symbol} went through despite the error; not resending it")
+        return order
+
+    def get(self, url, params=None, weight=1, priority=MARKET_DATA, timeout=10):
+        """Rate-limited GET on the shared session; returns the requests.Response"""
+        def fetch():
+            response = self.session.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response
+
+        def headers_of(outcome):
+            response = outcome if isinstance(outcome, requests.Response) else getattr(outcome, 'response', None)
+            return getattr(response, 'headers', None)
+
+        return self._execute(url.rsplit('/', 1)[-1], fetch, weight, priority, headers_of)
+
+    def stats(self):
+        return {
+            "used_weight": self.used_weight,
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """Process-wide gateway, built from config.yaml on first use"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = ExchangeGateway.from_config(config_service.current())
+        return _gateway
@@ -0,0 +1,403 @@
+# indicators.py
+"""
+Incremental (streaming) versions of the indicators used in strategiesLive.py.
+
+Every indicator keeps just enough state to produce its next value in O(1)
+when a new closed candle arrives, instead of recomputing the whole rolling
+series over the kline frame on each tick. Values match the pandas-based
+calculate_* helpers in strategiesLive.py when fed the same candles
+(same windows, same NaN warm-up, same adjust=True EWM weighting).
+"""
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+def _isnan(x):
+    return x != x
+
+
+def _div(a, b):
+    """Divide like numpy/pandas: x/0 gives +/-inf and 0/0 gives NaN instead of raising"""
+    if b == 0:
+        if a == 0 or _isnan(a):
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class Lag:
+    """Value of the input n updates ago (pandas .shift(n))"""
+
+    def __init__(self, n):
+        self.n = n
+        self._buf = deque(maxlen=n + 1)
+        self.value = NAN
+
+    def update(self, x):
+        self._buf.append(x)
+        self.value = self._buf[0] if len(self._buf) == self.n + 1 else NAN
+        return self.value
+
+
+class RollingMean:
+    """Rolling mean with pandas min_periods=window semantics (NaN in window -> NaN)"""
+
+    def __init__(self, window):
+        self.window = window
+        self._buf = deque()
+        self._sum = 0.0
+        self._nans = 0
+        self._since_resum = 0
+        self.value = NAN
+
+    def update(self, x):
+        self._buf.append(x)
+        if _isnan(x):
+            self._nans += 1
+        else:
+            self._sum += x
+        if len(self._buf) > self.window:
+            old = self._buf.popleft()
+            if _isnan(old):
+                self._nans -= 1
+            else:
+                self._sum -= old
+
+        # Re-sum the window once per `window` updates so floating point drift
+        # can't accumulate over a long-running bot (amortised O(1))
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self._sum = math.fsum(v for v in self._buf if not _isnan(v))
+            self._since_resum = 0
+
+        if len(self._buf) == self.window and self._nans == 0:
+            self.value = self._sum / self.window
+        else:
+            self.value = NAN
+        return self.value
+
+
+class RollingStd:
+    """Rolling sample standard deviation (ddof=1), like pandas .rolling(window).std()"""
+
+    def __init__(self, window):
+        self.window = window
+        self._buf = deque()
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_resum = 0
+        self.value = NAN
+
+    def update(self, x):
+        self._buf.append(x)
+        self._sum += x
+        self._sumsq += x * x
+        if len(self._buf) > self.window:
+            old = self._buf.popleft()
+            self._sum -= old
+            self._sumsq -= old * old
+
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self._sum = math.fsum(self._buf)
+            self._sumsq = math.fsum(v * v for v in self._buf)
+            self._since_resum = 0
+
+        if len(self._buf) == self.window and self.window > 1:
+            n = self.window
+            var = (self._sumsq - self._sum * self._sum / n) / (n - 1)
+            self.value = math.sqrt(var) if var > 0 else 0.0
+        else:
+            self.value = NAN
+        return self.value
+
+
+class _RollingExtreme:
+    """Rolling max (sign=1) or min (sign=-1) using a monotonic deque"""
+
+    def __init__(self, window, sign):
+        self.window = window
+        self._sign = sign
+        self._dq = deque()
+        self._i = 0
+        self.value = NAN
+
+    def update(self, x):
+        key = x * self._sign
+        while self._dq and self._dq[-1][1] <= key:
+            self._dq.pop()
+        self._dq.append((self._i, key))
+        if self._dq[0][0] <= self._i - self.window:
+            self._dq.popleft()
+        self._i += 1
+        self.value = self._dq[0][1] * self._sign if self._i >= self.window else NAN
+        return self.value
+
+
+class RollingMax(_RollingExtreme):
+    def __init__(self, window):
+        super().__init__(window, 1)
+
+
+class RollingMin(_RollingExtreme):
+    def __init__(self, window):
+        super().__init__(window, -1)
+
+
+class EWM:
+    """Exponential moving average matching pandas .ewm(span=span).mean() (adjust=True)"""
+
+    def __init__(self, span):
+        self._decay = 1 - 2 / (span + 1)
+        self._num = 0.0
+        self._den = 0.0
+        self.value = NAN
+
+    def update(self, x):
+        self._num *= self._decay
+        self._den *= self._decay
+        if not _isnan(x):
+            self._num += x
+            self._den += 1.0
+        self.value = self._num / self._den if self._den > 0 else NAN
+        return self.value
+
+
+class RSI:
+    """Simple-average RSI, as calculate_rsi in strategiesLive.py"""
+
+    def __init__(self, period=14):
+        self._prev = NAN
+        self._gain = RollingMean(period)
+        self._loss = RollingMean(period)
+        self.value = NAN
+
+    def update(self, close):
+        delta = close - self._prev
+        self._prev = close
+        gain = self._gain.update(delta if delta > 0 else 0.0)
+        loss = self._loss.update(-delta if delta < 0 else 0.0)
+        rs = _div(gain, loss)
+        self.value = 100 - (100 / (1 + rs))
+        return self.value
+
+
+class TrueRange:
+    def __init__(self):
+        self._prev_close = NAN
+        self.value = NAN
+
+    def update(self, high, low, close):
+        tr = high - low
+        if not _isnan(self._prev_close):
+            tr = max(tr, abs(high - self._prev_close), abs(low - self._prev_close))
+        self._prev_close = close
+        self.value = tr
+        return tr
+
+
+class ATR:
+    def __init__(self, period=14):
+        self._tr = TrueRange()
+        self._mean = RollingMean(period)
+        self.value = NAN
+
+    def update(self, high, low, close):
+        self.value = self._mean.update(self._tr.update(high, low, close))
+        return self.value
+
+
+class BollingerBands:
+    """Returns (upper, middle, lower) like calculate_bollinger_bands"""
+
+    def __init__(self, period=20, std_dev=2):
+        self.std_dev = std_dev
+        self._mean = RollingMean(period)
+        self._std = RollingStd(period)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close):
+        middle = self._mean.update(close)
+        std = self._std.update(close)
+        self.value = (middle + self.std_dev * std, middle, middle - self.std_dev * std)
+        return self.value
+
+
+class MACD:
+    """Returns (macd_line, signal_line, histogram) like calculate_macd"""
+
+    def __init__(self, fast_period=12, slow_period=26, signal_period=9):
+        self._fast = EWM(fast_period)
+        self._slow = EWM(slow_period)
+        self._signal = EWM(signal_period)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close):
+        line = self._fast.update(close) - self._slow.update(close)
+        signal = self._signal.update(line)
+        self.value = (line, signal, line - signal)
+        return self.value
+
+
+class Stochastic:
+    """Returns (%K, %D) like calculate_stochastic"""
+
+    def __init__(self, k_period=14, d_period=3):
+        self._low = RollingMin(k_period)
+        self._high = RollingMax(k_period)
+        self._d = RollingMean(d_period)
+        self.value = (NAN, NAN)
+
+    def update(self, high, low, close):
+        lowest_low = self._low.update(low)
+        highest_high = self._high.update(high)
+        k = 100 * _div(close - lowest_low, highest_high - lowest_low)
+        self.value = (k, self._d.update(k))
+        return self.value
+
+
+class CCI:
+    def __init__(self, period=20):
+        self._ma = RollingMean(period)
+        self._mean_dev = RollingMean(period)
+        self.value = NAN
+
+    def update(self, high, low, close):
+        typical_price = (high + low + close) / 3
+        ma = self._ma.update(typical_price)
+        mean_deviation = self._mean_dev.update(abs(typical_price - ma))
+        self.value = _div(typical_price - ma, 0.015 * mean_deviation)
+        return self.value
+
+
+class ADX:
+    """Simple-average ADX, as calculate_adx in strategiesLive.py"""
+
+    def __init__(self, period=14):
+        self._prev_high = NAN
+        self._prev_low = NAN
+        self._tr = TrueRange()
+        self._tr_mean = RollingMean(period)
+        self._plus_dm = RollingMean(period)
+        self._minus_dm = RollingMean(period)
+        self._dx = RollingMean(period)
+        self.value = NAN
+
+    def update(self, high, low, close):
+        up_move = high - self._prev_high
+        down_move = self._prev_low - low
+        self._prev_high, self._prev_low = high, low
+
+        if _isnan(up_move) or _isnan(down_move):
+            plus_dm = minus_dm = NAN
+        else:
+            plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+            minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+        tr = self._tr_mean.update(self._tr.update(high, low, close))
+        plus_di = 100 * _div(self._plus_dm.update(plus_dm), tr)
+        minus_di = 100 * _div(self._minus_dm.update(minus_dm), tr)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        self.value = self._dx.update(dx)
+        return self.value
+
+
+class OBV:
+    """On-balance volume; starts at 0 on the first candle like calculate_obv"""
+
+    def __init__(self):
+        self._prev_close = None
+        self.value = NAN
+
+    def update(self, close, volume):
+        if self._prev_close is None:
+            self.value = 0.0
+        elif close > self._prev_close:
+            self.value += volume
+        elif close < self._prev_close:
+            self.value -= volume
+        self._prev_close = close
+        return self.value
+
+
+class MarketStructure:
+    """Higher/lower highs and lows over the last three candles"""
+
+    def __init__(self):
+        self._highs = deque(maxlen=3)
+        self._lows = deque(maxlen=3)
+
+    def update(self, high, low):
+        self._highs.append(high)
+        self._lows.append(low)
+        if len(self._highs) < 3:
+            return {'higher_high': False, 'higher_low': False, 'lower_high': False, 'lower_low': False}
+        h2, h1, h0 = self._highs
+        l2, l1, l0 = self._lows
+        return {
+            'higher_high': h0 > h1 and h1 > h2,
+            'higher_low': l0 > l1 and l1 > l2,
+            'lower_high': h0 < h1 and h1 < h2,
+            'lower_low': l0 < l1 and l1 < l2,
+        }
+
+
+class IndicatorEngine:
+    """
+    Base class for a per-strategy incremental indicator set.
+
+    Subclasses build their indicator objects in __init__ and implement
+    _step(bar), which advances every indicator by one closed candle and
+    returns a flat dict of feature values. The engine keeps the last two
+    snapshots so strategy rules can compare the latest candle with the
+    previous one.
+
+    With `frame` set, a feature that is still NaN after the first `frame`
+    candles (a window longer than the frame, like DOGE's ma_200 on 60
+    candles) stays NaN for good, as it was when the strategies only saw
+    the last `frame` candles.
+    """
+
+    def __init__(self, frame=None):
+        self.frame = frame
+        self.snapshots = deque(maxlen=2)
+        self.last_timestamp = None
+        self.count = 0
+        self._filled = set()
+        self._unfilled = ()
+
+    def seed(self, df):
+        """Feed a history frame (oldest first) through the engine"""
+        for bar in df.to_dict('records'):
+            self.update(bar)
+        return self
+
+    def update(self, bar):
+        """Advance the engine by one closed candle (dict with OHLCV fields)"""
+        features = self._step(bar)
+        features['close'] = bar['close']
+        features['volume'] = bar['volume']
+        if self.frame:
+            if self.count < self.frame:
+                self._filled.update(name for name, value in features.items() if not _isnan(value))
+                if self.count + 1 == self.frame:
+                    self._unfilled = tuple(name for name in features if name not in self._filled)
+            for name in self._unfilled:
+                features[name] = NAN
+        self.snapshots.append(features)
+        self.last_timestamp = bar.get('timestamp')
+        self.count += 1
+        return features
+
+    @property
+    def last(self):
+        return self.snapshots[-1]
+
+    @property
+    def prev(self):
+        return self.snapshots[-2]
+
+    def _step(self, bar):
+        raise NotImplementedError
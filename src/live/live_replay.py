@@ -0,0 +1,204 @@
+# live_replay.py
+"""
+Historical replay of the live bots' rules.
+
+The live *_strategy(df) functions only look at the last two rows of the
+frame, so backtesting them meant calling them once per candle on a growing
+slice. That is O(n^2), and every call recomputed every indicator. A replay
+takes the whole history in one pass instead:
+
+1. {coin}_features(df) computes every indicator column once over the full
+   history. These are the same columns LiveStrategy builds one candle at a
+   time, and like it they run on from the first candle. Columns the pair's
+   `frame` never fills (NaN on all of its first `frame` candles) stay NaN,
+   as the live engine keeps them.
+2. The strategy's RuleSet.evaluate_frame turns those columns into one
+   entry and one exit mask, with one value per candle.
+3. The trade walk applies BotEngine.tick's rules:
+   - buy when flat on an entry;
+   - sell when long on an exit or, with exit 'tp_sl', only when the close
+     reaches take profit or stop loss;
+   - no trade until `cooldown` seconds after the previous one.
+   Fills are at the signal candle's close, as in the live bot. The walk
+   jumps from trade to trade; only the bars a position is held are
+   scanned for its exit.
+
+Settings come from bot_engine.bot_settings, so a replay uses the same
+quantity, TP/SL, cooldown and exit mode as the live pair. The result has
+the trades in the layout log_trade writes and the bot's win-rate stats.
+
+    from live_replay import replay
+    result = replay('eth', klines)   # timestamp, open, high, low, close, volume[, close_time]
+    print(result.summary())
+"""
+import numpy as np
+import pandas as pd
+
+from bot_engine import bot_settings
+from market_data import INTERVAL_MS
+from strategiesLive import STRATEGY_RULES
+
+
+class ReplayResult:
+    """
+    Outcome of one replay.
+
+    Attributes:
+        coin (str): Pair that was replayed
+        settings (dict): bot_settings the replay used
+        entry, exit: Boolean signal masks, one value per candle
+        buys, sells: Bar indices of the trades (a buy without a sell is still open)
+        close: Close prices
+        times: Candle close times in seconds
+    """
+
+    def __init__(self, coin, settings, entry, exit, buys, sells, close, times):
+        self.coin = coin
+        self.settings = settings
+        self.entry = entry
+        self.exit = exit
+        self.buys = buys
+        self.sells = sells
+        self.close = close
+        self.times = times
+
+    @property
+    def pnl(self):
+        """Per-unit PnL of each closed trade (sell price - entry price), as the bot logs it"""
+        return self.close[self.sells] - self.close[self.buys[:len(self.sells)]]
+
+    def trades(self):
+        """Trades as log_trade writes them: timestamp, symbol, side, price, pnl"""
+        bars = np.concatenate((self.buys, self.sells))
+        sides = np.array(['buy'] * len(self.buys) + ['sell'] * len(self.sells))
+        pnl = np.concatenate((np.full(len(self.buys), np.nan), self.pnl))
+        order = np.argsort(bars, kind='stable')  # a pair never buys and sells on the same candle
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(self.times[bars[order]], unit='s'),
+            'symbol': self.settings['symbol'],
+            'side': sides[order],
+            'price': self.close[bars[order]],
+            'pnl': pnl[order],
+        })
+
+    def summary(self):
+        pnl = self.pnl
+        wins = int((pnl > 0).sum())
+        return {
+            'coin': self.coin,
+            'candles': len(self.close),
+            'entry_signals': int(self.entry.sum()),
+            'exit_signals': int(self.exit.sum()),
+            'total_trades': len(pnl),
+            'win_count': wins,
+            'win_rate': round(wins / len(pnl), 2) if len(pnl) else 0,
+            'total_pnl': round(float(pnl.sum()) * self.settings['quantity'], 4),
+            'open_position': len(self.buys) > len(self.sells),
+        }
+
+
+def _close_times(df, interval):
+    """Close time of every candle in seconds, the moment the live bot evaluates it"""
+    if 'close_time' in df.columns:
+        return (df['close_time'].to_numpy(dtype=float) + 1) / 1000
+    opened = df['timestamp']
+    if pd.api.types.is_datetime64_any_dtype(opened):  # e.g. KlineStore.load
+        opened = opened.to_numpy(dtype='datetime64[ms]').astype('int64')
+    return (np.asarray(opened, dtype=float) + INTERVAL_MS[interval]) / 1000
+
+
+def _first_exit(entry_bar, start, n, test):
+    """
+    First bar >= start where test(entry_bar, lo, hi) is True, or -1.
+
+    test returns the exit mask for bars lo..hi-1; the window doubles each
+    step so a trade costs time proportional to how long it is held.
+    """
+    lo = start
+    width = 64
+    while lo < n:
+        hi = min(n, lo + width)
+        hits = np.flatnonzero(test(entry_bar, lo, hi))
+        if len(hits):
+            return lo + hits[0]
+        lo = hi
+        width *= 2
+    return -1
+
+
+def walk_trades(entry, exit, close, times, tp_pct, sl_pct, cooldown, tp_sl):
+    """
+    Buy and sell bars of the live trade rules over precomputed signal masks.
+
+    Args:
+        entry, exit (array): Boolean signal masks
+        close (array): Close prices (the fill price)
+        times (array): Candle close times in seconds
+        tp_pct, sl_pct (float): Take profit / stop loss distance from the entry
+        cooldown (float): Seconds after a trade before the next one is allowed
+        tp_sl (bool): Sell on take profit / stop loss instead of the exit signal
+
+    Returns:
+        tuple: (buys, sells) int arrays of bar indices
+    """
+    n = len(close)
+    entries = np.flatnonzero(entry)
+
+    def test(i, lo, hi):
+        if tp_sl:
+            price = close[lo:hi]
+            return (price >= close[i] * (1 + tp_pct)) | (price <= close[i] * (1 - sl_pct))
+        return exit[lo:hi]
+
+    buys, sells = [], []
+    start = 0
+    last_trade = 0.0  # a fresh bot's state: no trade yet
+    while True:
+        # Next entry once flat and past the cooldown (times are increasing)
+        ready = max(start, np.searchsorted(times, last_trade + cooldown, side='right'))
+        k = np.searchsorted(entries, ready)
+        if k == len(entries):
+            break
+        i = entries[k]
+        buys.append(i)
+
+        ready = max(i + 1, np.searchsorted(times, times[i] + cooldown, side='right'))
+        j = _first_exit(i, ready, n, test)
+        if j < 0:
+            break
+        sells.append(j)
+        start, last_trade = j + 1, times[j]
+
+    return np.array(buys, dtype=np.intp), np.array(sells, dtype=np.intp)
+
+
+def replay(coin, df, config=None, **overrides):
+    """
+    Replay a live pair's rules over a kline history
+
+    Args:
+        coin (str): Pair name, e.g. 'eth' (its {coin}_bot settings are used)
+        df (DataFrame): timestamp, open, high, low, close, volume and optionally close_time,
+                        oldest first
+        config (dict): Config to read the pair settings from (defaults to none: BOT_DEFAULTS)
+        **overrides: Settings to replace, e.g. tp_pct=0.05 or cooldown=3600
+
+    Returns:
+        ReplayResult
+    """
+    settings = bot_settings(coin, config or {})
+    settings.update(overrides)
+    features, rules = STRATEGY_RULES[settings['strategy']]
+
+    frame = features(df.reset_index(drop=True).copy())
+    if settings.get('frame'):
+        head = frame.iloc[:settings['frame']]
+        frame[[column for column in frame.columns if head[column].isna().all()]] = np.nan
+    entry, exit = rules.evaluate_frame(frame)
+    close = frame['close'].to_numpy(dtype=float)
+    times = _close_times(frame, settings['interval'])
+
+    buys, sells = walk_trades(entry, exit, close, times,
+                              tp_pct=settings['tp_pct'], sl_pct=settings['sl_pct'],
+                              cooldown=settings['cooldown'], tp_sl=settings['exit'] == 'tp_sl')
+    return ReplayResult(coin, settings, entry, exit, buys, sells, close, times)
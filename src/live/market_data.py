@@ -0,0 +1,343 @@
+# market_data.py
+"""
+Shared market-data feed for the live bots.
+
+One MarketDataService holds a single combined Binance kline stream for every
+(symbol, interval) a bot has subscribed to and keeps a rolling buffer of
+closed candles per stream in memory. Bots read their frame from the buffer
+and await next_close() until the next candle closes, instead of each
+polling the REST API on a fixed sleep (next_close_any lets one worker wait
+on many streams at once).
+
+Whenever the socket (re)connects, every buffer is backfilled from the REST
+klines endpoint, so candles that closed while the connection was down are
+not lost; a close found that way wakes the waiting bots just like one that
+arrived over the socket. If websocket-client is not installed the service
+runs on the REST backfill alone, polling once per candle boundary.
+
+Both URLs come from the `market_data` section of config.yaml, which lets
+scripts/replay_kline_server.py stand in for Binance when testing offline:
+
+    market_data:
+      ws_url: ws://127.0.0.1:8765
+      rest_url: http://127.0.0.1:8765
+"""
+import json
+import time
+import asyncio
+import logging
+import itertools
+import threading
+from collections import deque
+
+import requests
+
+try:
+    import websocket
+except ImportError:  # REST-only mode
+    websocket = None
+
+DEFAULT_WS_URL = 'wss://stream.binance.com:9443'
+DEFAULT_REST_URL = 'https://api.binance.com'
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time']
+
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000,
+}
+
+# Request weight of one /api/v3/klines call
+KLINES_WEIGHT = 2
+
+# Seconds past an expected candle close before falling back to REST
+STALE_GRACE = 15
+
+logger = logging.getLogger(__name__)
+
+
+def stream_name(symbol, interval):
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+class CandleBuffer:
+    """Rolling buffer of closed candles for one symbol/interval"""
+
+    def __init__(self, symbol, interval, size):
+        self.symbol = symbol
+        self.interval = interval
+        self.candles = deque(maxlen=size)
+        self.listeners = set()  # called (from any thread) when a candle closes
+        self.lock = threading.Lock()
+
+    def last_open_time(self):
+        return self.candles[-1][0] if self.candles else -1
+
+    def add_closed(self, rows):
+        """Append closed candles newer than the buffer's last one; notifies listeners if any were added"""
+        with self.lock:
+            added = 0
+            for row in rows:
+                if row[0] > self.last_open_time():
+                    self.candles.append(row)
+                    added += 1
+        if added:
+            for listener in list(self.listeners):
+                listener()
+        return added
+
+
+class MarketDataService:
+    def __init__(self, ws_url=DEFAULT_WS_URL, rest_url=DEFAULT_REST_URL, buffer_size=500, gateway=None):
+        """
+        Args:
+            ws_url (str): Base websocket URL; the combined-stream path is appended
+            rest_url (str): Base REST URL used for the backfill
+            buffer_size (int): Closed candles kept per symbol/interval
+            gateway (ExchangeGateway): Rate limiter and session for the backfill (optional)
+        """
+        self.ws_url = ws_url.rstrip('/')
+        self.rest_url = rest_url.rstrip('/')
+        self.buffer_size = buffer_size
+        self.buffers = {}
+        self.gateway = gateway
+        self.session = gateway.session if gateway is not None else requests.Session()
+        self.connected = False
+        self._lock = threading.Lock()
+        self._ws = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._next_id = 1
+
+    @classmethod
+    def from_config(cls, config, gateway=None):
+        cfg = config.get('market_data', {})
+        return cls(ws_url=cfg.get('ws_url', DEFAULT_WS_URL),
+                   rest_url=cfg.get('rest_url', DEFAULT_REST_URL),
+                   buffer_size=cfg.get('buffer_size', 500),
+                   gateway=gateway)
+
+    # === Subscriptions ===
+    def subscribe(self, symbol, interval):
+        """
+        Start tracking a symbol/interval. Seeds the buffer from REST right away
+        and adds the stream to a live connection, so it is safe to call from a
+        bot at any time (e.g. after its interval changed in the config).
+        """
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        key = (symbol.upper(), interval)
+        with self._lock:
+            buffer = self.buffers.get(key)
+            if buffer is not None:
+                return buffer
+            buffer = CandleBuffer(key[0], interval, self.buffer_size)
+            self.buffers[key] = buffer
+
+        self._backfill(buffer)
+        ws = self._ws
+        if ws is not None and self.connected:
+            try:
+                ws.send(json.dumps({'method': 'SUBSCRIBE', 'params': [stream_name(*key)], 'id': self._take_id()}))
+            except Exception as e:
+                logger.warning(f"Could not subscribe {stream_name(*key)} on the open socket: {e}")
+        return buffer
+
+    def _take_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    # === Reading ===
+    def frame(self, symbol, interval, limit=100):
+        """
+        The latest `limit` closed candles as a DataFrame with the same columns the
+        bots used to build from client.get_klines (timestamp and close_time in ms).
+        """
+        import pandas as pd  # only frame() callers need pandas; the engine reads candles()
+        return pd.DataFrame(self.candles(symbol, interval, limit), columns=COLUMNS)
+
+    def candles(self, symbol, interval, limit=100):
+        """The latest `limit` closed candles as tuples in COLUMNS order"""
+        buffer = self.subscribe(symbol, interval)
+        with buffer.lock:
+            return list(itertools.islice(buffer.candles, max(len(buffer.candles) - limit, 0), None))
+
+    async def next_close(self, symbol, interval, stop_event):
+        """
+        Wait on the event loop until the next candle of symbol/interval closes.
+
+        Returns True when a new candle arrived, False when stop_event (an
+        asyncio.Event) was set first.
+        """
+        return await self.next_close_any([(symbol, interval)], stop_event)
+
+    async def next_close_any(self, keys, *events):
+        """
+        Wait until a candle closes on any of the (symbol, interval) streams.
+
+        Returns True when a new candle arrived, False when one of `events`
+        (asyncio.Events) was set first. If a stream has nothing within
+        STALE_GRACE seconds of its expected close, its buffer is refreshed from
+        REST, so a silent stream delays a tick by seconds rather than a whole
+        candle.
+        """
+        buffers = []
+        for symbol, interval in keys:
+            buffer = self.buffers.get((symbol.upper(), interval))
+            if buffer is None:
+                buffer = await asyncio.to_thread(self.subscribe, symbol, interval)
+            buffers.append(buffer)
+
+        loop = asyncio.get_running_loop()
+        closed = loop.create_future()
+
+        def on_close():
+            loop.call_soon_threadsafe(lambda: closed.done() or closed.set_result(True))
+
+        for buffer in buffers:
+            buffer.listeners.add(on_close)
+        waiters = {asyncio.ensure_future(event.wait()) for event in events}
+        try:
+            while True:
+                expected = {}
+                for buffer in buffers:
+                    step = INTERVAL_MS[buffer.interval]
+                    last = buffer.last_open_time()
+                    expected[buffer] = (last + 2 * step if last >= 0 else (time.time() * 1000 // step + 1) * step) / 1000
+                timeout = max(min(expected.values()) - time.time(), 0) + STALE_GRACE if expected else None
+                await asyncio.wait({closed, *waiters}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if any(waiter.done() for waiter in waiters):
+                    return False
+                if closed.done():
+                    return True
+                overdue = [buffer for buffer, close in expected.items() if close <= time.time()]
+                for buffer in overdue:
+                    logger.warning(f"No {buffer.symbol} {buffer.interval} close from the stream; checking REST")
+                if sum(await asyncio.gather(*(asyncio.to_thread(self._backfill, buffer) for buffer in overdue))):
+                    return True
+        finally:
+            for buffer in buffers:
+                buffer.listeners.discard(on_close)
+            for waiter in waiters:
+                waiter.cancel()
+
+    # === REST backfill ===
+    def _backfill(self, buffer):
+        """Fill the buffer with closed candles from the REST API"""
+        try:
+            url = f"{self.rest_url}/api/v3/klines"
+            params = {
+                'symbol': buffer.symbol,
+                'interval': buffer.interval,
+                'limit': min(self.buffer_size + 1, 1000),
+            }
+            if self.gateway is not None:
+                # Shares the weight budget with the bots' orders, which go first
+                response = self.gateway.get(url, params=params, weight=KLINES_WEIGHT)
+            else:
+                response = self.session.get(url, params=params, timeout=10)
+                response.raise_for_status()
+            klines = response.json()
+        except Exception as e:
+            logger.warning(f"REST backfill failed for {buffer.symbol} {buffer.interval}: {e}")
+            return 0
+
+        now = int(time.time() * 1000)
+        rows = [
+            (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]), int(k[6]))
+            for k in klines if int(k[6]) < now  # drop the candle that is still open
+        ]
+        added = buffer.add_closed(rows)
+        if added:
+            logger.info(f"Backfilled {added} {buffer.symbol} {buffer.interval} candles from REST")
+        return added
+
+    def backfill_all(self):
+        for buffer in list(self.buffers.values()):
+            self._backfill(buffer)
+
+    # === Websocket ===
+    def _on_open(self, ws):
+        self.connected = True
+        logger.info(f"🔌 Kline stream connected ({len(self.buffers)} streams)")
+        # Catch up on anything that closed while we were disconnected
+        self.backfill_all()
+
+    def _on_message(self, ws, message):
+        msg = json.loads(message)
+        data = msg.get('data', msg)
+        if data.get('e') != 'kline':
+            return
+        k = data['k']
+        if not k['x']:
+            return  # only closed candles are buffered
+        buffer = self.buffers.get((data['s'], k['i']))
+        if buffer is None:
+            return
+        buffer.add_closed([(int(k['t']), float(k['o']), float(k['h']), float(k['l']),
+                            float(k['c']), float(k['v']), int(k['T']))])
+
+    def _on_error(self, ws, error):
+        logger.warning(f"Kline stream error: {error}")
+
+    def _on_close(self, ws, status_code, reason):
+        self.connected = False
+        logger.warning(f"🔌 Kline stream closed ({status_code} {reason})")
+
+    def _stream_url(self):
+        streams = '/'.join(stream_name(*key) for key in sorted(self.buffers))
+        return f"{self.ws_url}/stream?streams={streams}"
+
+    def _run_socket(self):
+        backoff = 1
+        while not self._stop.is_set():
+            if not self.buffers:
+                self._stop.wait(1)
+                continue
+            started = time.time()
+            self._ws = websocket.WebSocketApp(
+                self._stream_url(),
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            # Binance pings every few minutes and drops the connection after 24h;
+            # either way run_forever returns and we reconnect with a fresh backfill
+            self._ws.run_forever(ping_interval=60, ping_timeout=20)
+            self.connected = False
+            self._ws = None
+            if self._stop.is_set():
+                break
+            backoff = 1 if time.time() - started > 60 else min(backoff * 2, 60)
+            logger.info(f"Reconnecting kline stream in {backoff}s")
+            # Keep bots fed from REST while the socket is down
+            self.backfill_all()
+            self._stop.wait(backoff)
+
+    def _run_polling(self):
+        while not self._stop.is_set():
+            self.backfill_all()
+            # Sleep until just after the next candle boundary of the shortest interval
+            step = min((INTERVAL_MS[i] for _, i in self.buffers), default=60_000)
+            now = int(time.time() * 1000)
+            self._stop.wait((step - now % step) / 1000 + 2)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        if websocket is None:
+            logger.warning("websocket-client is not installed; market data falls back to REST polling")
+            target = self._run_polling
+        else:
+            target = self._run_socket
+        self._thread = threading.Thread(target=target, name='market-data', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._ws is not None:
+            self._ws.close()
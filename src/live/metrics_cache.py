@@ -0,0 +1,302 @@
+# metrics_cache.py
+"""
+In-memory trade history and metrics for the Telegram bot.
+
+/metrics, the trade logs and the daily summary used to pd.read_csv every
+coin's trades and metrics CSVs on each button press, and the summary
+re-parsed every timestamp to find today's trades. The cache loads each
+file once and then keeps up with it:
+
+- A trades CSV is append-only (the trade journal adds rows at the end), so
+  the cache remembers how many bytes it has parsed and only reads what was
+  appended since. Half-written lines are left for the next read. If the
+  file shrank, was replaced, or its bytes before the read offset changed,
+  it is loaded again from the start.
+- A metrics CSV is one row that the journal rewrites atomically. It is
+  parsed again whenever its mtime or size changes. When the bots run in
+  this process, the journal's running totals are returned instead: they
+  are current, while the CSV trails them by up to one flush.
+- Trades are grouped by day as they are parsed. Each day keeps the number
+  of trades and its SELL count, wins, losses and PnL, which is everything
+  the daily summary needs.
+
+Files are stat'ed at most once every `check_interval` seconds, so pressing
+the same button repeatedly is answered from memory without touching disk.
+"""
+import io
+import os
+import csv
+import math
+import time
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from trade_journal import current_journal
+
+LIVE_BACKUP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'liveBackup'))
+
+TAIL_CHECK_BYTES = 64  # bytes before the read offset compared to spot an in-place rewrite
+
+logger = logging.getLogger(__name__)
+
+# profit is None where the CSV cell is empty (pandas would read NaN)
+Trade = namedtuple('Trade', 'timestamp type price profit')
+
+
+def _number(value):
+    """A CSV cell as pandas would type a one-row column: int, then float, else the string"""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class DayStats:
+    """One day of a coin's trades, counted the way the daily summary reports them"""
+    __slots__ = ('trades', 'sells', 'wins', 'losses', 'pnl')
+
+    def __init__(self):
+        self.trades = 0
+        self.sells = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl = 0.0
+
+    def add(self, trade):
+        self.trades += 1
+        if trade.type != 'SELL':
+            return
+        self.sells += 1
+        if trade.profit is not None:
+            if trade.profit > 0:
+                self.wins += 1
+            else:
+                self.losses += 1
+            self.pnl += trade.profit
+
+
+class TradeHistory:
+    """A trades CSV parsed into memory and followed as rows are appended"""
+
+    def __init__(self, path):
+        self.path = path
+        self.exists = False
+        self.trades = []
+        self.days = {}  # date -> DayStats
+        self.bytes_read = 0
+        self._signature = None
+        self._offset = 0
+        self._tail = b''
+        self._columns = None
+
+    def _reset(self):
+        self.trades = []
+        self.days = {}
+        self._offset = 0
+        self._tail = b''
+        self._columns = None
+
+    def refresh(self):
+        """Pick up changes to the file. Returns True if anything was (re)loaded."""
+        signature = _signature(self.path)
+        if signature == self._signature:
+            return False
+        previous, self._signature = self._signature, signature
+
+        if signature is None:
+            self.exists = False
+            self._reset()
+            return True
+        self.exists = True
+
+        grown = (previous is not None and previous[:2] == signature[:2]
+                 and signature[2] >= self._offset and self._offset > 0)
+        if not grown or not self._read(self._offset, check_tail=True):
+            self._reset()
+            self._read(0)
+        return True
+
+    def _read(self, offset, check_tail=False):
+        """Parse the complete lines from offset on. False if the bytes before offset changed."""
+        with open(self.path, 'rb') as f:
+            if check_tail and self._tail:
+                f.seek(offset - len(self._tail))
+                if f.read(len(self._tail)) != self._tail:
+                    return False
+            else:
+                f.seek(offset)
+            data = f.read()
+        self.bytes_read += len(data)
+
+        end = data.rfind(b'\n') + 1  # a half-written last line waits for the next read
+        if end == 0:
+            return True
+        chunk = data[:end]
+        self._offset = offset + end
+        self._tail = (self._tail + chunk)[-TAIL_CHECK_BYTES:]
+
+        rows = csv.reader(io.StringIO(chunk.decode('utf-8', errors='replace')))
+        if self._columns is None:
+            header = next(rows, None)
+            if header is None:
+                return True
+            self._columns = {name.strip(): i for i, name in enumerate(header)}
+        for row in rows:
+            if row:
+                self._add(row)
+        return True
+
+    def _add(self, row):
+        columns = self._columns
+
+        def cell(name):
+            i = columns.get(name)
+            return row[i] if i is not None and i < len(row) else ''
+
+        try:
+            price = float(cell('price'))
+            profit = float(cell('profit')) if cell('profit') else None
+        except ValueError:
+            logger.warning(f"Skipping malformed row in {os.path.basename(self.path)}: {row}")
+            return
+        if profit is not None and math.isnan(profit):
+            profit = None
+        trade = Trade(cell('timestamp'), cell('type'), price, profit)
+        self.trades.append(trade)
+
+        try:
+            day = datetime.fromisoformat(trade.timestamp).date()
+        except ValueError:
+            return
+        stats = self.days.get(day)
+        if stats is None:
+            stats = self.days[day] = DayStats()
+        stats.add(trade)
+
+
+class MetricsFile:
+    """A one-row metrics CSV, parsed again when it changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.row = None
+        self._signature = None
+
+    def refresh(self):
+        signature = _signature(self.path)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        self.row = None
+        if signature is not None:
+            with open(self.path, newline='') as f:
+                row = next(csv.DictReader(f), None)
+            if row is not None:
+                self.row = {key.strip(): _number(value) for key, value in row.items() if key is not None}
+        return True
+
+
+class MetricsCache:
+    def __init__(self, backup_dir=LIVE_BACKUP_DIR, check_interval=1.0):
+        """
+        Args:
+            backup_dir (str): Folder with the {COIN}_{tariff}_tariff_*.csv files
+            check_interval (float): Minimum seconds between stat checks of a file
+        """
+        self.backup_dir = backup_dir
+        self.check_interval = check_interval
+        self.loads = 0
+        self._files = {}    # path -> TradeHistory / MetricsFile
+        self._checked = {}  # path -> monotonic time of the last stat
+        self._lock = threading.Lock()
+
+    def _file(self, cls, coin, tariff, kind):
+        path = os.path.join(self.backup_dir, f"{coin}_{tariff}_tariff_{kind}.csv")
+        entry = self._files.get(path)
+        if entry is None:
+            entry = self._files[path] = cls(path)
+        now = time.monotonic()
+        if now - self._checked.get(path, -math.inf) >= self.check_interval:
+            self._checked[path] = now
+            try:
+                if entry.refresh():
+                    self.loads += 1
+            except OSError as e:
+                logger.error(f"Error reading {path}: {e}")
+        return entry
+
+    def _history(self, coin, tariff):
+        history = self._file(TradeHistory, coin, tariff, 'trades')
+        return history if history.exists else None
+
+    # === Lookups ===
+    def metrics(self, coin, tariff='after'):
+        """The coin's metrics row as a dict, or None if there is no metrics file"""
+        journal = current_journal() if tariff == 'after' else None
+        if journal is not None:
+            row = journal.coin_stats(coin)
+            if row is not None:
+                return row
+        with self._lock:
+            row = self._file(MetricsFile, coin, tariff, 'metrics').row
+            return dict(row) if row is not None else None
+
+    def recent_trades(self, coin, tariff='after', count=10):
+        """
+        The coin's last trades, oldest first
+
+        Returns:
+            list: Up to `count` Trade tuples, or None if there is no trades file
+        """
+        with self._lock:
+            history = self._history(coin, tariff)
+            if history is None:
+                return None
+            return history.trades[-count:] if count > 0 else []
+
+    def day(self, coin, tariff='after', date=None):
+        """
+        The coin's trades on a day (today by default)
+
+        Returns:
+            DayStats: Empty when nothing was traded that day, or None if there is no trades file
+        """
+        date = date or datetime.now().date()
+        with self._lock:
+            history = self._history(coin, tariff)
+            if history is None:
+                return None
+            return history.days.get(date) or DayStats()
+
+    def stats(self):
+        with self._lock:
+            histories = [f for f in self._files.values() if isinstance(f, TradeHistory)]
+            return {"files": len(self._files), "loads": self.loads,
+                    "trades": sum(len(h.trades) for h in histories),
+                    "bytes_read": sum(h.bytes_read for h in histories)}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_metrics_cache():
+    """Process-wide metrics cache (files are loaded on first lookup)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MetricsCache()
+        return _cache
@@ -1,26 +1,21 @@
 # reddit_sentiment.py
 
+# praw, nltk, pandas/numpy and matplotlib are heavy and only needed once a
+# sentiment report is requested, so they are imported on first use (see
+# load_config, initialize_sentiment, analyze_coin_sentiment and
+# chart_service). Importing this module does no network I/O; the
+# VADER lexicon is downloaded, if missing, when the analyzer is first built.
 import os
-import praw
-import pandas as pd
-import numpy as np
 import logging
 import yaml
 import re
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
 from datetime import datetime, timedelta
 import traceback
-import matplotlib.pyplot as plt
 from io import BytesIO
 import asyncio
 import time
 
-# Ensure NLTK resources are downloaded
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
+from reddit_store import get_post_store
 
 # Configure logging
 logging.basicConfig(
@@ -67,6 +62,8 @@ sentiment_data = {}  # Cache for sentiment data
 def load_config():
     global CONFIG, reddit
     try:
+        import praw
+
         with open(config_path, 'r') as f:
             CONFIG = yaml.safe_load(f)
         
@@ -87,6 +84,15 @@ def load_config():
 def initialize_sentiment():
     global vader
     try:
+        import nltk
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+        # Ensure NLTK resources are downloaded
+        try:
+            nltk.data.find('vader_lexicon')
+        except LookupError:
+            nltk.download('vader_lexicon')
+
         vader = SentimentIntensityAnalyzer()
         return True
     except Exception as e:
@@ -105,9 +111,12 @@ def get_reddit_posts(coin, limit=100, timeframe='week'):
     """
     Fetch Reddit posts related to a specific coin
     
+    Only posts newer than each subreddit's high-water mark are fetched; the
+    rest come from the local post store (see reddit_store).
+    
     Args:
         coin (str): Coin symbol (ETH, LINK, etc.)
-        limit (int): Maximum number of posts to retrieve per subreddit
+        limit (int): Maximum number of posts to retrieve per listing when a subreddit is first seeded
         timeframe (str): 'day', 'week', 'month', 'year', or 'all'
     
     Returns:
@@ -130,63 +139,39 @@ def get_reddit_posts(coin, limit=100, timeframe='week'):
     }
     
     time_filter = time_filters.get(timeframe.lower(), time_filters['week'])
-    current_time = time.time()
+    since = time.time() - time_filter if time_filter else None
+    store = get_post_store()
     
     try:
         subreddits = COIN_SUBREDDITS.get(coin, [])
         
         for subreddit_name in subreddits:
             try:
-                subreddit = reddit.subreddit(subreddit_name)
-                
-                # Search for coin-specific posts with different sort methods
-                for sort_method in ['hot', 'new', 'top']:
-                    if sort_method == 'hot':
-                        submissions = subreddit.hot(limit=limit)
-                    elif sort_method == 'new':
-                        submissions = subreddit.new(limit=limit)
-                    else:  # top
-                        submissions = subreddit.top(limit=limit, time_filter=timeframe)
-                    
-                    for submission in submissions:
-                        # Skip if post is too old based on timeframe
-                        if time_filter and (current_time - submission.created_utc) > time_filter:
-                            continue
-                            
-                        # Only include non-stickied posts that are related to the coin
-                        if (not submission.stickied and 
-                            is_coin_related(submission.title + ' ' + submission.selftext, coin)):
-                            
-                            # Get post statistics
-                            comments_count = len(list(submission.comments))
-                            
-                            posts.append({
-                                'id': submission.id,
-                                'subreddit': subreddit_name,
-                                'title': submission.title,
-                                'selftext': submission.selftext,
-                                'score': submission.score,
-                                'upvote_ratio': submission.upvote_ratio,
-                                'num_comments': comments_count,
-                                'created_utc': datetime.fromtimestamp(submission.created_utc),
-                                'sort_method': sort_method,
-                                'url': submission.url,
-                                'permalink': f"https://reddit.com{submission.permalink}"
-                            })
+                store.refresh(reddit, subreddit_name, since, timeframe, limit)
             except Exception as e:
+                # Fall back to what is already stored
                 logger.error(f"Error fetching posts from r/{subreddit_name}: {e}")
-                continue
-                
-        # Remove duplicates based on post ID
-        unique_posts = []
-        seen_ids = set()
-        
-        for post in posts:
-            if post['id'] not in seen_ids:
-                seen_ids.add(post['id'])
-                unique_posts.append(post)
+            
+            for post in store.posts(subreddit_name, since):
+                # Only include non-stickied posts that are related to the coin
+                if (not post['stickied'] and
+                    is_coin_related(post['title'] + ' ' + post['selftext'], coin)):
+                    
+                    posts.append({
+                        'id': post['id'],
+                        'subreddit': subreddit_name,
+                        'title': post['title'],
+                        'selftext': post['selftext'],
+                        'score': post['score'],
+                        'upvote_ratio': post['upvote_ratio'],
+                        'num_comments': post['num_comments'],
+                        'created_utc': datetime.fromtimestamp(post['created_utc']),
+                        'sort_method': post['listing'],
+                        'url': post['url'],
+                        'permalink': f"https://reddit.com{post['permalink']}"
+                    })
                 
-        return unique_posts
+        return posts
     
     except Exception as e:
         logger.error(f"Error getting Reddit posts for {coin}: {e}")
@@ -244,6 +229,9 @@ def analyze_coin_sentiment(coin, timeframe='week', limit=100, force_refresh=Fals
     Returns:
         dict: Sentiment analysis results
     """
+    import numpy as np
+    import pandas as pd
+
     global sentiment_data
     
     coin = coin.upper()
@@ -383,6 +371,9 @@ def generate_sentiment_chart(sentiment_result):
     """
     Generate a sentiment chart from analysis results
     
+    Renders in the calling thread; async handlers should await
+    chart_service.get_chart_service().sentiment_chart(result) instead.
+    
     Args:
         sentiment_result (dict): Sentiment analysis results
     
@@ -390,80 +381,8 @@ def generate_sentiment_chart(sentiment_result):
         BytesIO: PNG image data
     """
     try:
-        # Create a figure with two subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
-        
-        # Chart 1: Sentiment Distribution
-        sentiment_distribution = sentiment_result['sentiment_distribution']
-        categories = list(sentiment_distribution.keys())
-        values = list(sentiment_distribution.values())
-        
-        # Define colors for sentiment categories
-        colors = ['#d7301f', '#fc8d59', '#fee08b', '#78c679', '#1a9641']
-        
-        # Plot the sentiment distribution as a bar chart
-        bars = ax1.bar(categories, values, color=colors)
-        ax1.set_title(f"Sentiment Distribution for {sentiment_result['coin']}")
-        ax1.set_ylabel('Number of Posts')
-        ax1.grid(axis='y', linestyle='--', alpha=0.7)
-        
-        # Add value labels on top of bars
-        for bar in bars:
-            height = bar.get_height()
-            ax1.annotate(f'{height}', 
-                        xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3),  # 3 points vertical offset
-                        textcoords="offset points",
-                        ha='center', va='bottom')
-        
-        # Chart 2: Sentiment Timeline
-        timeline_data = sentiment_result['timeline_data']
-        
-        if timeline_data:
-            dates = [record['date_str'] for record in timeline_data]
-            sentiments = [record['weighted_sentiment'] for record in timeline_data]
-            
-            # Define colors based on sentiment values
-            line_colors = ['#d7301f' if s < -0.2 else '#fee08b' if s < 0.2 else '#1a9641' for s in sentiments]
-            
-            # Plot the sentiment timeline
-            ax2.plot(dates, sentiments, marker='o', linestyle='-', color='#5a9bd5')
-            
-            # Plot colored points based on sentiment
-            for i, (date, sentiment) in enumerate(zip(dates, sentiments)):
-                ax2.scatter(date, sentiment, color=line_colors[i], s=50, zorder=5)
-            
-            # Add a horizontal line at y=0
-            ax2.axhline(y=0, color='gray', linestyle='--', alpha=0.7)
-            
-            # Add color zones for sentiment categories
-            ax2.axhspan(-1, -0.2, alpha=0.1, color='red')
-            ax2.axhspan(-0.2, 0.2, alpha=0.1, color='yellow')
-            ax2.axhspan(0.2, 1, alpha=0.1, color='green')
-            
-            ax2.set_title(f"Sentiment Timeline for {sentiment_result['coin']}")
-            ax2.set_ylabel('Sentiment Score')
-            ax2.set_xlabel('Date')
-            ax2.grid(True, linestyle='--', alpha=0.7)
-            
-            # Rotate x-axis labels for better readability
-            plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
-            
-        else:
-            ax2.text(0.5, 0.5, "No timeline data available", 
-                    horizontalalignment='center', verticalalignment='center',
-                    transform=ax2.transAxes)
-        
-        # Adjust layout
-        plt.tight_layout()
-        
-        # Save to BytesIO object
-        img_data = BytesIO()
-        plt.savefig(img_data, format='png', dpi=100)
-        img_data.seek(0)
-        plt.close(fig)
-        
-        return img_data
+        from chart_service import render_sentiment_chart, sentiment_chart_args
+        return BytesIO(render_sentiment_chart(*sentiment_chart_args(sentiment_result)))
     
     except Exception as e:
         logger.error(f"Error generating sentiment chart: {str(e)}")
@@ -543,7 +462,7 @@ def initialize():
         return False
 
 # Main function to analyze sentiment
-def get_coin_sentiment(coin, timeframe='week', limit=100, force_refresh=False):
+def get_coin_sentiment(coin, timeframe='week', limit=100, force_refresh=False, with_chart=True):
     """
     Get sentiment analysis for a coin
     
@@ -552,6 +471,7 @@ def get_coin_sentiment(coin, timeframe='week', limit=100, force_refresh=False):
         timeframe (str): 'day', 'week', 'month', or 'all'
         limit (int): Maximum number of posts to retrieve
         force_refresh (bool): Force refresh instead of using cache
+        with_chart (bool): Render chart_data here (the Telegram bot renders it via chart_service)
     
     Returns:
         dict: Sentiment analysis results and formatted message
@@ -572,7 +492,7 @@ def get_coin_sentiment(coin, timeframe='week', limit=100, force_refresh=False):
         formatted_message = format_sentiment_message(result)
         
         # Generate chart
-        chart_data = generate_sentiment_chart(result)
+        chart_data = generate_sentiment_chart(result) if with_chart else None
         
         return {
             'result': result,
@@ -0,0 +1,217 @@
+# reddit_store.py
+"""
+Local store of Reddit posts for reddit_sentiment.
+
+get_reddit_posts used to read the hot, new and top listings of every
+subreddit (100 posts each) on every cache miss, and called
+len(list(submission.comments)) on each matching post. That loads the
+post's whole comment tree, one request per post, so a refresh cost
+three listing requests plus one per matching post for each subreddit.
+The posts were then thrown away with the rest of the result. Now:
+
+- Posts are kept by id, one JSON file per subreddit under data/reddit,
+  so they survive the sentiment worker and bot restarts.
+- Each subreddit has a high-water mark: the creation time of the newest
+  post seen. A refresh reads the `new` listing only until it reaches
+  that mark. PRAW fetches listings lazily, 100 posts per request, so a
+  refresh usually costs one request.
+- The first refresh of a subreddit (or the first for a longer timeframe)
+  seeds it: `new` back to the start of the window, up to `limit` posts,
+  plus `top` for the timeframe once, so popular older posts are not lost.
+- Comment counts come from the listing's num_comments field. Scores and
+  comment counts of posts younger than `stats_age` are refreshed with
+  one info request per 100 posts, since a post read right after it was
+  created has almost no votes yet.
+- Posts older than `retention` are dropped when a subreddit is saved,
+  unless the current request still needs them.
+"""
+import os
+import json
+import time
+import logging
+import threading
+
+DEFAULT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'reddit'))
+
+POST_FIELDS = ('id', 'title', 'selftext', 'score', 'upvote_ratio', 'num_comments', 'created_utc', 'url',
+               'permalink', 'stickied')
+STATS_FIELDS = ('score', 'upvote_ratio', 'num_comments')
+INFO_BATCH = 100  # fullnames per info request
+
+logger = logging.getLogger(__name__)
+
+
+def _post(submission, listing):
+    """The fields we keep from a PRAW submission (none of them trigger a request)"""
+    post = {field: getattr(submission, field) for field in POST_FIELDS}
+    post['created_utc'] = float(post['created_utc'])
+    post['listing'] = listing
+    post['fetched'] = time.time()
+    return post
+
+
+class SubredditPosts:
+    """One subreddit's stored posts and high-water mark"""
+
+    def __init__(self, name, posts=None, newest=0.0, covered_from=None, seeded=()):
+        self.name = name
+        self.posts = posts or {}          # id -> post dict
+        self.newest = newest              # created_utc of the newest post seen
+        self.covered_from = covered_from  # start of the window the seed read `new` back to
+        self.seeded = set(seeded)         # timeframes whose `top` listing was read
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(name, data.get('posts'), data.get('newest', 0.0), data.get('covered_from'),
+                   data.get('seeded', ()))
+
+    def to_dict(self):
+        return {'posts': self.posts, 'newest': self.newest, 'covered_from': self.covered_from,
+                'seeded': sorted(self.seeded)}
+
+    def add(self, post):
+        """Store or update a post. Returns True if it was new."""
+        known = post['id'] in self.posts
+        if known:
+            self.posts[post['id']].update({field: post[field] for field in (*STATS_FIELDS, 'fetched')})
+        else:
+            self.posts[post['id']] = post
+        self.newest = max(self.newest, post['created_utc'])
+        return not known
+
+    def prune(self, before):
+        old = [post_id for post_id, post in self.posts.items() if post['created_utc'] < before]
+        for post_id in old:
+            del self.posts[post_id]
+        if self.covered_from is not None and self.covered_from < before:
+            self.covered_from = before
+        return len(old)
+
+
+class PostStore:
+    def __init__(self, root=DEFAULT_ROOT, retention=31 * 86400, stats_age=2 * 86400):
+        """
+        Args:
+            root (str): Folder for the per-subreddit JSON files
+            retention (float): Seconds a post is kept after it was created
+            stats_age (float): Posts younger than this get their score and comment count refreshed
+        """
+        self.root = root
+        self.retention = retention
+        self.stats_age = stats_age
+        self.new_posts = 0
+        self.refreshed = 0
+        self._subreddits = {}
+        self._lock = threading.RLock()
+
+    def _path(self, name):
+        return os.path.join(self.root, f"{name.lower()}.json")
+
+    def _get(self, name):
+        subreddit = self._subreddits.get(name)
+        if subreddit is None:
+            try:
+                with open(self._path(name)) as f:
+                    subreddit = SubredditPosts.from_dict(name, json.load(f))
+            except (OSError, ValueError):
+                subreddit = SubredditPosts(name)
+            self._subreddits[name] = subreddit
+        return subreddit
+
+    def _save(self, subreddit):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(subreddit.name)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(subreddit.to_dict(), f)
+        os.replace(tmp, path)
+
+    def refresh(self, reddit, name, since=None, timeframe='week', limit=100):
+        """
+        Bring a subreddit's posts up to date
+
+        Args:
+            reddit (praw.Reddit): API client
+            name (str): Subreddit name
+            since (float): Start of the window the caller needs (unix seconds, None for all)
+            timeframe (str): Reddit's time filter for the `top` seed listing
+            limit (int): Posts to read per listing when seeding
+
+        Returns:
+            int: Number of posts that were not stored yet
+        """
+        with self._lock:
+            started = time.time()
+            subreddit = self._get(name)
+            api = reddit.subreddit(name)
+            added = 0
+
+            if subreddit.covered_from is None or (since is not None and since < subreddit.covered_from):
+                # Seed: `new` back to the window start, at most `limit` posts (as deep as the old fetch went)
+                oldest = started
+                for submission in api.new(limit=limit):
+                    if since and submission.created_utc < since:
+                        break
+                    added += subreddit.add(_post(submission, 'new'))
+                    oldest = min(oldest, submission.created_utc)
+                covered = since if since else oldest
+                subreddit.covered_from = min(subreddit.covered_from or covered, covered)
+            else:
+                # Only what is newer than the high-water mark
+                newest = subreddit.newest
+                for submission in api.new(limit=None):
+                    if submission.created_utc < newest or (since and submission.created_utc < since):
+                        break
+                    added += subreddit.add(_post(submission, 'new'))
+
+            if timeframe not in subreddit.seeded:
+                for submission in api.top(limit=limit, time_filter=timeframe):
+                    added += subreddit.add(_post(submission, 'top'))
+                subreddit.seeded.add(timeframe)
+
+            self._refresh_stats(reddit, subreddit, started)
+            if since:
+                subreddit.prune(min(since, started - self.retention))
+            self.new_posts += added
+            self._save(subreddit)
+            return added
+
+    def _refresh_stats(self, reddit, subreddit, started):
+        """Re-read score and comment count of recent posts not fetched since `started`"""
+        cutoff = started - self.stats_age
+        stale = [post_id for post_id, post in subreddit.posts.items()
+                 if post['created_utc'] >= cutoff and post['fetched'] < started]
+        for i in range(0, len(stale), INFO_BATCH):
+            fullnames = [f"t3_{post_id}" for post_id in stale[i:i + INFO_BATCH]]
+            for submission in reddit.info(fullnames=fullnames):
+                post = subreddit.posts.get(submission.id)
+                if post is not None:
+                    post.update({field: getattr(submission, field) for field in STATS_FIELDS})
+                    post['fetched'] = time.time()
+                    self.refreshed += 1
+
+    def posts(self, name, since=None):
+        """A subreddit's stored posts created at or after `since`, newest first"""
+        with self._lock:
+            posts = self._get(name).posts.values()
+            if since:
+                posts = [post for post in posts if post['created_utc'] >= since]
+            return sorted(posts, key=lambda post: post['created_utc'], reverse=True)
+
+    def stats(self):
+        with self._lock:
+            return {"new_posts": self.new_posts, "refreshed": self.refreshed,
+                    "subreddits": {name: len(s.posts) for name, s in self._subreddits.items()}}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_post_store():
+    """Process-wide post store (a subreddit's file is read on first use)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PostStore()
+        return _store
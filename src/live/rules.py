@@ -0,0 +1,227 @@
+# rules.py
+"""
+Declarative entry/exit rules for the live strategies.
+
+A rule is a condition written in Python expression syntax over feature
+names, for example:
+
+    ma20 > ma50 * 1.02 and 40 < rsi < 70
+    cross_below(macd, macd_signal) or close < prev.close * 0.98
+
+Bare names are the latest candle's features. `prev.name` is the same
+feature one candle earlier. cross_above(a, b) means a > b now and a < b
+one candle ago; cross_below(a, b) is the mirror image. Both comparisons
+are strict. Supported syntax: + - * /, comparisons (chained too),
+and/or/not, numbers and abs(). Precedence is Python's, so `a or b and c`
+means `a or (b and c)`, exactly as in the hand-written conditions the
+rules replaced.
+
+RuleSet compiles each rule once into two functions:
+
+- A scalar evaluator over flat feature tuples. It turns every lookup into
+  a tuple index, so evaluating a rule on the latest snapshot takes
+  microseconds. The live bots use it on every candle.
+- A numpy evaluator over whole feature columns. It gives one boolean per
+  candle of a history, for backtesting the same rules (evaluate_frame).
+
+Division follows numpy semantics in both: x/0 is +/-inf and 0/0 is NaN, so
+a flat Bollinger band cannot raise in the live path. Any comparison with
+NaN is False, as in pandas.
+"""
+import ast
+from operator import itemgetter
+
+import numpy as np
+
+from indicators import _div
+
+FUNCTIONS = {'cross_above', 'cross_below', 'abs'}
+
+_COMPARE = {ast.Gt: '>', ast.GtE: '>=', ast.Lt: '<', ast.LtE: '<=', ast.Eq: '==', ast.NotEq: '!='}
+_ARITH = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*'}
+
+
+def parse(text):
+    """Parse a rule into an AST expression (multi-line rules are allowed)"""
+    try:
+        return ast.parse(f"(\n{text}\n)", mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid rule {text.strip()!r}: {e.msg}") from None
+
+
+class _Layout:
+    """Positions of the features in the flat tuples, assigned as the code generator meets them"""
+
+    def __init__(self):
+        self.last = {}
+        self.prev = {}
+
+    def slot(self, name, prev):
+        index = self.prev if prev else self.last
+        return index.setdefault(name, len(index))
+
+
+class _CodeGen:
+    """Turns a rule AST into a Python expression over the tuples `l` (latest) and `p` (previous)"""
+
+    def __init__(self, layout, vector):
+        self.layout = layout
+        self.vector = vector
+
+    def __call__(self, node, prev=False):
+        method = getattr(self, f"_{type(node).__name__}", None)
+        if method is None:
+            raise ValueError(f"Unsupported syntax in rule: {ast.unparse(node)}")
+        return method(node, prev)
+
+    def _Name(self, node, prev):
+        if node.id in FUNCTIONS or node.id == 'prev':
+            raise ValueError(f"'{node.id}' cannot be used as a value")
+        return f"{'p' if prev else 'l'}[{self.layout.slot(node.id, prev)}]"
+
+    def _Attribute(self, node, prev):
+        if not (isinstance(node.value, ast.Name) and node.value.id == 'prev'):
+            raise ValueError(f"Unsupported attribute in rule: {ast.unparse(node)}")
+        if prev:
+            raise ValueError(f"prev.{node.attr} is already one candle back: {ast.unparse(node)}")
+        return f"p[{self.layout.slot(node.attr, True)}]"
+
+    def _Constant(self, node, prev):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError(f"Only numbers are allowed as constants, got {node.value!r}")
+        return repr(float(node.value))
+
+    def _UnaryOp(self, node, prev):
+        operand = self(node.operand, prev)
+        if isinstance(node.op, ast.USub):
+            return f"(-{operand})"
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if isinstance(node.op, ast.Not):
+            return f"(~_b({operand}))" if self.vector else f"(not {operand})"
+        raise ValueError(f"Unsupported operator in rule: {ast.unparse(node)}")
+
+    def _BinOp(self, node, prev):
+        left, right = self(node.left, prev), self(node.right, prev)
+        if isinstance(node.op, ast.Div):
+            return f"_div({left}, {right})"
+        if type(node.op) not in _ARITH:
+            raise ValueError(f"Unsupported operator in rule: {ast.unparse(node)}")
+        return f"({left} {_ARITH[type(node.op)]} {right})"
+
+    def _BoolOp(self, node, prev):
+        values = [self(value, prev) for value in node.values]
+        if self.vector:
+            op = ' & ' if isinstance(node.op, ast.And) else ' | '
+            return '(' + op.join(f"_b({value})" for value in values) + ')'
+        op = ' and ' if isinstance(node.op, ast.And) else ' or '
+        return '(' + op.join(values) + ')'
+
+    def _Compare(self, node, prev):
+        operands = [self(node.left, prev)] + [self(c, prev) for c in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARE:
+                raise ValueError(f"Unsupported comparison in rule: {ast.unparse(node)}")
+            ops.append(_COMPARE[type(op)])
+        if not self.vector:
+            parts = [operands[0]]
+            for op, operand in zip(ops, operands[1:]):
+                parts += [op, operand]
+            return '(' + ' '.join(parts) + ')'
+        pairs = [f"({a} {op} {b})" for a, op, b in zip(operands, ops, operands[1:])]
+        return pairs[0] if len(pairs) == 1 else '(' + ' & '.join(pairs) + ')'
+
+    def _Call(self, node, prev):
+        name = getattr(node.func, 'id', None)
+        if name not in FUNCTIONS or node.keywords:
+            raise ValueError(f"Unknown function in rule: {ast.unparse(node)}")
+        if name == 'abs':
+            if len(node.args) != 1:
+                raise ValueError(f"abs() takes one argument: {ast.unparse(node)}")
+            return f"{'np.abs' if self.vector else 'abs'}({self(node.args[0], prev)})"
+
+        if len(node.args) != 2 or prev:
+            raise ValueError(f"{name}(a, b) takes two arguments on the latest candle: {ast.unparse(node)}")
+        a, b = node.args
+        now, before = ('>', '<') if name == 'cross_above' else ('<', '>')
+        parts = [f"({self(a)} {now} {self(b)})", f"({self(a, True)} {before} {self(b, True)})"]
+        return '(' + (' & ' if self.vector else ' and ').join(parts) + ')'
+
+
+def _as_bool(x):
+    return np.asarray(x, dtype=bool)
+
+
+class RuleSet:
+    """Entry and exit rules of one strategy, compiled once"""
+
+    def __init__(self, entry, exit, price='close'):
+        """
+        Args:
+            entry (str): Rule that opens a position
+            exit (str): Rule that closes it
+            price (str): Feature returned as the trade price
+        """
+        self.rules = {'entry': entry, 'exit': exit}
+        self.price = price
+        trees = {name: parse(text) for name, text in self.rules.items()}
+
+        layout = _Layout()
+        scalar, vector = _CodeGen(layout, vector=False), _CodeGen(layout, vector=True)
+        self._entry = self._compile(f"bool({scalar(trees['entry'])})", 'entry')
+        self._exit = self._compile(f"bool({scalar(trees['exit'])})", 'exit')
+        self._entry_vector = self._compile(vector(trees['entry']), 'entry', vector=True)
+        self._exit_vector = self._compile(vector(trees['exit']), 'exit', vector=True)
+
+        # Only the features a rule actually reads on each candle are gathered
+        self.features = list(layout.last)
+        self.prev_features = list(layout.prev)
+        self._gather = self._getter(self.features)
+        self._gather_prev = self._getter(self.prev_features)
+
+    @staticmethod
+    def _getter(names):
+        if not names:
+            return lambda m: ()
+        if len(names) == 1:
+            return lambda m: (m[names[0]],)  # itemgetter with one key returns the value, not a 1-tuple
+        return itemgetter(*names)
+
+    @staticmethod
+    def _compile(source, name, vector=False):
+        code = compile(f"lambda l, p: {source}", f"<rule {name}>", 'eval')
+        return eval(code, {'_div': np.divide if vector else _div, '_b': _as_bool, 'np': np})
+
+    # === Latest candle ===
+    def vectors(self, last, prev):
+        """Flat feature tuples of the latest and previous snapshots (dicts, pandas rows, ...)"""
+        return self._gather(last), self._gather_prev(prev)
+
+    def evaluate(self, last, prev):
+        """(entry, exit) for the flat feature tuples from vectors()"""
+        return self._entry(last, prev), self._exit(last, prev)
+
+    def __call__(self, last, prev):
+        """Drop-in for the old _*_signals(last, prev): returns (entry, exit, price)"""
+        l, p = self._gather(last), self._gather_prev(prev)
+        return self._entry(l, p), self._exit(l, p), last[self.price]
+
+    # === Whole history ===
+    def evaluate_frame(self, df):
+        """
+        Evaluate the rules on every row of a feature frame (one row per candle,
+        with the columns the *_strategy functions compute). Row i is compared
+        with row i-1; the first row has no previous candle, so its prev
+        features are NaN.
+
+        Returns:
+            tuple: (entry, exit) boolean numpy arrays, one value per row
+        """
+        columns = [np.asarray(df[name], dtype=float) for name in self.features]
+        prev = [np.concatenate(([np.nan], np.asarray(df[name], dtype=float)[:-1])) for name in self.prev_features]
+        n = len(df)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entry = np.broadcast_to(_as_bool(self._entry_vector(columns, prev)), (n,))
+            exit = np.broadcast_to(_as_bool(self._exit_vector(columns, prev)), (n,))
+        return entry.copy(), exit.copy()
@@ -1,27 +1,172 @@
 # state_utils.py
+"""
+Position state for the live bots, one JSON file per symbol under state/.
+
+Saves are atomic: the new state is written to a temp file in the same
+directory, fsynced and renamed over the old file, so a crash (even kill -9)
+in the middle of a save leaves either the previous or the new state on disk,
+never a half-written file. scripts/check_state_recovery.py kills a writer
+mid-save in a loop to verify this.
+
+Reads are served from an in-process cache shared by every caller in the
+process. A cached entry is trusted for `refresh_interval` seconds; after
+that one os.stat checks whether another process (e.g. the Telegram bot
+reading what the trading process wrote) changed the file. Callbacks
+registered with subscribe() are called after every save in this process
+and whenever a reload picks up an outside change.
+"""
 import os
 import json
+import time
+import logging
+import threading
+from types import MappingProxyType
 
 STATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'state'))
 os.makedirs(STATE_DIR, exist_ok=True)
 
+DEFAULT_STATE = MappingProxyType({
+    "in_position": False,
+    "entry_price": 0,
+    "last_trade_time": 0,
+    "win_count": 0,
+    "total_trades": 0
+})
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore:
+    def __init__(self, state_dir=STATE_DIR, refresh_interval=1.0):
+        """
+        Args:
+            state_dir (str): Directory holding the {symbol}_state.json files
+            refresh_interval (float): Seconds a cached state is served without checking the file
+        """
+        self.state_dir = state_dir
+        self.refresh_interval = refresh_interval
+        self._cache = {}  # symbol -> (state, mtime_ns, checked_at)
+        self._listeners = []
+        self._lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+        self._remove_stale_temp_files()
+
+    def path(self, symbol):
+        return os.path.join(self.state_dir, f"{symbol.lower()}_state.json")
+
+    def _remove_stale_temp_files(self):
+        """Temp files left by a save that was killed before its rename"""
+        for name in os.listdir(self.state_dir):
+            if not name.endswith('.tmp'):
+                continue
+            try:
+                pid = int(name.split('.')[-3])
+                os.kill(pid, 0)
+                continue  # writer still alive, its save may be in progress
+            except (ValueError, IndexError, ProcessLookupError):
+                pass
+            except PermissionError:
+                continue
+            try:
+                os.remove(os.path.join(self.state_dir, name))
+            except OSError:
+                pass
+
+    # === Reading ===
+    def get(self, symbol):
+        """
+        Current state of a symbol as a read-only mapping (DEFAULT_STATE when
+        nothing was saved yet). Served from memory while the cache is fresh.
+        """
+        entry = self._cache.get(symbol)
+        if entry is not None and time.monotonic() - entry[2] < self.refresh_interval:
+            return entry[0]
+        return self._refresh(symbol, entry)
+
+    def _refresh(self, symbol, entry):
+        path = self.path(symbol)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if entry is not None and entry[1] == mtime:
+            state = entry[0]
+        elif mtime is None:
+            state = DEFAULT_STATE
+        else:
+            try:
+                with open(path, 'r') as f:
+                    state = MappingProxyType(json.load(f))
+            except ValueError as e:
+                # Only a file written by the old in-place save can be torn
+                logger.error(f"Corrupt state file {path} ({e}); starting from the default state")
+                state = DEFAULT_STATE
+
+        with self._lock:
+            self._cache[symbol] = (state, mtime, time.monotonic())
+        if entry is not None and entry[1] != mtime:
+            self._notify(symbol, state)
+        return state
+
+    # === Writing ===
+    def save(self, symbol, state):
+        """Atomically replace a symbol's state on disk and in the cache"""
+        path = self.path(symbol)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(dict(state), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._fsync_dir()
+
+        frozen = MappingProxyType(dict(state))
+        with self._lock:
+            self._cache[symbol] = (frozen, os.stat(path).st_mtime_ns, time.monotonic())
+        self._notify(symbol, frozen)
+        return frozen
+
+    def _fsync_dir(self):
+        # Persist the rename itself; not supported on every platform
+        try:
+            fd = os.open(self.state_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    # === Change notifications ===
+    def subscribe(self, callback):
+        """Call callback(symbol, state) whenever a symbol's state changes"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, symbol, state):
+        for callback in list(self._listeners):
+            try:
+                callback(symbol, state)
+            except Exception as e:
+                logger.error(f"State listener failed for {symbol}: {e}")
+
+
+# Shared by every bot and status reader in the process
+store = StateStore()
+
 def get_state_path(symbol):
-    return os.path.join(STATE_DIR, f"{symbol.lower()}_state.json")
+    return store.path(symbol)
 
 def load_state(symbol):
-    path = get_state_path(symbol)
-    if not os.path.exists(path):
-        return {
-            "in_position": False,
-            "entry_price": 0,
-            "last_trade_time": 0,
-            "win_count": 0,
-            "total_trades": 0
-        }
-    with open(path, 'r') as f:
-        return json.load(f)
+    return store.get(symbol)
 
 def save_state(symbol, state):
-    path = get_state_path(symbol)
-    with open(path, 'w') as f:
-        json.dump(state, f)
+    return store.save(symbol, state)
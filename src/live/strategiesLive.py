@@ -1,5 +1,13 @@
 # strategies.py
-import pandas as pd
+import time
+import numpy as np
+from indicators import (
+    IndicatorEngine, Lag, RollingMean, RollingStd, EWM, RSI, ATR, ADX, CCI, OBV,
+    BollingerBands, MACD, Stochastic, MarketStructure, _div
+)
+from rules import RuleSet
+# pandas is imported by the two frame helpers that need it (calculate_atr,
+# calculate_obv); the live engine only uses the incremental indicators
 def eth_strategy(df):
     """
     Ethereum strategy focused on trend following with multiple confirmations.
@@ -7,6 +15,11 @@ def eth_strategy(df):
     using moving averages and momentum indicators to capture ETH's tendency
     to form sustained trends while managing volatility.
     """
+    eth_features(df)
+    return _eth_signals(df.iloc[-1], df.iloc[-2])
+
+def eth_features(df):
+    """Add the indicator columns the ETH rules read to df (in place, every row)"""
     # Calculate multiple moving averages for more complex analysis
     df['ma20'] = df['close'].rolling(window=20).mean()
     df['ma50'] = df['close'].rolling(window=50).mean()
@@ -34,36 +47,34 @@ def eth_strategy(df):
     df['atr'] = calculate_atr(df, 14)
     df['atr_percent'] = df['atr'] / df['close'] * 100
     
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-    
+    return df
+
+ETH_RULES = RuleSet(
     # Complex entry conditions with multiple confirmations
-    entry_condition = (
-        last['ma20'] > last['ma50'] * 1.02 and 
-        last['ma50'] > last['ma100'] * 1.01 and
-        last['rsi'] < 70 and last['rsi'] > 40 and
-        last['rsi_slow'] > prev['rsi_slow'] and
-        last['stoch_k'] > last['stoch_d'] and
-        last['macd'] > last['macd_signal'] and
-        (last['volume_ratio'] > 1.2 or last['close'] < last['bollinger_lower']) and
-        last['close'] > last['ma20'] * 0.98
-    )
-    
+    entry="""
+        ma20 > ma50 * 1.02 and
+        ma50 > ma100 * 1.01 and
+        rsi < 70 and rsi > 40 and
+        rsi_slow > prev.rsi_slow and
+        stoch_k > stoch_d and
+        macd > macd_signal and
+        (volume_ratio > 1.2 or close < bollinger_lower) and
+        close > ma20 * 0.98
+    """,
     # Sophisticated exit strategy with multiple risk factors
-    exit_condition = (
-        (last['volume'] > df['volume_ma'].iloc[-1] * 1.5 and last['close'] < prev['close']) or 
-        last['close'] < last['ma20'] * 0.98 or
-        last['momentum_short'] < 0 and last['momentum_medium'] < 0 or
-        last['rsi'] > 80 or
-        last['macd'] < last['macd_signal'] and prev['macd'] > prev['macd_signal'] or
-        last['close'] < last['bollinger_lower'] * 0.99
-    )
-    
-    return (
-        entry_condition,
-        exit_condition,
-        last['close']
-    )
+    exit="""
+        (volume > volume_ma * 1.5 and close < prev.close) or
+        close < ma20 * 0.98 or
+        momentum_short < 0 and momentum_medium < 0 or
+        rsi > 80 or
+        cross_below(macd, macd_signal) or
+        close < bollinger_lower * 0.99
+    """,
+)
+
+def _eth_signals(last, prev):
+    return ETH_RULES(last, prev)
+
 
 def link_strategy(df):
     """
@@ -72,6 +83,11 @@ def link_strategy(df):
     with volume confirmation and trend strength indicators (ADX) to filter out false signals
     in LINK's sometimes choppy market conditions.
     """
+    link_features(df)
+    return _link_signals(df.iloc[-1], df.iloc[-2])
+
+def link_features(df):
+    """Add the indicator columns the LINK rules read to df (in place, every row)"""
     # Multiple exponential moving averages
     df['ema_very_fast'] = df['close'].ewm(span=3).mean()
     df['ema_fast'] = df['close'].ewm(span=5).mean()
@@ -94,40 +110,38 @@ def link_strategy(df):
     df['volume_ma'] = df['volume'].rolling(window=10).mean()
     df['volume_ratio'] = df['volume'] / df['volume_ma']
     df['obv'] = calculate_obv(df)
+    df['obv_lag3'] = df['obv'].shift(3)
     
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-    prev2 = df.iloc[-3]
+    return df
 
+LINK_RULES = RuleSet(
     # Complex entry with multiple confirmations and trend strength
-    entry_condition = (
-        last['ema_fast'] > last['ema_slow'] * 1.01 and 
-        last['ema_medium'] > last['ema_slow'] and
-        last['momentum_short'] > 0 and 
-        last['rate_of_change'] > 1.5 and
-        prev['ema_fast'] <= prev['ema_slow'] and
-        last['adx'] > 25 and  # Strong trend
-        last['volume_ratio'] > 1.1 and
-        last['obv'] > df['obv'].shift(3).iloc[-1] and
-        last['close'] > last['bollinger_middle'] and
-        (last['close'] - last['bollinger_lower']) / (last['bollinger_upper'] - last['bollinger_lower']) < 0.7  # Not overbought
-    )
-    
+    entry="""
+        ema_fast > ema_slow * 1.01 and
+        ema_medium > ema_slow and
+        momentum_short > 0 and
+        rate_of_change > 1.5 and
+        prev.ema_fast <= prev.ema_slow and
+        adx > 25 and  # Strong trend
+        volume_ratio > 1.1 and
+        obv > obv_lag3 and
+        close > bollinger_middle and
+        (close - bollinger_lower) / (bollinger_upper - bollinger_lower) < 0.7  # Not overbought
+    """,
     # Sophisticated exit with multiple risk factors
-    exit_condition = (
-        last['close'] < last['ema_slow'] * 0.99 or 
-        last['momentum_short'] < 0 and last['momentum_medium'] < 0 or
-        last['ema_very_fast'] < last['ema_fast'] and prev['ema_very_fast'] > prev['ema_fast'] or
-        last['close'] < last['bollinger_lower'] or
-        last['adx'] < 20 and last['momentum_short'] < 0 or  # Weakening trend
-        last['volume_ratio'] > 2.0 and last['close'] < prev['close']  # Volume spike with price drop
-    )
-
-    return (
-        entry_condition,
-        exit_condition,
-        last['close']
-    )
+    exit="""
+        close < ema_slow * 0.99 or
+        momentum_short < 0 and momentum_medium < 0 or
+        cross_below(ema_very_fast, ema_fast) or
+        close < bollinger_lower or
+        adx < 20 and momentum_short < 0 or  # Weakening trend
+        volume_ratio > 2.0 and close < prev.close  # Volume spike with price drop
+    """,
+)
+
+def _link_signals(last, prev):
+    return LINK_RULES(last, prev)
+
 
 def matic_strategy(df):
     """
@@ -136,6 +150,11 @@ def matic_strategy(df):
     to enter during steady rises rather than volatile spikes, with multiple timeframe
     analysis to confirm sustainable trends in this relatively newer asset.
     """
+    matic_features(df)
+    return _matic_signals(df.iloc[-1], df.iloc[-2])
+
+def matic_features(df):
+    """Add the indicator columns the MATIC rules read to df (in place, every row)"""
     # Multiple timeframe analysis
     df['ema_very_fast'] = df['close'].ewm(span=5).mean()
     df['ema_fast'] = df['close'].ewm(span=10).mean()
@@ -165,44 +184,41 @@ def matic_strategy(df):
     df['higher_low'] = (df['low'] > df['low'].shift(1)) & (df['low'].shift(1) > df['low'].shift(2))
     df['lower_low'] = (df['low'] < df['low'].shift(1)) & (df['low'].shift(1) < df['low'].shift(2))
     
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-    prev2 = df.iloc[-3]
+    return df
 
+MATIC_RULES = RuleSet(
     # Complex entry with multiple confirmations and volatility filters
-    entry_condition = (
-        last['ema_fast'] > last['ema_slow'] * 1.03 and 
-        last['ema_medium'] > last['ema_slow'] * 1.01 and
-        last['momentum_short'] > 0 and 
-        last['momentum_medium'] > 0 and
-        prev['ema_fast'] <= prev['ema_slow'] and
-        last['volatility_short'] < last['close'] * 0.03 and
-        last['volatility_short'] < last['volatility_medium'] * 0.9 and  # Decreasing volatility
-        last['rsi'] > 50 and last['rsi'] < 70 and  # Not overbought
-        last['stoch_k'] > last['stoch_d'] and
-        last['cci'] > 0 and
-        last['higher_high'] and
-        last['higher_low'] and
-        last['price_change'] > 0 and last['price_change'] < 3  # Steady rise, not a spike
-    )
-    
+    entry="""
+        ema_fast > ema_slow * 1.03 and
+        ema_medium > ema_slow * 1.01 and
+        momentum_short > 0 and
+        momentum_medium > 0 and
+        prev.ema_fast <= prev.ema_slow and
+        volatility_short < close * 0.03 and
+        volatility_short < volatility_medium * 0.9 and  # Decreasing volatility
+        rsi > 50 and rsi < 70 and  # Not overbought
+        stoch_k > stoch_d and
+        cci > 0 and
+        higher_high and
+        higher_low and
+        price_change > 0 and price_change < 3  # Steady rise, not a spike
+    """,
     # Sophisticated exit with multiple risk factors and trend reversal signals
-    exit_condition = (
-        last['momentum_short'] < 0 or 
-        last['close'] < last['ema_fast'] * 0.98 or
-        (last['ema_very_fast'] < last['ema_fast'] and prev['ema_very_fast'] > prev['ema_fast']) or
-        last['rsi'] < 40 or last['rsi'] > 80 or
-        (last['stoch_k'] < last['stoch_d'] and prev['stoch_k'] > prev['stoch_d']) or
-        last['cci'] < -100 or
-        last['lower_low'] or
-        (last['volatility_short'] > last['volatility_medium'] * 1.5 and last['price_change'] < 0)  # Volatility spike with price drop
-    )
-
-    return (
-        entry_condition,
-        exit_condition,
-        last['close']
-    )
+    exit="""
+        momentum_short < 0 or
+        close < ema_fast * 0.98 or
+        cross_below(ema_very_fast, ema_fast) or
+        rsi < 40 or rsi > 80 or
+        cross_below(stoch_k, stoch_d) or
+        cci < -100 or
+        lower_low or
+        (volatility_short > volatility_medium * 1.5 and price_change < 0)  # Volatility spike with price drop
+    """,
+)
+
+def _matic_signals(last, prev):
+    return MATIC_RULES(last, prev)
+
 
 def doge_strategy(df):
     """
@@ -212,6 +228,11 @@ def doge_strategy(df):
     and volume analysis to identify genuine momentum from social media-driven surges,
     with quick exit conditions to protect profits in this highly volatile asset.
     """
+    doge_features(df)
+    return _doge_signals(df.iloc[-1], df.iloc[-2])
+
+def doge_features(df):
+    """Add the indicator columns the DOGE rules read to df (in place, every row)"""
     # Multiple moving averages for trend analysis
     df['ma_10'] = df['close'].rolling(window=10).mean()
     df['ma_20'] = df['close'].rolling(window=20).mean()
@@ -228,6 +249,7 @@ def doge_strategy(df):
     df['prev_close'] = df['close'].shift(1)
     df['prev_high'] = df['high'].shift(1)
     df['prev_low'] = df['low'].shift(1)
+    df['prev_open'] = df['open'].shift(1)
     df['momentum_short'] = df['close'].pct_change(3) * 100
     df['momentum_medium'] = df['close'].pct_change(7) * 100
     df['momentum_long'] = df['close'].pct_change(14) * 100
@@ -241,6 +263,7 @@ def doge_strategy(df):
     df['volume_ma'] = df['volume'].rolling(window=20).mean()
     df['volume_ratio'] = df['volume'] / df['volume_ma']
     df['obv'] = calculate_obv(df)
+    df['obv_lag5'] = df['obv'].shift(5)
     
     # Volatility measures
     df['atr'] = calculate_atr(df, 14)
@@ -252,45 +275,42 @@ def doge_strategy(df):
     df['higher_low'] = (df['low'] > df['low'].shift(1)) & (df['low'].shift(1) > df['low'].shift(2))
     df['bullish_engulfing'] = (df['open'] < df['prev_close']) & (df['close'] > df['prev_open'])
     
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-    prev2 = df.iloc[-3]
+    return df
 
+DOGE_RULES = RuleSet(
     # Complex entry with multiple confirmations, trend alignment, and pattern recognition
-    entry_condition = (
-        last['ma_20'] > last['ma_50'] * 1.01 and 
-        last['ma_50'] > last['ma_100'] * 1.01 and 
-        last['ma_100'] > last['ma_200'] * 1.005 and  # Strong uptrend across timeframes
-        last['close'] > prev['close'] * 1.05 and  # Significant price increase
-        last['ema_5'] > last['ema_13'] and
-        last['ema_13'] > last['ema_26'] and
-        last['rsi'] > 50 and last['rsi'] < 75 and  # Strong but not overbought
-        last['macd'] > last['macd_signal'] and
-        last['stoch_k'] > last['stoch_d'] and last['stoch_k'] < 80 and
-        last['volume_ratio'] > 1.2 and  # Above average volume
-        last['obv'] > df['obv'].shift(5).iloc[-1] and  # Rising OBV
-        (last['higher_high'] or last['bullish_engulfing']) and
-        last['close'] > last['bollinger_middle'] and
-        last['momentum_short'] > 2 and last['momentum_medium'] > 5  # Strong momentum
-    )
-    
+    entry="""
+        ma_20 > ma_50 * 1.01 and
+        ma_50 > ma_100 * 1.01 and
+        ma_100 > ma_200 * 1.005 and  # Strong uptrend across timeframes
+        close > prev.close * 1.05 and  # Significant price increase
+        ema_5 > ema_13 and
+        ema_13 > ema_26 and
+        rsi > 50 and rsi < 75 and  # Strong but not overbought
+        macd > macd_signal and
+        stoch_k > stoch_d and stoch_k < 80 and
+        volume_ratio > 1.2 and  # Above average volume
+        obv > obv_lag5 and  # Rising OBV
+        (higher_high or bullish_engulfing) and
+        close > bollinger_middle and
+        momentum_short > 2 and momentum_medium > 5  # Strong momentum
+    """,
     # Sophisticated exit with multiple risk factors, trend reversal signals, and volatility-based stops
-    exit_condition = (
-        last['close'] < last['ma_20'] * 0.98 or
-        (last['ema_5'] < last['ema_13'] and prev['ema_5'] > prev['ema_13']) or
-        last['rsi'] < 40 or last['rsi'] > 80 or
-        (last['macd'] < last['macd_signal'] and prev['macd'] > prev['macd_signal']) or
-        last['close'] < last['bollinger_lower'] or
-        (last['volume_ratio'] > 2.0 and last['close'] < prev['close']) or  # Volume spike with price drop
-        last['momentum_short'] < -3 or  # Sharp momentum reversal
-        (last['atr_percent'] > 5 and last['close'] < prev['close'])  # High volatility with price drop
-    )
-
-    return (
-        entry_condition,
-        exit_condition,
-        last['close']
-    )
+    exit="""
+        close < ma_20 * 0.98 or
+        cross_below(ema_5, ema_13) or
+        rsi < 40 or rsi > 80 or
+        cross_below(macd, macd_signal) or
+        close < bollinger_lower or
+        (volume_ratio > 2.0 and close < prev.close) or  # Volume spike with price drop
+        momentum_short < -3 or  # Sharp momentum reversal
+        (atr_percent > 5 and close < prev.close)  # High volatility with price drop
+    """,
+)
+
+def _doge_signals(last, prev):
+    return DOGE_RULES(last, prev)
+
 
 def arb_strategy(df):
     """
@@ -300,6 +320,11 @@ def arb_strategy(df):
     while filtering out noise. Includes sophisticated volatility analysis to manage risk
     in this relatively newer token with developing market patterns.
     """
+    arb_features(df)
+    return _arb_signals(df.iloc[-1], df.iloc[-2])
+
+def arb_features(df):
+    """Add the indicator columns the ARB rules read to df (in place, every row)"""
     # Multiple exponential moving averages for trend analysis
     df['ema_5'] = df['close'].ewm(span=5).mean()
     df['ema_10'] = df['close'].ewm(span=10).mean()
@@ -322,6 +347,7 @@ def arb_strategy(df):
     df['atr_percent'] = df['atr'] / df['close'] * 100
     df['bollinger_upper'], df['bollinger_middle'], df['bollinger_lower'] = calculate_bollinger_bands(df['close'])
     df['bollinger_width'] = (df['bollinger_upper'] - df['bollinger_lower']) / df['bollinger_middle'] * 100
+    df['bollinger_width_ma'] = df['bollinger_width'].rolling(window=20).mean()
     
     # Advanced oscillators
     df['rsi'] = calculate_rsi(df['close'], 14)
@@ -343,53 +369,50 @@ def arb_strategy(df):
     df['lower_high'] = (df['high'] < df['high'].shift(1)) & (df['high'].shift(1) < df['high'].shift(2))
     df['lower_low'] = (df['low'] < df['low'].shift(1)) & (df['low'].shift(1) < df['low'].shift(2))
     
-    last = df.iloc[-1]
-    prev = df.iloc[-2]
-    prev2 = df.iloc[-3]
+    return df
 
+ARB_RULES = RuleSet(
     # Complex entry with multiple confirmations, trend alignment, volatility filters, and oscillator signals
-    entry_condition = (
-        last['ema_10'] > last['ema_30'] * 1.01 and 
-        last['ema_30'] > last['ema_50'] * 1.005 and 
-        last['ema_50'] > last['ema_100'] * 1.002 and  # Strong uptrend across timeframes
-        last['momentum_short'] > 0 and 
-        last['momentum_medium'] > 0 and
-        prev['ema_10'] <= prev['ema_30'] and  # Fresh crossover
-        last['range'] < last['avg_range'] * 1.2 and  # Not excessive volatility
-        last['bollinger_width'] < df['bollinger_width'].rolling(window=20).mean().iloc[-1] * 1.1 and  # Not expanding volatility
-        last['rsi'] > 50 and last['rsi'] < 70 and  # Strong but not overbought
-        last['rsi'] > last['rsi_ma'] and  # Rising RSI
-        last['macd'] > last['macd_signal'] and
-        last['macd_hist'] > prev['macd_hist'] and  # Increasing histogram
-        last['adx'] > 25 and  # Strong trend
-        last['volume_ratio'] > 1.1 and  # Above average volume
-        last['obv'] > last['obv_ma'] and  # Rising OBV
-        (last['higher_high'] or last['higher_low']) and  # Bullish structure
-        last['close'] > last['bollinger_middle'] and
-        last['cci'] > 0 and last['cci'] < 200  # Positive but not extreme CCI
-    )
-    
+    entry="""
+        ema_10 > ema_30 * 1.01 and
+        ema_30 > ema_50 * 1.005 and
+        ema_50 > ema_100 * 1.002 and  # Strong uptrend across timeframes
+        momentum_short > 0 and
+        momentum_medium > 0 and
+        prev.ema_10 <= prev.ema_30 and  # Fresh crossover
+        range < avg_range * 1.2 and  # Not excessive volatility
+        bollinger_width < bollinger_width_ma * 1.1 and  # Not expanding volatility
+        rsi > 50 and rsi < 70 and  # Strong but not overbought
+        rsi > rsi_ma and  # Rising RSI
+        macd > macd_signal and
+        macd_hist > prev.macd_hist and  # Increasing histogram
+        adx > 25 and  # Strong trend
+        volume_ratio > 1.1 and  # Above average volume
+        obv > obv_ma and  # Rising OBV
+        (higher_high or higher_low) and  # Bullish structure
+        close > bollinger_middle and
+        cci > 0 and cci < 200  # Positive but not extreme CCI
+    """,
     # Sophisticated exit with multiple risk factors, trend reversal signals, and dynamic stops
-    exit_condition = (
-        last['momentum_short'] < 0 or 
-        last['close'] < last['ema_10'] * 0.99 or
-        (last['ema_5'] < last['ema_10'] and prev['ema_5'] > prev['ema_10']) or  # Fast EMA crossover
-        last['rsi'] < 40 or last['rsi'] > 80 or
-        (last['rsi'] < last['rsi_ma'] and prev['rsi'] > prev['rsi_ma']) or  # RSI crossing below its MA
-        (last['macd'] < last['macd_signal'] and prev['macd'] > prev['macd_signal']) or
-        last['adx'] < 20 and last['momentum_short'] < 0 or  # Weakening trend
-        last['close'] < last['bollinger_lower'] or
-        (last['volume_ratio'] > 2.0 and last['close'] < prev['close']) or  # Volume spike with price drop
-        (last['range_ratio'] > 1.5 and last['close'] < prev['close']) or  # Volatility spike with price drop
-        (last['lower_high'] and last['lower_low']) or  # Bearish structure
-        (last['cci'] < -100 and prev['cci'] > -100)  # CCI crossing below -100
-    )
-
-    return (
-        entry_condition,
-        exit_condition,
-        last['close']
-    )
+    exit="""
+        momentum_short < 0 or
+        close < ema_10 * 0.99 or
+        cross_below(ema_5, ema_10) or  # Fast EMA crossover
+        rsi < 40 or rsi > 80 or
+        cross_below(rsi, rsi_ma) or  # RSI crossing below its MA
+        cross_below(macd, macd_signal) or
+        adx < 20 and momentum_short < 0 or  # Weakening trend
+        close < bollinger_lower or
+        (volume_ratio > 2.0 and close < prev.close) or  # Volume spike with price drop
+        (range_ratio > 1.5 and close < prev.close) or  # Volatility spike with price drop
+        (lower_high and lower_low) or  # Bearish structure
+        (cci < -100 and prev.cci > -100)  # CCI crossing below -100
+    """,
+)
+
+def _arb_signals(last, prev):
+    return ARB_RULES(last, prev)
+
 
 def calculate_rsi(prices, period=14):
     delta = prices.diff()
@@ -405,6 +428,7 @@ def calculate_atr(df, period=14):
     high_close = (df['high'] - df['close'].shift()).abs()
     low_close = (df['low'] - df['close'].shift()).abs()
     
+    import pandas as pd
     ranges = pd.concat([high_low, high_close, low_close], axis=1)
     true_range = ranges.max(axis=1)
     
@@ -462,15 +486,339 @@ def calculate_adx(df, period=14):
     return adx
 
 def calculate_obv(df):
-    obv = pd.Series(index=df.index)
-    obv.iloc[0] = 0
-    
-    for i in range(1, len(df)):
-        if df['close'].iloc[i] > df['close'].iloc[i-1]:
-            obv.iloc[i] = obv.iloc[i-1] + df['volume'].iloc[i]
-        elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-            obv.iloc[i] = obv.iloc[i-1] - df['volume'].iloc[i]
+    """
+    On-balance volume, vectorised with NumPy.
+    Starts at 0 on the first candle; each later candle adds its volume on an
+    up-close, subtracts it on a down-close and carries over on an unchanged close.
+    indicators.OBV produces the same values one candle at a time.
+    """
+    import pandas as pd
+    close = df['close'].to_numpy(dtype=float)
+    volume = df['volume'].to_numpy(dtype=float)
+    if len(close) == 0:
+        return pd.Series(index=df.index, dtype=float)
+
+    # NaN closes compare False and count as unchanged, as in the old loop
+    step = np.where(close[1:] > close[:-1], volume[1:],
+                    np.where(close[1:] < close[:-1], -volume[1:], 0.0))
+    obv = np.empty(len(close))
+    obv[0] = 0
+    np.cumsum(step, out=obv[1:])
+    return pd.Series(obv, index=df.index)
+
+
+# === Incremental live evaluation ===
+# The *_strategy(df) functions above recompute every indicator column over the
+# whole kline frame. The engines below keep indicator state between ticks and
+# only advance it by the candles that closed since the last call, then feed the
+# latest two snapshots into the same _*_signals rules.
+
+class EthIndicators(IndicatorEngine):
+    def __init__(self, frame=None):
+        super().__init__(frame)
+        self.ma20, self.ma50, self.ma100 = RollingMean(20), RollingMean(50), RollingMean(100)
+        self.volume_ma = RollingMean(20)
+        self.lag3, self.lag7 = Lag(3), Lag(7)
+        self.rsi, self.rsi_slow = RSI(14), RSI(21)
+        self.stoch = Stochastic(14, 3)
+        self.macd = MACD()
+        self.bollinger = BollingerBands()
+
+    def _step(self, bar):
+        high, low, close, volume = bar['high'], bar['low'], bar['close'], bar['volume']
+        volume_ma = self.volume_ma.update(volume)
+        stoch_k, stoch_d = self.stoch.update(high, low, close)
+        macd, macd_signal, _ = self.macd.update(close)
+        _, _, bollinger_lower = self.bollinger.update(close)
+        return {
+            'ma20': self.ma20.update(close),
+            'ma50': self.ma50.update(close),
+            'ma100': self.ma100.update(close),
+            'volume_ma': volume_ma,
+            'volume_ratio': _div(volume, volume_ma),
+            'momentum_short': close - self.lag3.update(close),
+            'momentum_medium': close - self.lag7.update(close),
+            'rsi': self.rsi.update(close),
+            'rsi_slow': self.rsi_slow.update(close),
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'bollinger_lower': bollinger_lower,
+        }
+
+
+class LinkIndicators(IndicatorEngine):
+    def __init__(self, frame=None):
+        super().__init__(frame)
+        self.ema_very_fast, self.ema_fast = EWM(3), EWM(5)
+        self.ema_medium, self.ema_slow = EWM(8), EWM(13)
+        self.lag3, self.lag5, self.lag7 = Lag(3), Lag(5), Lag(7)
+        self.adx = ADX(14)
+        self.bollinger = BollingerBands()
+        self.volume_ma = RollingMean(10)
+        self.obv = OBV()
+        self.obv_lag3 = Lag(3)
+
+    def _step(self, bar):
+        high, low, close, volume = bar['high'], bar['low'], bar['close'], bar['volume']
+        bollinger_upper, bollinger_middle, bollinger_lower = self.bollinger.update(close)
+        obv = self.obv.update(close, volume)
+        return {
+            'ema_very_fast': self.ema_very_fast.update(close),
+            'ema_fast': self.ema_fast.update(close),
+            'ema_medium': self.ema_medium.update(close),
+            'ema_slow': self.ema_slow.update(close),
+            'momentum_short': close - self.lag3.update(close),
+            'momentum_medium': close - self.lag7.update(close),
+            'rate_of_change': (_div(close, self.lag5.update(close)) - 1) * 100,
+            'adx': self.adx.update(high, low, close),
+            'bollinger_upper': bollinger_upper,
+            'bollinger_middle': bollinger_middle,
+            'bollinger_lower': bollinger_lower,
+            'volume_ratio': _div(volume, self.volume_ma.update(volume)),
+            'obv': obv,
+            'obv_lag3': self.obv_lag3.update(obv),
+        }
+
+
+class MaticIndicators(IndicatorEngine):
+    def __init__(self, frame=None):
+        super().__init__(frame)
+        self.ema_very_fast, self.ema_fast = EWM(5), EWM(10)
+        self.ema_medium, self.ema_slow = EWM(21), EWM(30)
+        self.lag1, self.lag3, self.lag7 = Lag(1), Lag(3), Lag(7)
+        self.std10, self.std20 = RollingStd(10), RollingStd(20)
+        self.rsi = RSI(14)
+        self.stoch = Stochastic(14, 3)
+        self.cci = CCI(20)
+        self.structure = MarketStructure()
+
+    def _step(self, bar):
+        high, low, close = bar['high'], bar['low'], bar['close']
+        stoch_k, stoch_d = self.stoch.update(high, low, close)
+        features = {
+            'ema_very_fast': self.ema_very_fast.update(close),
+            'ema_fast': self.ema_fast.update(close),
+            'ema_medium': self.ema_medium.update(close),
+            'ema_slow': self.ema_slow.update(close),
+            'momentum_short': close - self.lag3.update(close),
+            'momentum_medium': close - self.lag7.update(close),
+            'price_change': (_div(close, self.lag1.update(close)) - 1) * 100,
+            'volatility_short': self.std10.update(close) / close * 100,
+            'volatility_medium': self.std20.update(close) / close * 100,
+            'rsi': self.rsi.update(close),
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'cci': self.cci.update(high, low, close),
+        }
+        features.update(self.structure.update(high, low))
+        return features
+
+
+class DogeIndicators(IndicatorEngine):
+    def __init__(self, frame=None):
+        super().__init__(frame)
+        self.ma_20, self.ma_50 = RollingMean(20), RollingMean(50)
+        self.ma_100, self.ma_200 = RollingMean(100), RollingMean(200)
+        self.ema_5, self.ema_13, self.ema_26 = EWM(5), EWM(13), EWM(26)
+        self.lag3, self.lag7 = Lag(3), Lag(7)
+        self.rsi = RSI(14)
+        self.macd = MACD()
+        self.stoch = Stochastic(14, 3)
+        self.volume_ma = RollingMean(20)
+        self.obv = OBV()
+        self.obv_lag5 = Lag(5)
+        self.atr = ATR(14)
+        self.bollinger = BollingerBands()
+        self.structure = MarketStructure()
+        self.prev_open = float('nan')
+        self.prev_close = float('nan')
+
+    def _step(self, bar):
+        open_, high, low, close, volume = bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']
+        macd, macd_signal, _ = self.macd.update(close)
+        stoch_k, stoch_d = self.stoch.update(high, low, close)
+        obv = self.obv.update(close, volume)
+        _, bollinger_middle, bollinger_lower = self.bollinger.update(close)
+        features = {
+            'ma_20': self.ma_20.update(close),
+            'ma_50': self.ma_50.update(close),
+            'ma_100': self.ma_100.update(close),
+            'ma_200': self.ma_200.update(close),
+            'ema_5': self.ema_5.update(close),
+            'ema_13': self.ema_13.update(close),
+            'ema_26': self.ema_26.update(close),
+            'momentum_short': (_div(close, self.lag3.update(close)) - 1) * 100,
+            'momentum_medium': (_div(close, self.lag7.update(close)) - 1) * 100,
+            'rsi': self.rsi.update(close),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'volume_ratio': _div(volume, self.volume_ma.update(volume)),
+            'obv': obv,
+            'obv_lag5': self.obv_lag5.update(obv),
+            'atr_percent': self.atr.update(high, low, close) / close * 100,
+            'bollinger_middle': bollinger_middle,
+            'bollinger_lower': bollinger_lower,
+            'bullish_engulfing': open_ < self.prev_close and close > self.prev_open,
+        }
+        features.update(self.structure.update(high, low))
+        self.prev_open, self.prev_close = open_, close
+        return features
+
+
+class ArbIndicators(IndicatorEngine):
+    def __init__(self, frame=None):
+        super().__init__(frame)
+        self.ema_5, self.ema_10, self.ema_30 = EWM(5), EWM(10), EWM(30)
+        self.ema_50, self.ema_100 = EWM(50), EWM(100)
+        self.lag3, self.lag7 = Lag(3), Lag(7)
+        self.avg_range = RollingMean(14)
+        self.bollinger = BollingerBands()
+        self.bollinger_width_ma = RollingMean(20)
+        self.rsi = RSI(14)
+        self.rsi_ma = RollingMean(5)
+        self.macd = MACD()
+        self.cci = CCI(20)
+        self.adx = ADX(14)
+        self.volume_ma = RollingMean(20)
+        self.obv = OBV()
+        self.obv_ma = RollingMean(10)
+        self.structure = MarketStructure()
+
+    def _step(self, bar):
+        high, low, close, volume = bar['high'], bar['low'], bar['close'], bar['volume']
+        candle_range = high - low
+        avg_range = self.avg_range.update(candle_range)
+        bollinger_upper, bollinger_middle, bollinger_lower = self.bollinger.update(close)
+        bollinger_width = (bollinger_upper - bollinger_lower) / bollinger_middle * 100
+        rsi = self.rsi.update(close)
+        macd, macd_signal, macd_hist = self.macd.update(close)
+        obv = self.obv.update(close, volume)
+        features = {
+            'ema_5': self.ema_5.update(close),
+            'ema_10': self.ema_10.update(close),
+            'ema_30': self.ema_30.update(close),
+            'ema_50': self.ema_50.update(close),
+            'ema_100': self.ema_100.update(close),
+            'momentum_short': close - self.lag3.update(close),
+            'momentum_medium': close - self.lag7.update(close),
+            'range': candle_range,
+            'avg_range': avg_range,
+            'range_ratio': _div(candle_range, avg_range),
+            'bollinger_middle': bollinger_middle,
+            'bollinger_lower': bollinger_lower,
+            'bollinger_width': bollinger_width,
+            'bollinger_width_ma': self.bollinger_width_ma.update(bollinger_width),
+            'rsi': rsi,
+            'rsi_ma': self.rsi_ma.update(rsi),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_hist': macd_hist,
+            'cci': self.cci.update(high, low, close),
+            'adx': self.adx.update(high, low, close),
+            'volume_ratio': _div(volume, self.volume_ma.update(volume)),
+            'obv': obv,
+            'obv_ma': self.obv_ma.update(obv),
+        }
+        features.update(self.structure.update(high, low))
+        return features
+
+
+LIVE_STRATEGIES = {
+    'eth': (EthIndicators, _eth_signals),
+    'link': (LinkIndicators, _link_signals),
+    'matic': (MaticIndicators, _matic_signals),
+    'doge': (DogeIndicators, _doge_signals),
+    'arb': (ArbIndicators, _arb_signals),
+}
+
+# Whole-history evaluation (live_replay): indicator columns over the full frame + the same rules
+STRATEGY_RULES = {
+    'eth': (eth_features, ETH_RULES),
+    'link': (link_features, LINK_RULES),
+    'matic': (matic_features, MATIC_RULES),
+    'doge': (doge_features, DOGE_RULES),
+    'arb': (arb_features, ARB_RULES),
+}
+
+
+class LiveStrategy:
+    """
+    Stateful drop-in for the *_strategy(df) functions used by the live bots.
+
+    Call it with the kline frame on every tick, exactly like eth_strategy(df).
+    The first call seeds the indicator engine from the frame's closed candles;
+    later calls only feed candles newer than the last one seen, so a tick
+    costs one candle's worth of updates. Candles that have not closed yet
+    (close_time in the future) are ignored, so signals are evaluated on the
+    latest closed candle. Returns (entry, exit, price).
+
+    With `frame` set (BotEngine passes the pair's frame), only the last
+    `frame` candles are used to seed, and features the frame never fills
+    stay NaN (see IndicatorEngine). Other state runs on from the seed
+    instead of restarting at the frame's first candle every tick, so
+    signals can differ from the *_strategy(df) functions on a fixed frame:
+    EWM and MACD values keep the weight of candles older than the frame
+    (negligible for short spans, noticeable for ARB's ema_100 on 100
+    candles), and OBV keeps its running level (the rules only compare OBV
+    with its own lag or mean, which the offset does not change).
+    """
+
+    def __init__(self, name, frame=None):
+        self.name = name
+        self.frame = frame
+        self.engine_cls, self.signals = LIVE_STRATEGIES[name]
+        self.engine = None
+
+    def _resume_at(self, timestamps):
+        """Index of the first timestamp the engine has not seen, or None to reseed"""
+        if self.engine is None or self.engine.frame != self.frame:
+            return None
+        last_seen = self.engine.last_timestamp
+        for i in range(len(timestamps) - 1, -1, -1):
+            if timestamps[i] == last_seen:
+                return i + 1
+        return None
+
+    def __call__(self, df):
+        if 'close_time' in df.columns:
+            df = df[df['close_time'].astype('int64') <= int(time.time() * 1000)]
+        if 'timestamp' not in df.columns:
+            df = df.assign(timestamp=df.index)
+        if self.frame:
+            df = df.iloc[-self.frame:]
+
+        start = self._resume_at(df['timestamp'].tolist())
+        if start is None:
+            # First call, a gap since the last tick (bot paused, restarted
+            # feed, etc.) or a new frame - rebuild the indicator state from this frame
+            self.engine = self.engine_cls(self.frame).seed(df)
         else:
-            obv.iloc[i] = obv.iloc[i-1]
-    
-    return obv
+            for bar in df.iloc[start:].to_dict('records'):
+                self.engine.update(bar)
+
+        if len(self.engine.snapshots) < 2:
+            return False, False, df['close'].iloc[-1]
+        return self.signals(self.engine.last, self.engine.prev)
+
+    def on_candles(self, candles, columns=('timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time')):
+        """
+        Same as calling with a frame, for callers that already hold the closed
+        candles as tuples (e.g. a MarketDataService buffer); skips building a
+        DataFrame on every tick.
+        """
+        if self.frame:
+            candles = candles[-self.frame:]
+        start = self._resume_at([candle[0] for candle in candles])
+        if start is None:
+            self.engine = self.engine_cls(self.frame)
+            start = 0
+        for candle in candles[start:]:
+            self.engine.update(dict(zip(columns, candle)))
+
+        if len(self.engine.snapshots) < 2:
+            return False, False, candles[-1][columns.index('close')]
+        return self.signals(self.engine.last, self.engine.prev)
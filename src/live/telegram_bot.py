@@ -2,19 +2,21 @@
 
 import os
 import yaml
-import requests
 import asyncio
 import logging
-import pandas as pd
 from datetime import datetime, timedelta
 import traceback
-from collections import deque
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, ReplyKeyboardRemove, InputFile
 from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler, ContextTypes, MessageHandler, filters
 from telegram.helpers import escape_markdown
 from telegram.error import BadRequest
 from io import BytesIO
-import reddit_sentiment
+from chart_service import get_chart_service
+from metrics_cache import get_metrics_cache
+from worker_pools import get_worker_pools, LoopLagMonitor
+from whale_poller import WhaleAlertPoller, DEFAULT_API_URL
+from whale_store import get_whale_store
+from alert_dispatcher import chunk_messages
 
 # Update config path to point to correct location
 config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.yaml'))
@@ -28,14 +30,16 @@ logger = logging.getLogger(__name__)
 
 # Initialize global variables
 CONFIG = {}
-last_tx_ids = deque(maxlen=500)
 BOT_TOKEN = None
 ALLOWED_CHAT_ID = None
 whale_enabled = True
 WH_API_KEY = None
 MIN_VALUE = 1000000
+WH_API_URL = DEFAULT_API_URL
 # Track if we're showing before or after tariff data
 show_before_tariff = False  # Default to after tariff view
+# Logs handlers that block the event loop (started in post_init)
+loop_monitor = LoopLagMonitor()
 
 # Load configuration
 try:
@@ -46,6 +50,7 @@ try:
     whale_enabled = CONFIG.get("whaleAlert", {}).get("enabled", True)
     WH_API_KEY = CONFIG.get("whaleAlert", {}).get("api_key")
     MIN_VALUE = CONFIG.get("whaleAlert", {}).get("min_value_usd", 1000000)
+    WH_API_URL = CONFIG.get("whaleAlert", {}).get("api_url", DEFAULT_API_URL)
 except Exception as e:
     logger.error(f"Error loading config: {e}")
     raise
@@ -132,20 +137,21 @@ async def status_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     global whale_enabled
     try:
         # Get status of all bots
-        from live_trading_manager import bot_threads
+        from live_trading_manager import is_running
         
         status_text = ["🖥️ *Bot System Status*\n"]
         
         # Check if each bot is running
         for coin in ['eth', 'link', 'doge', 'arb']:
-            is_running = coin in bot_threads and bot_threads[coin].is_alive()
-            status_emoji = "✅" if is_running else "❌"
-            status_text.append(f"{status_emoji} {coin.upper()}: {'Running' if is_running else 'Stopped'}")
+            running = is_running(coin)
+            status_emoji = "✅" if running else "❌"
+            status_text.append(f"{status_emoji} {coin.upper()}: {'Running' if running else 'Stopped'}")
         
         # Add overall system info
         status_text.append("\n🔄 System Info:")
         status_text.append(f"📅 Current Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         status_text.append(f"🐋 Whale Alerts: {'Enabled' if whale_enabled else 'Disabled'}")
+        status_text.append(f"🐢 Loop Stalls: {loop_monitor.stalls} (max lag {loop_monitor.max_lag * 1000:.0f} ms)")
         
         # Check if config file exists
         status_text.append(f"⚙️ Config File: {'Found' if os.path.exists(config_path) else 'Missing'}")
@@ -240,10 +246,11 @@ async def send_metrics(update: Update, context: ContextTypes.DEFAULT_TYPE, coin=
         message = []
         if coin:
             # Get specific coin metrics
-            metrics_file = os.path.join(LIVE_BACKUP_DIR, f"{coin}_{tariff_type}_tariff_metrics.csv")
-            trades_file = os.path.join(LIVE_BACKUP_DIR, f"{coin}_{tariff_type}_tariff_trades.csv")
+            cache = get_metrics_cache()
+            metrics = await get_worker_pools().run('metrics', cache.metrics, coin, tariff_type)
+            recent_trades = await get_worker_pools().run('metrics', cache.recent_trades, coin, tariff_type, 5)
             
-            if not os.path.exists(metrics_file) or not os.path.exists(trades_file):
+            if metrics is None or recent_trades is None:
                 buttons = [
                     [InlineKeyboardButton("🔙 Back to Metrics", callback_data="metrics_menu")]
                 ]
@@ -263,13 +270,10 @@ async def send_metrics(update: Update, context: ContextTypes.DEFAULT_TYPE, coin=
                     )
                 return
                 
-            metrics_df = pd.read_csv(metrics_file)
-            trades_df = pd.read_csv(trades_file)
-            
-            total_trades = metrics_df['total_trades'].iloc[0]
-            win_rate = metrics_df['win_rate'].iloc[0] * 100
-            total_profit = metrics_df['total_profit'].iloc[0]
-            final_capital = metrics_df['final_capital'].iloc[0]
+            total_trades = metrics['total_trades']
+            win_rate = metrics['win_rate'] * 100
+            total_profit = metrics['total_profit']
+            final_capital = metrics['final_capital']
             
             message.append(f"📊 *{coin} Trading Metrics \\({tariff_label} Tariff\\)*\n")
             message.append(f"💰 Final Capital: *${final_capital:.2f}*")
@@ -283,14 +287,13 @@ async def send_metrics(update: Update, context: ContextTypes.DEFAULT_TYPE, coin=
                 message.append(f"📊 Avg Profit/Trade: *${avg_profit:.2f}*")
             
             # Add recent trades
-            if not trades_df.empty:
-                recent_trades = trades_df.tail(5)
+            if recent_trades:
                 message.append("\n*Recent Trades:*")
-                for _, row in recent_trades.iterrows():
-                    trade_type = row['type']
-                    price = row['price']
-                    profit = row['profit'] if 'profit' in row and not pd.isna(row['profit']) else 0
-                    timestamp = row['timestamp']
+                for trade in recent_trades:
+                    trade_type = trade.type
+                    price = trade.price
+                    profit = trade.profit if trade.profit is not None else 0
+                    timestamp = trade.timestamp
                     emoji = "🟢" if trade_type == "BUY" else "🔴"
                     profit_str = f" \\(PnL: ${profit:.2f}\\)" if trade_type == "SELL" else ""
                     message.append(f"{emoji} {timestamp} \\- {trade_type} at ${price:.2f}{profit_str}")
@@ -329,15 +332,17 @@ async def send_metrics(update: Update, context: ContextTypes.DEFAULT_TYPE, coin=
             total_profit = 0
             total_capital = 0
             all_metrics = []
+            cache = get_metrics_cache()
+            coin_metrics = await get_worker_pools().run(
+                'metrics', lambda: {coin: cache.metrics(coin, tariff_type) for coin in SUPPORTED_COINS})
             
             for coin in SUPPORTED_COINS:
-                metrics_file = os.path.join(LIVE_BACKUP_DIR, f"{coin}_{tariff_type}_tariff_metrics.csv")
-                if os.path.exists(metrics_file):
-                    metrics_df = pd.read_csv(metrics_file)
-                    win_rate = metrics_df['win_rate'].iloc[0] * 100
-                    coin_profit = metrics_df['total_profit'].iloc[0]
-                    final_capital = metrics_df['final_capital'].iloc[0]
-                    total_trades = metrics_df['total_trades'].iloc[0]
+                metrics = coin_metrics[coin]
+                if metrics is not None:
+                    win_rate = metrics['win_rate'] * 100
+                    coin_profit = metrics['total_profit']
+                    final_capital = metrics['final_capital']
+                    total_trades = metrics['total_trades']
                     
                     total_profit += coin_profit
                     total_capital += final_capital
@@ -880,20 +885,21 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 
         # Refresh status
         elif callback_data == "refresh_status":
-            from live_trading_manager import bot_threads
+            from live_trading_manager import is_running
             
             status_text = ["🖥️ *Bot System Status*\n"]
             
             # Check if each bot is running
             for coin in ['eth', 'link', 'doge', 'arb']:
-                is_running = coin in bot_threads and bot_threads[coin].is_alive()
-                status_emoji = "✅" if is_running else "❌"
-                status_text.append(f"{status_emoji} {coin.upper()}: {'Running' if is_running else 'Stopped'}")
+                running = is_running(coin)
+                status_emoji = "✅" if running else "❌"
+                status_text.append(f"{status_emoji} {coin.upper()}: {'Running' if running else 'Stopped'}")
             
             # Add overall system info
             status_text.append("\n🔄 System Info:")
             status_text.append(f"📅 Current Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             status_text.append(f"🐋 Whale Alerts: {'Enabled' if whale_enabled else 'Disabled'}")
+            status_text.append(f"🐢 Loop Stalls: {loop_monitor.stalls} (max lag {loop_monitor.max_lag * 1000:.0f} ms)")
             
             # Check if config file exists
             status_text.append(f"⚙️ Config File: {'Found' if os.path.exists(config_path) else 'Missing'}")
@@ -926,10 +932,10 @@ async def send_logs_callback(update: Update, context: ContextTypes.DEFAULT_TYPE,
         tariff_type = "before" if show_before_tariff else "after"
         tariff_label = "Before" if show_before_tariff else "After"
         
-        # Try to get logs from trades file
-        trades_file = os.path.join(LIVE_BACKUP_DIR, f"{coin}_{tariff_type}_tariff_trades.csv")
+        # Last 10 trades from the cached trades file
+        recent_trades = await get_worker_pools().run('logs', get_metrics_cache().recent_trades, coin, tariff_type, 10)
         
-        if not os.path.exists(trades_file):
+        if recent_trades is None:
             buttons = [[InlineKeyboardButton("🔙 Back to Logs Menu", callback_data="logs_menu")]]
             markup = InlineKeyboardMarkup(buttons)
             
@@ -945,25 +951,21 @@ async def send_logs_callback(update: Update, context: ContextTypes.DEFAULT_TYPE,
                 )
             return
             
-        # Read the trades file
-        trades_df = pd.read_csv(trades_file)
-        
         # Format the last 10 trades
-        if trades_df.empty:
+        if not recent_trades:
             if update.callback_query:
                 await update.callback_query.message.edit_text(f"No trades found for {coin}")
             else:
                 await safe_reply(update, f"No trades found for {coin}")
             return
             
-        recent_trades = trades_df.tail(10)
         message = [f"🧾 *Last 10 {coin} trades \\({tariff_label} Tariff\\):*\n"]
         
-        for _, row in recent_trades.iterrows():
-            timestamp = row['timestamp']
-            trade_type = row['type']
-            price = row['price']
-            profit = row['profit'] if 'profit' in row and not pd.isna(row['profit']) else None
+        for trade in recent_trades:
+            timestamp = trade.timestamp
+            trade_type = trade.type
+            price = trade.price
+            profit = trade.profit
             
             emoji = "🟢" if trade_type == "BUY" else "🔴"
             profit_str = f" \\| PnL: *${profit:.2f}*" if profit is not None else ""
@@ -1139,47 +1141,49 @@ async def reload_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def whale_alert_loop(app):
     """Background task to fetch and send whale alerts"""
-    global whale_enabled
-    while True:
+    poller = WhaleAlertPoller(WH_API_KEY, MIN_VALUE, SUPPORTED_COINS, api_url=WH_API_URL)
+
+    async def on_transactions(transactions):
+        # Store first, so a failed Telegram send does not lose them for the exchange flows (/whale, strategies)
+        try:
+            await get_worker_pools().run('whale_store', get_whale_store().add, transactions)
+        except Exception as e:
+            logger.error(f"Error storing whale transactions: {e}")
         try:
-            if whale_enabled:
-                url = f"https://api.whale-alert.io/v1/transactions?api_key={WH_API_KEY}&min_value={MIN_VALUE}&limit=20"
-                resp = requests.get(url)
-                data = resp.json()
-                txs = data.get("transactions", [])
-                for tx in txs:
-                    tx_id = tx.get("id")
-                    if tx_id in last_tx_ids:
-                        continue
-                    last_tx_ids.append(tx_id)
+            await send_whale_alerts(app, transactions)
+        except Exception as e:
+            logger.error(f"Error sending whale alerts: {e}")
 
-                    symbol = tx.get("symbol", "").upper()
-                    if symbol not in {"ETH", "LINK", "ARB", "DOGE"}:
-                        continue
+    await poller.run(on_transactions, enabled=lambda: whale_enabled)
 
-                    value = tx.get("amount_usd", 0)
-                    from_label = tx.get("from", {}).get("owner", "Unknown")
-                    to_label = tx.get("to", {}).get("owner", "Unknown")
-                    ts = datetime.fromtimestamp(tx.get("timestamp")).strftime('%Y-%m-%d %H:%M:%S')
+async def send_whale_alerts(app, transactions):
+    """Send a poll's new whale transactions as one message (split only at Telegram's length limit)"""
+    alerts = []
+    symbols = []
+    for tx in transactions:
+        symbol = tx.get("symbol", "").upper()
+        value = tx.get("amount_usd", 0)
+        from_label = tx.get("from", {}).get("owner", "Unknown")
+        to_label = tx.get("to", {}).get("owner", "Unknown")
+        ts = datetime.fromtimestamp(tx.get("timestamp")).strftime('%Y-%m-%d %H:%M:%S')
 
-                    msg = format_whale_alert(symbol, value, from_label, to_label, ts)
+        alerts.append(format_whale_alert(symbol, value, from_label, to_label, ts))
+        if symbol not in symbols:
+            symbols.append(symbol)
 
-                    
-                    # Add buttons to show more info
-                    buttons = [
-                        [InlineKeyboardButton(f"📊 {symbol} Metrics", callback_data=f"metrics_{symbol}")]
-                    ]
-                    markup = InlineKeyboardMarkup(buttons)
+    # Add buttons to show more info
+    buttons = [
+        [InlineKeyboardButton(f"📊 {symbol} Metrics", callback_data=f"metrics_{symbol}")] for symbol in symbols
+    ]
+    markup = InlineKeyboardMarkup(buttons)
 
-                    await app.bot.send_message(
-                        chat_id=ALLOWED_CHAT_ID,
-                        text=msg,
-                        reply_markup=markup,
-                        parse_mode="Markdown"
-                    )
-        except Exception as e:
-            logger.error(f"[WhaleAlert Error] {e}")
-        await asyncio.sleep(90)
+    for text in chunk_messages(alerts):
+        await app.bot.send_message(
+            chat_id=ALLOWED_CHAT_ID,
+            text=text,
+            reply_markup=markup,
+            parse_mode="Markdown"
+        )
 
 def format_whale_alert(symbol, value, from_label, to_label, timestamp_str):
     """Return a Markdown-safe formatted whale alert message."""
@@ -1197,45 +1201,47 @@ def format_whale_alert(symbol, value, from_label, to_label, timestamp_str):
         f"*Time:* {timestamp_str}"
     )
 
-def generate_daily_summary():
-    """Generate a summary of trading activity for the day"""
+def _usd_short(value):
+    """Signed USD amount in millions, Markdown-escaped (e.g. \\+$12\\.3M)"""
+    sign = "+" if value > 0 else "-" if value < 0 else ""
+    return f"{sign}${abs(value) / 1e6:.1f}M".replace('.', '\\.').replace('+', '\\+').replace('-', '\\-')
+
+def format_whale_flows():
+    """Net exchange flows per coin from the whale store (positive = moving to exchanges)"""
+    store = get_whale_store()
+    lines = ["*Net exchange flows \\(in − out\\):*"]
+    for coin in SUPPORTED_COINS:
+        flows = store.flows(coin)
+        windows = ", ".join(f"{name} {_usd_short(flow['net'])}" for name, flow in flows.items())
+        lines.append(f"{coin}: {windows}")
+    return "\n".join(lines)
+
+def generate_daily_summary(before_tariff=None):
+    """Generate a summary of trading activity for the day (for the current tariff view by default)"""
     try:
-        global show_before_tariff
-        tariff_type = "before" if show_before_tariff else "after"
-        tariff_label = "Before" if show_before_tariff else "After"
+        if before_tariff is None:
+            before_tariff = show_before_tariff
+        tariff_type = "before" if before_tariff else "after"
+        tariff_label = "Before" if before_tariff else "After"
         
         total_pnl = 0
         total_trades = 0
         summary = [f"📊 *Daily Trading Summary ({tariff_label} Tariff)*\n"]
         
+        cache = get_metrics_cache()
+        today = datetime.now().date()
         for coin in SUPPORTED_COINS:
-            trades_file = os.path.join(LIVE_BACKUP_DIR, f"{coin}_{tariff_type}_tariff_trades.csv")
-            metrics_file = os.path.join(LIVE_BACKUP_DIR, f"{coin}_{tariff_type}_tariff_metrics.csv")
-            
-            if not os.path.exists(trades_file) or not os.path.exists(metrics_file):
+            # Today's trades, already counted per day by the cache
+            day = cache.day(coin, tariff_type, today)
+            if day is None or cache.metrics(coin, tariff_type) is None:
                 continue
                 
-            # Get today's trades
-            trades_df = pd.read_csv(trades_file)
-            metrics_df = pd.read_csv(metrics_file)
-            
-            if trades_df.empty:
-                continue
-                
-            # Convert timestamp to datetime
-            trades_df['timestamp'] = pd.to_datetime(trades_df['timestamp'])
-            today = datetime.now().date()
-            
-            # Filter for today's trades
-            today_trades = trades_df[trades_df['timestamp'].dt.date == today]
-            
-            if today_trades.empty:
+            if day.trades == 0:
                 continue
                 
             # Count wins and losses
-            sells = today_trades[today_trades['type'] == 'SELL']
-            wins = len(sells[sells['profit'] > 0])
-            losses = len(sells[sells['profit'] <= 0])
+            wins = day.wins
+            losses = day.losses
             total = wins + losses
             total_trades += total
             
@@ -1243,7 +1249,7 @@ def generate_daily_summary():
                 continue
                 
             win_rate = (wins / total * 100) if total > 0 else 0
-            today_pnl = sells['profit'].sum()
+            today_pnl = day.pnl
             total_pnl += today_pnl
             
             summary.append(f"*{coin}:*")
@@ -1271,8 +1277,7 @@ async def daily_summary_loop(app):
             if now.hour == 0 and now.minute == 0:
                 # Send after tariff summary first (default)
                 global show_before_tariff
-                show_before_tariff = False
-                after_summary = generate_daily_summary()
+                after_summary = await get_worker_pools().run('summary', generate_daily_summary, False)
                 
                 # Add buttons to view detailed metrics
                 buttons = [
@@ -1288,8 +1293,7 @@ async def daily_summary_loop(app):
                 )
                 
                 # Now send before tariff summary
-                show_before_tariff = True
-                before_summary = generate_daily_summary()
+                before_summary = await get_worker_pools().run('summary', generate_daily_summary, True)
                 
                 await app.bot.send_message(
                     chat_id=ALLOWED_CHAT_ID,
@@ -1340,6 +1344,11 @@ async def whale_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await safe_reply(update, "🐋 Whale alerts turned *ON*\\.", parse_mode="Markdown")
     else:
         status = "ON" if whale_enabled else "OFF"
+        try:
+            flows = await get_worker_pools().run('whale_store', format_whale_flows)
+        except Exception as e:
+            logger.error(f"Error reading whale flows: {e}")
+            flows = "_Exchange flows unavailable_"
         buttons = [
             [InlineKeyboardButton("🟢 Turn ON",  callback_data="whale_on"),
              InlineKeyboardButton("🔴 Turn OFF", callback_data="whale_off")],
@@ -1347,7 +1356,7 @@ async def whale_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ]
         await safe_reply(
             update,
-            f"🐋 Whale alerts are currently: *{status}*\n\nUse the buttons below to toggle\\.",
+            f"🐋 Whale alerts are currently: *{status}*\n\n{flows}\n\nUse the buttons below to toggle\\.",
             parse_mode="Markdown",
             reply_markup=InlineKeyboardMarkup(buttons),
         )
@@ -1397,8 +1406,10 @@ async def send_sentiment_analysis(update: Update, context: ContextTypes.DEFAULT_
                 f"🔍 Analyzing Reddit sentiment for {coin}... This may take a moment."
             )
         
-        # Run the sentiment analysis
-        sentiment_data = reddit_sentiment.get_coin_sentiment(coin, timeframe)
+        # Run the sentiment analysis in the worker process (praw/nltk load there on the first request)
+        import reddit_sentiment
+        sentiment_data = await get_worker_pools().run(
+            'sentiment', reddit_sentiment.get_coin_sentiment, coin, timeframe, with_chart=False)
         
         if 'error' in sentiment_data:
             # Handle error
@@ -1440,18 +1451,21 @@ async def send_sentiment_analysis(update: Update, context: ContextTypes.DEFAULT_
                 parse_mode="Markdown"
             )
         
+        # Render the chart off the event loop (cached until the analysis is refreshed)
+        chart_data = await get_chart_service().sentiment_chart(sentiment_data['result'])
+        
         # If we have chart data, send it as a photo
-        if 'chart_data' in sentiment_data and sentiment_data['chart_data']:
+        if chart_data:
             caption = f"📊 Sentiment Chart for {coin} (Past {timeframe.title()})"
             
             if is_callback:
                 await update.callback_query.message.reply_photo(
-                    photo=InputFile(sentiment_data['chart_data'], filename=f"{coin}_sentiment.png"),
+                    photo=InputFile(chart_data, filename=f"{coin}_sentiment.png"),
                     caption=caption
                 )
             else:
                 await update.message.reply_photo(
-                    photo=InputFile(sentiment_data['chart_data'], filename=f"{coin}_sentiment.png"),
+                    photo=InputFile(chart_data, filename=f"{coin}_sentiment.png"),
                     caption=caption
                 )
     
@@ -1466,6 +1480,7 @@ async def send_sentiment_analysis(update: Update, context: ContextTypes.DEFAULT_
 
 async def post_init(app):
     """Post-initialization tasks"""
+    loop_monitor.start()
     asyncio.create_task(whale_alert_loop(app))
     asyncio.create_task(daily_summary_loop(app))
     logger.info("🚀 Telegram bot running with WhaleAlert and Daily Summary...")
@@ -0,0 +1,283 @@
+# trade_journal.py
+"""
+Append-only trade journal for the live bots.
+
+Every trade is one JSON line appended to logs/trade_journal.jsonl, so
+logging a trade costs the same however long the history is. Lines are
+written under a lock with a single O_APPEND write, which keeps concurrent
+bots (and processes) from interleaving records; fsync is batched and done
+by a background flusher every `flush_interval` seconds, or right away once
+`fsync_batch` records are pending.
+
+Per-coin running totals (capital, trades, win rate, profit) are kept in
+memory and served by coin_stats(); every exported coin's totals are seeded
+from its watermark on startup. The liveBackup CSVs that the Telegram bot and get_coin_status read
+are refreshed from the journal by the same flusher: new trades are appended
+to {coin}_after_tariff_trades.csv and the one-row metrics CSV is rewritten
+from the totals. An export watermark per coin makes restarts neither drop
+nor double-count trades. It is saved after each export and holds the last
+exported sequence number, the trades CSV's size and the coin's totals at
+that point. On startup, rows an interrupted export appended beyond that
+size are cut off, the totals are taken from the watermark, and every record
+after its sequence number is exported again.
+"""
+import os
+import csv
+import json
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+LOGS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'logs'))
+LIVE_BACKUP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'liveBackup'))
+JOURNAL_PATH = os.path.join(LOGS_DIR, 'trade_journal.jsonl')
+
+STARTING_CAPITAL = 1000.0  # capital assumed when a coin has no metrics CSV yet
+
+logger = logging.getLogger(__name__)
+
+
+class CoinStats:
+    """Running totals for one coin, matching the columns of the metrics CSV"""
+    __slots__ = ('final_capital', 'total_trades', 'wins', 'total_profit')
+
+    def __init__(self, final_capital=STARTING_CAPITAL, total_trades=0, wins=0.0, total_profit=0.0):
+        self.final_capital = final_capital
+        self.total_trades = total_trades
+        self.wins = wins
+        self.total_profit = total_profit
+
+    def add(self, pnl):
+        self.final_capital += pnl
+        self.total_trades += 1
+        self.wins += 1 if pnl > 0 else 0
+        self.total_profit += pnl
+
+    def totals(self):
+        return (self.final_capital, self.total_trades, self.wins, self.total_profit)
+
+    @property
+    def win_rate(self):
+        return self.wins / self.total_trades if self.total_trades else 0.0
+
+    def as_row(self, coin):
+        return {
+            'coin': coin,
+            'final_capital': self.final_capital,
+            'total_trades': self.total_trades,
+            'win_rate': self.win_rate,
+            'total_profit': self.total_profit
+        }
+
+
+class TradeJournal:
+    def __init__(self, path=JOURNAL_PATH, export_dir=LIVE_BACKUP_DIR, flush_interval=5, fsync_batch=32):
+        """
+        Args:
+            path (str): Journal file (JSON lines)
+            export_dir (str): Directory holding the {coin}_after_tariff_*.csv files
+            flush_interval (float): Seconds between background fsync/export passes
+            fsync_batch (int): Pending records that trigger an immediate fsync
+        """
+        self.path = path
+        self.export_dir = export_dir
+        self.watermark_path = path + '.exported.json'
+        self.flush_interval = flush_interval
+        self.fsync_batch = fsync_batch
+
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending_sync = 0
+        self._pending_export = []
+        self.stats = {}
+        self.seq = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(export_dir, exist_ok=True)
+        self._recover()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+        self._flusher = threading.Thread(target=self._flush_loop, name='trade-journal', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # === Startup ===
+    def _load_watermarks(self):
+        if not os.path.exists(self.watermark_path):
+            return {}
+        with open(self.watermark_path, 'r') as f:
+            watermarks = json.load(f)
+        # Older files hold just the sequence number
+        return {coin: mark if isinstance(mark, dict) else {'seq': mark} for coin, mark in watermarks.items()}
+
+    def _save_watermarks(self, watermarks):
+        tmp = self.watermark_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(watermarks, f)
+        os.replace(tmp, self.watermark_path)
+
+    def _seed_stats(self, coin):
+        """Totals as of the last export, from its watermark (or the coin's metrics CSV)"""
+        mark = self.watermarks.get(coin, {})
+        if 'stats' in mark:
+            return CoinStats(*mark['stats'])
+        metrics_file = os.path.join(self.export_dir, f"{coin}_after_tariff_metrics.csv")
+        if not os.path.exists(metrics_file):
+            return CoinStats()
+        with open(metrics_file, 'r', newline='') as f:
+            row = next(csv.DictReader(f))
+        return CoinStats(float(row['final_capital']), int(row['total_trades']),
+                         float(row['win_rate']) * int(row['total_trades']), float(row['total_profit']))
+
+    def _stats_for(self, coin):
+        if coin not in self.stats:
+            self.stats[coin] = self._seed_stats(coin)
+        return self.stats[coin]
+
+    def _trades_file(self, coin):
+        return os.path.join(self.export_dir, f"{coin}_after_tariff_trades.csv")
+
+    def _recover(self):
+        """Replay the journal once: restore the sequence counter and anything not exported yet"""
+        self.watermarks = self._load_watermarks()
+        for coin, mark in self.watermarks.items():
+            # Rows from an export that crashed before its watermark was saved
+            trades_file = self._trades_file(coin)
+            if 'size' in mark and os.path.exists(trades_file) and os.path.getsize(trades_file) > mark['size']:
+                logger.warning(f"Trade journal: dropping {coin} CSV rows of an unfinished export; re-exporting them")
+                os.truncate(trades_file, mark['size'])
+            self._stats_for(coin)
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash mid-write
+                self.seq = max(self.seq, record['seq'])
+                if record['seq'] > self.watermarks.get(record['coin'], {}).get('seq', 0):
+                    self._pending_export.append(record)
+                    if record['pnl'] is not None:
+                        self._stats_for(record['coin']).add(record['pnl'])
+
+    # === Writing ===
+    def append(self, symbol, action, price, pnl=None, timestamp=None):
+        """Record one trade. Returns the journal record."""
+        coin = symbol.replace('USDT', '')
+        with self._lock:
+            self.seq += 1
+            record = {
+                'seq': self.seq,
+                'timestamp': timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'symbol': symbol,
+                'coin': coin,
+                'type': action.upper(),
+                'price': price,
+                'pnl': pnl
+            }
+            os.write(self._fd, (json.dumps(record) + '\n').encode())
+            if pnl is not None:
+                self._stats_for(coin).add(pnl)
+            self._pending_export.append(record)
+            self._pending_sync += 1
+            if self._pending_sync >= self.fsync_batch:
+                self._wake.set()
+        return record
+
+    def coin_stats(self, coin):
+        """In-memory totals for a coin, as its metrics CSV row (None if it has no trades or metrics yet)"""
+        with self._lock:
+            stats = self.stats.get(coin)
+            if stats is None and os.path.exists(os.path.join(self.export_dir, f"{coin}_after_tariff_metrics.csv")):
+                stats = self._stats_for(coin)  # exported before the journal kept watermarks
+            return None if stats is None else stats.as_row(coin)
+
+    # === Flushing and CSV export ===
+    def flush(self):
+        """fsync pending records and bring the liveBackup CSVs up to date"""
+        with self._export_lock:
+            with self._lock:
+                if self._pending_sync and self._fd is not None:
+                    os.fsync(self._fd)
+                    self._pending_sync = 0
+                records, self._pending_export = self._pending_export, []
+                totals = {r['coin']: self.stats[r['coin']].totals()
+                          for r in records if r['coin'] in self.stats}
+            # Bots can keep appending while the CSVs are written
+            if records:
+                self._export(records, totals)
+
+    def _export(self, records, totals):
+        by_coin = {}
+        for record in records:
+            by_coin.setdefault(record['coin'], []).append(record)
+
+        for coin, coin_records in by_coin.items():
+            trades_file = self._trades_file(coin)
+            new_file = not os.path.exists(trades_file)
+            with open(trades_file, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(['timestamp', 'type', 'price', 'profit'])
+                for r in coin_records:
+                    writer.writerow([r['timestamp'], r['type'], r['price'], '' if r['pnl'] is None else r['pnl']])
+                f.flush()
+                os.fsync(f.fileno())
+                size = f.tell()
+
+            mark = {'seq': coin_records[-1]['seq'], 'size': size}
+            if coin in totals:
+                metrics_file = os.path.join(self.export_dir, f"{coin}_after_tariff_metrics.csv")
+                row = CoinStats(*totals[coin]).as_row(coin)
+                tmp = metrics_file + '.tmp'
+                with open(tmp, 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=list(row), lineterminator='\n')
+                    writer.writeheader()
+                    writer.writerow(row)
+                os.replace(tmp, metrics_file)
+                mark['stats'] = list(totals[coin])
+            elif 'stats' in self.watermarks.get(coin, {}):
+                mark['stats'] = self.watermarks[coin]['stats']
+
+            # The export of this coin counts once its watermark is on disk
+            self.watermarks[coin] = mark
+            self._save_watermarks(self.watermarks)
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Trade journal flush failed: {e}")
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """Process-wide journal shared by every bot, opened on first use"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = TradeJournal()
+        return _journal
+
+
+def current_journal():
+    """The process's journal if a bot has opened it, else None (a reader must not start a second exporter)"""
+    with _journal_lock:
+        return _journal
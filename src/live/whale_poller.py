@@ -0,0 +1,216 @@
+# whale_poller.py
+"""
+Async Whale Alert poller for the Telegram bot.
+
+whale_alert_loop used to call requests.get on the event loop every 90
+seconds and always asked for the latest 20 transactions. Each one was
+checked against a deque of the last 500 ids (an O(n) scan) and alerted
+with its own Telegram message. Now:
+
+- Requests go through one aiohttp session that is kept open, so polls
+  reuse the connection and never block the loop.
+- Each poll asks only for what is new. `start` is the newest timestamp
+  seen so far, and the `cursor` of the previous response continues right
+  after the last transaction returned. Full pages are followed up to
+  `max_pages`. Whale Alert only serves the last hour, so `start` never
+  goes further back than that. If a cursor is refused it is dropped, and
+  `start` alone is used until the next response brings a new one.
+- Seen ids are kept in SeenIds, a bounded set with O(1) lookups that
+  evicts the oldest id first. It catches the transactions that sit on the
+  `start` boundary and come back in the next poll.
+- Transactions for symbols the bot does not track are dropped here,
+  before anything is formatted.
+- on_transactions is called once per poll with all the new transactions,
+  so the bot can send them as one batch.
+- A page that fails (HTTP error, timeout, dropped connection) ends the
+  poll with the pages already fetched. Their ids are already in `seen`,
+  so raising would lose them for good.
+
+`whaleAlert.api_url` overrides the API host, which lets a local fake
+stand in for Whale Alert (see scripts/check_whale_poller.py).
+"""
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+
+import aiohttp
+
+DEFAULT_API_URL = 'https://api.whale-alert.io'
+MAX_LOOKBACK = 3600  # seconds of history the API serves
+
+logger = logging.getLogger(__name__)
+
+
+class SeenIds:
+    """Bounded set of transaction ids: O(1) membership, oldest evicted first"""
+
+    def __init__(self, maxlen=5000):
+        self.maxlen = maxlen
+        self._ids = OrderedDict()
+
+    def add(self, tx_id):
+        """Remember tx_id. Returns False if it was already seen."""
+        if tx_id in self._ids:
+            return False
+        self._ids[tx_id] = None
+        if len(self._ids) > self.maxlen:
+            self._ids.popitem(last=False)
+        return True
+
+    def __contains__(self, tx_id):
+        return tx_id in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class WhaleAlertPoller:
+    def __init__(self, api_key, min_value=1000000, symbols=('ETH', 'LINK', 'DOGE', 'ARB'),
+                 api_url=DEFAULT_API_URL, interval=90, page_limit=100, max_pages=10, timeout=20, seen_size=5000):
+        """
+        Args:
+            api_key (str): Whale Alert API key
+            min_value (int): Smallest transaction (USD) to ask for
+            symbols (iterable): Symbols to keep (others are dropped before formatting)
+            api_url (str): API host
+            interval (float): Seconds between polls
+            page_limit (int): Transactions per request
+            max_pages (int): Requests per poll when pages come back full
+            timeout (float): HTTP timeout per request
+            seen_size (int): Transaction ids remembered for de-duplication
+        """
+        self.api_key = api_key
+        self.min_value = min_value
+        self.symbols = {symbol.upper() for symbol in symbols}
+        self.url = f"{api_url.rstrip('/')}/v1/transactions"
+        self.interval = interval
+        self.page_limit = page_limit
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.seen = SeenIds(seen_size)
+
+        self.start = None   # unix seconds the next poll starts from
+        self.cursor = None  # pagination key from the last response
+        self.requests = 0
+        self.received = 0
+        self.duplicates = 0
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def _fetch(self, params):
+        """One page of transactions, or None if the request failed"""
+        self.requests += 1
+        try:
+            async with self._get_session().get(self.url, params=params) as resp:
+                if resp.status == 429:
+                    logger.warning("🐋 Whale Alert rate limit hit; waiting for the next poll")
+                    return None
+                if resp.status != 200:
+                    body = (await resp.text())[:200]
+                    logger.error(f"🐋 Whale Alert returned HTTP {resp.status}: {body}")
+                    return None
+                return await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"🐋 Whale Alert request failed: {type(e).__name__} - {e}")
+            return None
+
+    async def poll(self):
+        """
+        New transactions since the last poll, for the tracked symbols only
+
+        Returns:
+            list: Transaction dicts as the API returns them, oldest first
+        """
+        now = int(time.time())
+        start = max(self.start or now - int(self.interval), now - MAX_LOOKBACK)
+        new = []
+        for _ in range(self.max_pages):
+            params = {'api_key': self.api_key, 'min_value': self.min_value, 'start': start,
+                      'limit': self.page_limit}
+            if self.cursor:
+                params['cursor'] = self.cursor
+            data = await self._fetch(params)
+            if data is None:
+                if 'cursor' in params:
+                    self.cursor = None  # retry from `start` alone next time
+                break
+
+            transactions = data.get('transactions') or []
+            self.received += len(transactions)
+            for tx in transactions:
+                start = max(start, int(tx.get('timestamp') or 0))
+                if not self.seen.add(tx.get('id') or tx.get('hash')):
+                    self.duplicates += 1
+                    continue
+                if str(tx.get('symbol', '')).upper() in self.symbols:
+                    new.append(tx)
+            self.cursor = data.get('cursor') or self.cursor
+            if len(transactions) < self.page_limit:
+                break
+        self.start = start
+        return new
+
+    async def history(self, start, end):
+        """
+        All transactions between start and end (unix seconds) for the tracked symbols
+
+        Follows the cursor through full pages. Leaves the polling cursor alone.
+
+        Returns:
+            list: Transaction dicts, or None if a request failed
+        """
+        transactions, cursor = [], None
+        while True:
+            params = {'api_key': self.api_key, 'min_value': self.min_value, 'start': start, 'end': end,
+                      'limit': self.page_limit}
+            if cursor:
+                params['cursor'] = cursor
+            data = await self._fetch(params)
+            if data is None:
+                return None
+            page = data.get('transactions') or []
+            self.received += len(page)
+            transactions += [tx for tx in page if str(tx.get('symbol', '')).upper() in self.symbols]
+            cursor = data.get('cursor')
+            if len(page) < self.page_limit or not cursor:
+                return transactions
+
+    async def run(self, on_transactions, enabled=lambda: True):
+        """
+        Poll every `interval` seconds and hand each batch of new transactions to on_transactions
+
+        Args:
+            on_transactions: Coroutine function taking the list of new transactions
+            enabled: Callable; while it returns False nothing is fetched
+        """
+        try:
+            while True:
+                try:
+                    if enabled():
+                        transactions = await self.poll()
+                        if transactions:
+                            await on_transactions(transactions)
+                    else:
+                        # Start from now when re-enabled instead of replaying the pause
+                        self.start = self.cursor = None
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"[WhaleAlert Error] {type(e).__name__} - {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self):
+        return {"requests": self.requests, "received": self.received, "duplicates": self.duplicates,
+                "seen": len(self.seen), "start": self.start}
@@ -0,0 +1,475 @@
+# whale_store.py
+"""
+On-disk store of whale transactions with rolling exchange flows.
+
+Whale Alert transactions used to be printed or alerted and then thrown
+away. The store keeps them so that strategies and the /whale command can
+ask for a coin's exchange flows without calling the API again.
+
+- Layout: <root>/<SYMBOL>/<YYYY-MM>.bin. Each file holds fixed-size RECORD
+  rows (timestamp, id, amount, USD value, owner types of both sides),
+  sorted by timestamp. A month is read with np.fromfile and a time range
+  is found with searchsorted. New transactions are appended to the file's
+  end. Older ones, from a backfill or another writer, are merged in with
+  an atomic rewrite of that month. Duplicate ids are dropped either way.
+  Both run under an exclusive flock on <root>/<SYMBOL>/.lock, so the bot,
+  a backfill and the trading process can write the same month without
+  one rewrite dropping rows another just appended.
+- Flows: a transfer from a non-exchange wallet to an exchange is an
+  inflow (coins that may be sold), and the reverse is an outflow.
+  Exchange-to-exchange and wallet-to-wallet transfers count as neither.
+  Every symbol keeps one FlowWindow per window (1h, 4h, 24h). A window is
+  a deque of flows with running inflow/outflow sums: new flows are added
+  on write, and flows that fall out of the window are dropped when it is
+  read. flows() is therefore O(1) amortised, and no transaction is read
+  twice.
+- Other processes: the windows are loaded from disk on first use. A
+  reader that did not write the records itself (the trading process
+  reading what the Telegram bot stored) checks the month files at most
+  every `check_interval` seconds. It reads only the rows appended since,
+  and reloads the windows if a file was rewritten.
+- Backfill: coverage.json records which time ranges have been crawled in
+  full. backfill() walks the missing ranges a day at a time (as
+  whaleTest.py did), following the API's cursor through full pages, and
+  marks each day covered once it is stored. An interrupted crawl resumes
+  where it stopped.
+"""
+import os
+import json
+import time
+import fcntl
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+DEFAULT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'whales'))
+
+RECORD = np.dtype([('timestamp', '<i8'), ('id', '<u8'), ('amount', '<f8'), ('amount_usd', '<f8'),
+                   ('from_type', 'u1'), ('to_type', 'u1')])
+OWNER_TYPES = ('unknown', 'exchange', 'other')
+EXCHANGE = OWNER_TYPES.index('exchange')
+
+WINDOWS = {'1h': 3600, '4h': 14400, '24h': 86400}  # name -> seconds
+DAY = 86400
+
+logger = logging.getLogger(__name__)
+
+
+# === Records ===
+def _tx_id(tx):
+    """Whale Alert ids are numeric strings; anything else is hashed to 64 bits"""
+    value = str(tx.get('id') or tx.get('hash') or '')
+    if value.isdigit() and int(value) < 2 ** 64:
+        return int(value)
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'little')
+
+
+def _owner_type(side):
+    owner_type = (side or {}).get('owner_type') or 'unknown'
+    return OWNER_TYPES.index(owner_type) if owner_type in OWNER_TYPES else OWNER_TYPES.index('other')
+
+
+def to_records(transactions):
+    """API transaction dicts as a RECORD array, sorted by timestamp"""
+    records = np.array([(int(tx.get('timestamp') or 0), _tx_id(tx), float(tx.get('amount') or 0),
+                         float(tx.get('amount_usd') or 0), _owner_type(tx.get('from')), _owner_type(tx.get('to')))
+                        for tx in transactions], dtype=RECORD)
+    return records[np.argsort(records['timestamp'], kind='stable')]
+
+
+def flow_direction(from_type, to_type):
+    """1 for an exchange inflow, -1 for an outflow, 0 otherwise"""
+    if to_type == EXCHANGE and from_type != EXCHANGE:
+        return 1
+    if from_type == EXCHANGE and to_type != EXCHANGE:
+        return -1
+    return 0
+
+
+def _month_key(timestamp):
+    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    return f"{dt.year:04d}-{dt.month:02d}"
+
+
+def _month_keys(start, end):
+    """Month partitions overlapping [start, end]"""
+    keys, ts = [], start
+    while True:
+        key = _month_key(ts)
+        keys.append(key)
+        year, month = map(int, key.split('-'))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        ts = int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+        if ts > end:
+            return keys
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive inter-process lock on `path` (created if missing), released on exit"""
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+# === Rolling flows ===
+class FlowWindow:
+    """Exchange inflow and outflow (USD) over the last `seconds`"""
+    __slots__ = ('seconds', 'events', 'inflow', 'outflow')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.events = deque()  # (timestamp, direction, usd), oldest first
+        self.inflow = 0.0
+        self.outflow = 0.0
+
+    def extend(self, events):
+        """Add (timestamp, direction, usd) flows, sorted by timestamp"""
+        if not events:
+            return
+        if self.events and events[0][0] < self.events[-1][0]:
+            self.events = deque(sorted([*self.events, *events]))  # late or backfilled transactions
+        else:
+            self.events.extend(events)
+        for _, direction, usd in events:
+            if direction > 0:
+                self.inflow += usd
+            else:
+                self.outflow += usd
+
+    def expire(self, now):
+        cutoff = now - self.seconds
+        events = self.events
+        while events and events[0][0] <= cutoff:
+            _, direction, usd = events.popleft()
+            if direction > 0:
+                self.inflow -= usd
+            else:
+                self.outflow -= usd
+        if not events:
+            self.inflow = self.outflow = 0.0  # no drift left over from the running sums
+
+    def snapshot(self):
+        return {'inflow': self.inflow, 'outflow': self.outflow, 'net': self.inflow - self.outflow,
+                'count': len(self.events)}
+
+
+class _Series:
+    """What the store knows about one symbol's files"""
+
+    def __init__(self, windows):
+        self.windows = {name: FlowWindow(seconds) for name, seconds in windows.items()}
+        self.horizon = max(windows.values())
+        self.files = {}  # month key -> (inode, records read)
+        self.last_ts = None
+        self.last_ids = set()  # ids at last_ts, to tell a new record from a repeat
+        self.checked = 0.0
+
+    def add(self, records):
+        """Count sorted records in the windows (those older than the longest window are skipped)"""
+        recent = records[records['timestamp'] > time.time() - self.horizon]
+        events = [(ts, direction, usd) for ts, direction, usd in zip(
+                      recent['timestamp'].tolist(),
+                      map(flow_direction, recent['from_type'].tolist(), recent['to_type'].tolist()),
+                      recent['amount_usd'].tolist())
+                  if direction != 0]
+        for window in self.windows.values():
+            window.extend(events)
+        if len(records):
+            last = int(records['timestamp'][-1])
+            if self.last_ts is None or last > self.last_ts:
+                self.last_ts = last
+                self.last_ids = set(records['id'][records['timestamp'] == last].tolist())
+            elif last == self.last_ts:
+                self.last_ids.update(records['id'][records['timestamp'] == last].tolist())
+
+
+# === Store ===
+class WhaleStore:
+    def __init__(self, root=DEFAULT_ROOT, windows=WINDOWS, check_interval=5.0):
+        """
+        Args:
+            root (str): Folder for the month files and coverage.json
+            windows (dict): {name: seconds} of the rolling flow windows
+            check_interval (float): Minimum seconds between checks for rows written by another process
+        """
+        self.root = root
+        self.windows = dict(windows)
+        self.horizon = max(self.windows.values())
+        self.check_interval = check_interval
+        self._series = {}
+        self._lock = threading.RLock()
+
+    def _path(self, symbol, key):
+        return os.path.join(self.root, symbol, f"{key}.bin")
+
+    def _lock_path(self, symbol):
+        return os.path.join(self.root, symbol, '.lock')
+
+    def _coverage_path(self):
+        return os.path.join(self.root, 'coverage.json')
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def _read(self, symbol, key, offset=0):
+        path = self._path(symbol, key)
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset * RECORD.itemsize)
+                return np.fromfile(f, dtype=RECORD)
+        except FileNotFoundError:
+            return np.empty(0, dtype=RECORD)
+
+    def _file_state(self, symbol, key):
+        try:
+            st = os.stat(self._path(symbol, key))
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size // RECORD.itemsize)
+
+    def _load_series(self, symbol, now=None):
+        """Fill a symbol's windows from the month files covering the longest window"""
+        now = now or time.time()
+        series = _Series(self.windows)
+        for key in _month_keys(int(now - self.horizon), int(now)):
+            records = self._read(symbol, key)
+            state = self._file_state(symbol, key)
+            if state is not None:
+                series.files[key] = (state[0], len(records))
+            series.add(records)
+        series.checked = time.monotonic()
+        return series
+
+    def _get_series(self, symbol):
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = self._load_series(symbol)
+        return series
+
+    def _sync(self, symbol, series, now):
+        """Pick up rows another process wrote to the recent month files"""
+        if time.monotonic() - series.checked < self.check_interval:
+            return series
+        series.checked = time.monotonic()
+        for key in _month_keys(int(now - self.horizon), int(now)):
+            state = self._file_state(symbol, key)
+            known = series.files.get(key)
+            if state is None or state == known:
+                continue
+            if known is not None and state[0] == known[0] and state[1] > known[1]:
+                series.add(self._read(symbol, key, offset=known[1]))
+                series.files[key] = state
+            else:
+                series = self._series[symbol] = self._load_series(symbol, now)
+                break
+        return series
+
+    # === Writing ===
+    def add(self, transactions):
+        """
+        Store transactions (API dicts) and update the flows
+
+        Returns:
+            int: Number of transactions that were not stored yet
+        """
+        by_symbol = {}
+        for tx in transactions:
+            symbol = str(tx.get('symbol', '')).upper()
+            if symbol:
+                by_symbol.setdefault(symbol, []).append(tx)
+
+        added = 0
+        with self._lock:
+            for symbol, txs in by_symbol.items():
+                records = to_records(txs)
+                _, first = np.unique(records['id'], return_index=True)
+                records = records[np.sort(first)]
+                series = self._get_series(symbol)
+                keys = np.array([_month_key(ts) for ts in records['timestamp'].tolist()])
+                for key in dict.fromkeys(keys.tolist()):
+                    new = self._write(symbol, key, records[keys == key], series)
+                    series.add(new)
+                    added += len(new)
+                self._sync(symbol, series, time.time())
+        return added
+
+    def _write(self, symbol, key, records, series):
+        """Add a month's records to its file. Returns the records that were new."""
+        path = self._path(symbol, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _file_lock(self._lock_path(symbol)):
+            return self._write_locked(symbol, key, path, records, series)
+
+    def _write_locked(self, symbol, key, path, records, series):
+        """_write with the symbol's file lock held: the file cannot change between the check and the write"""
+        state = self._file_state(symbol, key)
+        known = series.files.get(key)
+
+        # Append when we know the file's end and everything comes after it
+        first_ts = int(records['timestamp'][0])
+        if state is None or (state == known and series.last_ts is not None and (
+                first_ts > series.last_ts
+                or (first_ts == series.last_ts and not series.last_ids & set(records['id'].tolist())))):
+            with open(path, 'ab') as f:
+                records.tofile(f)
+            inode = state[0] if state is not None else os.stat(path).st_ino
+            series.files[key] = (inode, (state[1] if state is not None else 0) + len(records))
+            return records
+
+        # Otherwise merge: drop ids the file already has, sort, rewrite atomically
+        existing = self._read(symbol, key)
+        new = records[~np.isin(records['id'], existing['id'])]
+        if len(new) == 0:
+            series.files[key] = (state[0], len(existing))
+            return new
+        merged = np.concatenate([existing, new])
+        merged = merged[np.argsort(merged['timestamp'], kind='stable')]
+        tmp = path + '.tmp'
+        merged.tofile(tmp)
+        os.replace(tmp, path)
+        if state == known:
+            series.files[key] = (os.stat(path).st_ino, len(merged))
+        else:
+            # Another process wrote rows our windows have not seen: make the next sync reload them
+            series.files.pop(key, None)
+            series.checked = float('-inf')
+        return new
+
+    # === Reading ===
+    def load(self, symbol, start=None, end=None):
+        """
+        A symbol's stored transactions with start <= timestamp < end (unix seconds)
+
+        Returns:
+            np.ndarray: RECORD rows sorted by timestamp
+        """
+        symbol = symbol.upper()
+        folder = os.path.join(self.root, symbol)
+        if not os.path.isdir(folder):
+            return np.empty(0, dtype=RECORD)
+        keys = sorted(name[:-4] for name in os.listdir(folder) if name.endswith('.bin'))
+        if start is not None:
+            keys = [k for k in keys if k >= _month_key(start)]
+        if end is not None:
+            keys = [k for k in keys if k <= _month_key(end)]
+        parts = [self._read(symbol, key) for key in keys]
+        records = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+        lo = 0 if start is None else np.searchsorted(records['timestamp'], start, side='left')
+        hi = len(records) if end is None else np.searchsorted(records['timestamp'], end, side='left')
+        return records[lo:hi]
+
+    def flows(self, symbol, now=None):
+        """
+        Exchange inflow/outflow of a symbol over every window
+
+        Returns:
+            dict: {window name: {'inflow', 'outflow', 'net', 'count'}} in USD
+        """
+        now = now or time.time()
+        with self._lock:
+            series = self._sync(symbol.upper(), self._get_series(symbol.upper()), now)
+            result = {}
+            for name, window in series.windows.items():
+                window.expire(now)
+                result[name] = window.snapshot()
+            return result
+
+    def net_flow(self, symbol, window='1h', now=None):
+        """Exchange inflow minus outflow (USD) over one window; positive means coins moving to exchanges"""
+        return self.flows(symbol, now)[window]['net']
+
+    # === Backfill ===
+    def covered_ranges(self):
+        try:
+            with open(self._coverage_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def missing_ranges(self, start, end):
+        """Parts of [start, end) that no backfill has stored yet"""
+        missing, cursor = [], start
+        for lo, hi in _merge_ranges(self.covered_ranges()):
+            if hi <= cursor or lo >= end:
+                continue
+            if lo > cursor:
+                missing.append((cursor, lo))
+            cursor = max(cursor, hi)
+        if cursor < end:
+            missing.append((cursor, end))
+        return missing
+
+    def mark_covered(self, start, end):
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, _file_lock(self._coverage_path() + '.lock'):
+            ranges = _merge_ranges(self.covered_ranges() + [[start, end]])
+            tmp = self._coverage_path() + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(ranges, f)
+            os.replace(tmp, self._coverage_path())
+
+
+async def backfill(store, poller, start, end, chunk=DAY, pause=1.0):
+    """
+    Crawl [start, end) into the store a chunk at a time, skipping what is already covered
+
+    Args:
+        store (WhaleStore): Where the transactions go
+        poller (WhaleAlertPoller): API client (its symbols decide what is kept)
+        start, end (int): Unix seconds
+        chunk (int): Seconds per crawled range (a day, as whaleTest.py did)
+        pause (float): Seconds between ranges, to go easy on the API
+
+    Returns:
+        dict: Ranges crawled and transactions added, and whether the crawl finished
+    """
+    report = {'ranges': 0, 'added': 0, 'complete': True}
+    for gap_start, gap_end in store.missing_ranges(start, end):
+        for lo in range(gap_start, gap_end, chunk):
+            hi = min(lo + chunk, gap_end)
+            transactions = await poller.history(lo, hi)
+            if transactions is None:
+                logger.warning(f"🐋 Backfill stopped at {datetime.fromtimestamp(lo)}; run it again to resume")
+                report['complete'] = False
+                return report
+            report['added'] += await asyncio.to_thread(store.add, transactions)
+            store.mark_covered(lo, hi)
+            report['ranges'] += 1
+            if pause:
+                await asyncio.sleep(pause)
+    return report
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_whale_store():
+    """Process-wide whale store (a symbol's flows are loaded on its first lookup)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WhaleStore()
+        return _store
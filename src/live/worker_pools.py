@@ -0,0 +1,236 @@
+# worker_pools.py
+"""
+Blocking work for the Telegram bot's event loop.
+
+Every handler runs on the bot's single asyncio loop, so any blocking call
+inside one (a CSV read, the Whale Alert request, a Reddit fetch with VADER
+scoring) froze every other command and the daily summary timer until it
+returned. Handlers now hand that work to WorkerPools.run():
+
+- Work runs in one of two bounded pools. 'io' is a thread pool for calls
+  that mostly wait (files, HTTP). 'cpu' is a spawned process pool for
+  Python-heavy work that would otherwise hold the GIL. Its worker keeps
+  its module state between calls, so caches such as reddit_sentiment's
+  survive from one request to the next.
+- Each command has a concurrency limit and a timeout (COMMAND_LIMITS). The
+  time spent waiting for a free slot counts toward the timeout. When it
+  runs out, CommandTimeout is raised so the handler can answer right away.
+  A thread cannot be interrupted, so the slot is only freed once the call
+  has really returned; a stuck command cannot pile up more workers.
+- If the 'cpu' worker dies (e.g. OOM), the broken pool is replaced, both
+  when a submit finds it broken and when a running call fails with it.
+
+LoopLagMonitor watches the loop itself. A coroutine wakes every `interval`
+and notes the time. A watchdog thread checks that note, and when the loop
+has not woken for longer than `threshold` it logs the loop thread's stack,
+showing which call is blocking while the stall is still going on. When
+the loop wakes up again, the length of the whole stall is logged.
+"""
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+import functools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+# command -> (pool, max concurrent calls, timeout in seconds)
+COMMAND_LIMITS = {
+    'metrics': ('io', 4, 10),
+    'logs': ('io', 4, 10),
+    'summary': ('io', 1, 30),
+    'sentiment': ('cpu', 1, 120),
+}
+DEFAULT_LIMIT = ('io', 4, 30)
+
+
+class CommandTimeout(Exception):
+    """A command's blocking work did not finish within its timeout"""
+
+
+class WorkerPools:
+    def __init__(self, io_workers=4, cpu_workers=1, limits=None):
+        """
+        Args:
+            io_workers (int): Threads for file and network calls
+            cpu_workers (int): Processes for CPU-bound calls (started on first use)
+            limits (dict): Overrides for COMMAND_LIMITS
+        """
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.limits = dict(COMMAND_LIMITS, **(limits or {}))
+        self.timeouts = 0
+        self._io = None
+        self._cpu = None
+        self._semaphores = {}  # command -> asyncio.Semaphore
+        self._running = {}     # command -> calls holding a slot
+        self._lock = threading.Lock()
+
+    def _executor(self, pool):
+        with self._lock:
+            if pool == 'cpu':
+                if self._cpu is None:
+                    self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                                    mp_context=multiprocessing.get_context('spawn'))
+                return self._cpu
+            if self._io is None:
+                self._io = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='telegram-io')
+            return self._io
+
+    def _reset_cpu(self, broken):
+        """Drop the broken process pool (unless another call already replaced it)"""
+        with self._lock:
+            if self._cpu is not None and self._cpu is broken:
+                self._cpu.shutdown(wait=False)
+                self._cpu = None
+
+    async def run(self, command, fn, *args, **kwargs):
+        """
+        fn(*args, **kwargs) in the command's pool, within its concurrency limit and timeout
+
+        For the 'cpu' pool fn and its arguments must be picklable (a module-level
+        function, or functools.partial of one).
+
+        Returns:
+            The call's result
+
+        Raises:
+            CommandTimeout: When the wait for a slot plus the call took longer than the command's timeout
+        """
+        pool, limit, timeout = self.limits.get(command, DEFAULT_LIMIT)
+        semaphore = self._semaphores.get(command)
+        if semaphore is None:
+            semaphore = self._semaphores[command] = asyncio.Semaphore(limit)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise CommandTimeout(f"{command} is busy, try again shortly") from None
+        self._running[command] = self._running.get(command, 0) + 1
+
+        def release(_=None):
+            self._running[command] -= 1
+            semaphore.release()
+
+        call = functools.partial(fn, *args, **kwargs)
+        executor = self._executor(pool)
+        try:
+            future = loop.run_in_executor(executor, call)
+        except BrokenProcessPool:
+            # The worker died (e.g. OOM); start a fresh one
+            self._reset_cpu(executor)
+            try:
+                executor = self._executor(pool)
+                future = loop.run_in_executor(executor, call)
+            except BaseException:
+                release()
+                raise
+        except BaseException:
+            release()
+            raise
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise CommandTimeout(f"{command} took longer than {timeout:g}s") from None
+        except BrokenProcessPool:
+            # The worker died while running this call; the next call gets a fresh one
+            self._reset_cpu(executor)
+            raise
+        finally:
+            # Keep the slot until the call has really returned
+            if future.done():
+                release()
+            else:
+                future.add_done_callback(release)
+
+    def stats(self):
+        return {"timeouts": self.timeouts,
+                "running": {command: n for command, n in self._running.items() if n}}
+
+    def shutdown(self):
+        with self._lock:
+            for executor in (self._io, self._cpu):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._io = self._cpu = None
+
+
+class LoopLagMonitor:
+    def __init__(self, threshold=0.25, interval=0.1):
+        """
+        Args:
+            threshold (float): Seconds the loop may go without waking before it counts as a stall
+            interval (float): Seconds between heartbeats (and watchdog checks)
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._beat = None
+        self._reported = None   # heartbeat whose stall already had its stack logged
+        self._loop_thread = None
+        self._task = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start watching the running loop (call from inside it)"""
+        if self._task is None:
+            self._loop_thread = threading.get_ident()
+            self._beat = time.monotonic()
+            self._task = asyncio.ensure_future(self._heartbeat())
+            threading.Thread(target=self._watchdog, name='loop-watchdog', daemon=True).start()
+        return self._task
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - self._beat - self.interval
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.stalls += 1
+                logger.warning(f"🐢 Event loop stalled for {lag * 1000:.0f} ms")
+
+    def _watchdog(self):
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            if beat is None or beat == self._reported:
+                continue
+            stalled = time.monotonic() - beat - self.interval
+            if stalled > self.threshold:
+                self._reported = beat
+                frame = sys._current_frames().get(self._loop_thread)
+                stack = ''.join(traceback.format_stack(frame)) if frame is not None else '(no frame)\n'
+                logger.warning(f"🐢 Event loop blocked for {stalled * 1000:.0f} ms so far, in:\n{stack}")
+
+    def stats(self):
+        return {"stalls": self.stalls, "max_lag_ms": round(self.max_lag * 1000, 1)}
+
+
+_pools = None
+_pools_lock = threading.Lock()
+
+
+def get_worker_pools():
+    """Process-wide worker pools (threads and processes start on first use)"""
+    global _pools
+    with _pools_lock:
+        if _pools is None:
+            _pools = WorkerPools()
+        return _pools
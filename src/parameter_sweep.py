@@ -0,0 +1,228 @@
+# parameter_sweep.py
+"""
+Grid and random parameter sweeps over the array-native strategies.
+
+A sweep runs one strategy from strategiesArray.py over one kline frame for
+many parameter combinations and returns a table ranked by a metric from
+backtest_core.compute_metrics (the same numbers Backtester reports).
+
+Each worker process receives the frame once and keeps an IndicatorCache for
+it, so an indicator (e.g. a 20-period VWMA) is computed once per distinct
+setting rather than once per combination. Grid combinations are handed out in
+contiguous chunks of itertools.product order, so list the parameters that
+drive indicators first and most combinations in a chunk share their inputs.
+
+Jobs are read from the `sweep` section of config.yaml:
+
+    sweep:
+      workers: 8
+      rank_by: total_profit     # drawdown ranks lowest first (combos that never trade last);
+                                # rank_ascending overrides
+      jobs:
+        - strategy: link_vwma_strategy
+          coin: LINK
+          timeframe: 1h
+          start_date: "2025-03-08"
+          end_date: "2025-04-08"
+          grid:
+            short_period: [10, 15, 20]
+            long_period: [40, 50, 60]
+            stop_loss: [0.03, 0.05, 0.08]
+        - strategy: doge_breakout_strategy
+          ...
+          random:
+            samples: 500
+            seed: 42
+            params:
+              lookback: {min: 3, max: 20}
+              take_profit_pct: {min: 0.02, max: 0.10}
+              max_hold_periods: [12, 24, 48]
+"""
+import os
+import math
+import random
+import inspect
+import itertools
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+import pandas as pd
+
+import strategiesArray
+from strategiesArray import IndicatorCache
+from backtest_core import simulate_trades, compute_metrics, BUY, SELL
+
+# Metrics where lower is better; every other metric ranks highest first.
+# A combination that never trades scores a perfect 0 on these, so it ranks last instead.
+RANK_ASCENDING = {'drawdown': True}
+
+
+# === Parameter combinations ===
+def expand_grid(grid):
+    """Every combination of a {param: [values]} grid, in itertools.product order"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _sample_value(spec, rng):
+    if isinstance(spec, list):
+        return rng.choice(spec)
+    low, high = spec['min'], spec['max']
+    if 'step' in spec:
+        steps = int(round((high - low) / spec['step']))
+        return low + spec['step'] * rng.randint(0, steps)
+    if isinstance(low, int) and isinstance(high, int):
+        return rng.randint(low, high)
+    return rng.uniform(low, high)
+
+
+def sample_random(params, samples, seed=None):
+    """
+    Up to `samples` distinct random combinations.
+
+    Each param is either a list of values to choose from or a {min, max}
+    range (integers if both ends are ints, else uniform floats, or evenly
+    spaced when a `step` is given).
+    """
+    rng = random.Random(seed)
+    seen = set()
+    combos = []
+    # Small discrete spaces can hold fewer distinct combinations than requested
+    for _ in range(samples * 20):
+        combo = {name: _sample_value(spec, rng) for name, spec in params.items()}
+        key = tuple(combo.values())
+        if key not in seen:
+            seen.add(key)
+            combos.append(combo)
+            if len(combos) == samples:
+                break
+    # Keep cache-friendly ordering: combos sharing leading params end up together
+    return sorted(combos, key=lambda c: tuple(c.values()))
+
+
+def combinations_for(job):
+    """Parameter combinations for a sweep job with either a `grid` or a `random` spec"""
+    if 'grid' in job:
+        return expand_grid(job['grid'])
+    if 'random' in job:
+        spec = job['random']
+        return sample_random(spec['params'], spec['samples'], spec.get('seed'))
+    raise ValueError(f"Sweep job for {job.get('strategy')} needs a 'grid' or 'random' section")
+
+
+# === Evaluation ===
+_worker = {}
+
+
+def _init_worker(data, strategy_name, initial_capital):
+    fn = getattr(strategiesArray, strategy_name)
+    _worker['data'] = data
+    _worker['close'] = data['close'].to_numpy(dtype=float)
+    _worker['cache'] = IndicatorCache(data)
+    _worker['fn'] = fn
+    _worker['takes_cache'] = 'cache' in inspect.signature(fn).parameters
+    _worker['initial_capital'] = initial_capital
+
+
+def _evaluate_chunk(chunk):
+    rows = []
+    for params in chunk:
+        row = dict(params)
+        try:
+            kwargs = dict(params, cache=_worker['cache']) if _worker['takes_cache'] else params
+            actions = _worker['fn'](_worker['data'], **kwargs)
+            sim = simulate_trades(actions == BUY, actions == SELL,
+                                  initial_capital=_worker['initial_capital'], close=_worker['close'])
+            row.update(compute_metrics(sim))
+            row['error'] = None
+        except Exception as e:
+            row['error'] = f"{type(e).__name__}: {e}"
+            row['traceback'] = traceback.format_exc()
+        rows.append(row)
+    return rows
+
+
+def run_sweep(data, strategy_name, combos, workers=None, initial_capital=10000,
+              rank_by='total_profit', chunk_size=None, rank_ascending=None):
+    """
+    Evaluate a strategy for every parameter combination.
+
+    Args:
+        data (pd.DataFrame): OHLCV frame the strategy runs on
+        strategy_name (str): Function name in strategiesArray.py
+        combos (list): Parameter dicts, e.g. from expand_grid or sample_random
+        workers (int): Process count (defaults to the number of CPUs; 1 runs in-process)
+        initial_capital (float): Starting capital for every run
+        rank_by (str): Metric column to sort by, best first
+        chunk_size (int): Combinations per task (defaults to ~4 tasks per worker)
+        rank_ascending (bool): Sort rank_by lowest first (defaults to RANK_ASCENDING for the metric)
+
+    Returns:
+        pd.DataFrame: One row per combination (params + metrics + error), ranked
+    """
+    if not combos:
+        return pd.DataFrame()
+
+    workers = workers or os.cpu_count()
+    chunk_size = chunk_size or max(1, math.ceil(len(combos) / (workers * 4)))
+    chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+
+    if workers == 1:
+        _init_worker(data, strategy_name, initial_capital)
+        rows = [row for chunk in chunks for row in _evaluate_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data, strategy_name, initial_capital)) as pool:
+            rows = [row for result in pool.map(_evaluate_chunk, chunks) for row in result]
+
+    results = pd.DataFrame(rows)
+    if rank_by in results.columns:
+        if rank_ascending is None:
+            rank_ascending = RANK_ASCENDING.get(rank_by, False)
+        if rank_ascending and 'total_trades' in results.columns:
+            # Ranks: traded, then never traded, then failed (NaN)
+            untraded = results['total_trades'].eq(0) | results[rank_by].isna()
+            order = results.assign(_untraded=untraded).sort_values(
+                ['_untraded', rank_by], ascending=[True, True], na_position='last', kind='stable').index
+            results = results.loc[order]
+        else:
+            results = results.sort_values(rank_by, ascending=rank_ascending, na_position='last', kind='stable')
+    return results.reset_index(drop=True)
+
+
+def main():
+    from kline_store import KlineStore
+    from binance.client import Client
+
+    config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml'))
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    sweep = config['sweep']
+    store = KlineStore(client_factory=lambda: Client(config['binance']['test_api_key'], config['binance']['test_secret_key']))
+    log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+
+    for job in sweep['jobs']:
+        data = store.load(job['coin'] + 'USDT', job['timeframe'], job['start_date'], job['end_date'])
+        combos = combinations_for(job)
+        rank_by = job.get('rank_by', sweep.get('rank_by', 'total_profit'))
+        rank_ascending = job.get('rank_ascending', sweep.get('rank_ascending'))
+        print(f"🔍 {job['strategy']} on {job['coin']} {job['timeframe']}: {len(combos)} combinations")
+
+        results = run_sweep(data, job['strategy'], combos, workers=sweep.get('workers'), rank_by=rank_by,
+                            rank_ascending=rank_ascending)
+
+        results_file = os.path.join(log_dir, f"sweep_{job['coin']}_{job['strategy']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+        results.drop(columns=['traceback'], errors='ignore').to_csv(results_file, index=False)
+        failed = results['error'].notna().sum()
+        if failed:
+            print(f"⚠️  {failed} combinations raised; see the error column")
+        print(results.drop(columns=['error', 'traceback'], errors='ignore').head(10).to_string(index=False))
+        print(f"📊 Results saved to {results_file}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 # Standard library imports
 import os
+import sys
 import logging
 from datetime import datetime
 from typing import Tuple, List, Optional
@@ -12,6 +13,8 @@ import yaml
 from binance.client import Client
 
 # Local imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from kline_store import KlineStore
 from strategies import moving_average, rsi, macd, bollinger_bands, hybrid_strategy, advanced_hybrid_strategy, rsi_macd_pullback
 
 # Load configuration from config.yaml
@@ -41,8 +44,8 @@ summary_handler.setLevel(logging.INFO)
 summary_handler.setFormatter(logging.Formatter('%(asctime)s | %(levelname)s | %(message)s'))
 logging.getLogger('').addHandler(summary_handler)
 
-# Initialize Binance API client with test credentials
-client = Client(config['binance']['test_api_key'], config['binance']['test_secret_key'])
+# Klines are served from the local store; the Binance client (test credentials) is only created when a range is missing
+store = KlineStore(client_factory=lambda: Client(config['binance']['test_api_key'], config['binance']['test_secret_key']))
 
 def choose_strategy() -> str:
     """
@@ -123,35 +126,19 @@ class Backtest:
 
     def fetch_historical_data(self, start_date: str, end_date: str, limit: int = 1000) -> pd.DataFrame:
         """
-        Fetch historical price data from Binance within a date range.
+        Fetch historical price data within a date range from the local kline store,
+        downloading any missing candles from Binance.
         """
         try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').strftime('%d %b, %Y')
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').strftime('%d %b, %Y')
             logging.info("=== FETCHING HISTORICAL DATA ===")
             logging.info(f"Requesting data from {start_date} to {end_date}")
 
-            klines = client.get_historical_klines(
-                self.symbol, 
-                config['trading']['interval'],
-                start_date,
-                end_date
-            )
-            
-            if not klines:
+            data = store.load(self.symbol, config['trading']['interval'], start_date, end_date)
+
+            if data.empty:
                 logging.error("❌ No data received from Binance API")
                 return pd.DataFrame()
 
-            data = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-            data[numeric_columns] = data[numeric_columns].apply(pd.to_numeric)
-            data['timestamp'] = pd.to_datetime(data['timestamp'], unit='ms')
-            
             logging.info(f"✓ Successfully fetched {len(data):,} data points")
             return data
 
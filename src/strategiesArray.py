@@ -0,0 +1,631 @@
+# strategiesArray.py
+"""
+Array-native versions of the backtest strategies in strategiesIndividual.py.
+
+Every strategy takes an OHLCV DataFrame and returns an int8 action array with
+one entry per candle: BUY (1) enters at that candle's close, SELL (-1) exits
+at it, 0 does nothing. Entry/exit rules are evaluated as whole-column masks;
+the "only buy when flat, only sell when long" gating that the list-based
+versions tracked with an in_position flag is resolved by
+backtest_core.positions, and the few rules that depend on the entry price
+(take profit, stop loss, trailing stop) only walk forward from each entry.
+
+to_buy_sell() turns an action array back into the legacy (buy, sell) lists of
+price-or-None, and legacy_strategy() wraps a strategy so it returns that form.
+"""
+import numpy as np
+
+from backtest_core import BUY, SELL, positions
+
+
+# === Protocol helpers ===
+def to_buy_sell(actions, close):
+    """Action array -> legacy (buy, sell) lists with the close price on signal bars"""
+    close = np.asarray(close, dtype=float)
+    buy = np.where(actions == BUY, close, np.nan)
+    sell = np.where(actions == SELL, close, np.nan)
+    return ([None if np.isnan(p) else float(p) for p in buy],
+            [None if np.isnan(p) else float(p) for p in sell])
+
+
+def legacy_strategy(signal_fn):
+    """Wrap an array-native strategy so it returns (buy, sell) lists like the old loops"""
+    def strategy(data, *args, **kwargs):
+        return to_buy_sell(signal_fn(data, *args, **kwargs), data['close'])
+    strategy.__name__ = signal_fn.__name__
+    strategy.__doc__ = signal_fn.__doc__
+    return strategy
+
+
+def _gated(entry, exit_):
+    """Actions for flat-only entries and long-only exits (entry wins when flat, exit when long)"""
+    pos = positions(entry, exit_)
+    prev = np.concatenate(([0], pos[:-1]))
+    actions = np.zeros(len(pos), dtype=np.int8)
+    actions[(pos == 1) & (prev == 0)] = BUY
+    actions[(pos == 0) & (prev == 1)] = SELL
+    return actions
+
+
+def _after_warmup(mask, bars):
+    mask[:bars] = False
+    return mask
+
+
+def _first_exit(entry_bar, n, test):
+    """
+    First bar after entry_bar where test(entry_bar, lo, hi) is True.
+
+    test returns the exit mask for bars lo..hi-1; the window doubles each
+    step so a trade costs time proportional to how long it is held.
+    """
+    lo = entry_bar + 1
+    width = 64
+    while lo < n:
+        hi = min(n, lo + width)
+        hits = np.flatnonzero(test(entry_bar, lo, hi))
+        if len(hits):
+            return lo + hits[0]
+        lo = hi
+        width *= 2
+    return -1
+
+
+def _walk_trades(entry, test):
+    """Actions for strategies whose exit depends on the entry: jump entry -> exit -> next entry"""
+    n = len(entry)
+    actions = np.zeros(n, dtype=np.int8)
+    entries = np.flatnonzero(entry)
+    k = 0
+    while k < len(entries):
+        i = entries[k]
+        actions[i] = BUY
+        j = _first_exit(i, n, test)
+        if j < 0:
+            break
+        actions[j] = SELL
+        k = np.searchsorted(entries, j, side='right')
+    return actions
+
+
+def _cols(data, *names):
+    return [data[name].to_numpy(dtype=float) for name in names]
+
+
+class IndicatorCache:
+    """
+    Memoises indicator arrays for one kline frame.
+
+    get(fn, *args) computes fn(data, *args) the first time and returns the
+    stored array afterwards, so a parameter sweep only pays for each distinct
+    indicator setting once however many combinations use it.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._values = {}
+
+    def get(self, fn, *args):
+        key = (fn.__name__,) + args
+        if key not in self._values:
+            self._values[key] = fn(self.data, *args)
+        return self._values[key]
+
+
+def _trailing_sum(values, window):
+    """Sum of values[k:k + window] for every k, via a cumulative sum"""
+    csum = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+    return csum[window:] - csum[:-window]
+
+
+def _trailing_mean(values, window):
+    """Mean of each length-`window` slice ending at every index, summed like Series.mean() (NaN during warm-up)"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window).sum(axis=1) / window
+    return out
+
+
+def vwma(data, period):
+    """Volume-weighted moving average (NaN during warm-up); BeforeTariffs.calculate_vwma wraps it"""
+    close, volume = _cols(data, 'close', 'volume')
+    out = np.full(len(close), np.nan)
+    if len(close) >= period:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[period - 1:] = _trailing_sum(close * volume, period) / _trailing_sum(volume, period)
+    return out
+
+
+def simple_rsi(data, period):
+    """Simple-average RSI (NaN during warm-up); BeforeTariffs.calculate_rsi wraps it"""
+    close, = _cols(data, 'close')
+    out = np.full(len(close), np.nan)
+    if len(close) > period:
+        changes = np.diff(close)
+        gains = _trailing_sum(np.where(changes > 0, changes, 0.0), period) / period
+        losses = _trailing_sum(np.where(changes < 0, -changes, 0.0), period) / period
+        has_loss = _trailing_sum(changes < 0, period) > 0
+        has_gain = _trailing_sum(changes > 0, period) > 0
+        gains = np.where(has_gain, gains, 0.0)
+        rs = gains / np.where(has_loss, losses, 1.0)
+        out[period:] = np.where(has_loss, 100 - (100 / (1 + rs)), 100.0)
+    return out
+
+
+def pandas_rsi(data, period):
+    """RSI from pandas rolling means of gains and losses, as in the hand-tuned strategies"""
+    delta = data['close'].diff()
+    gain = delta.where(delta > 0, 0.0).rolling(window=period).mean()
+    loss = -delta.where(delta < 0, 0.0).rolling(window=period).mean()
+    return (100 - (100 / (1 + gain / loss))).to_numpy()
+
+
+def average_volume_before(data, lookback):
+    """Mean volume of the `lookback` candles before each index (BeforeTariffs.calculate_average_volumes)"""
+    volume, = _cols(data, 'volume')
+    csum = np.concatenate(([0.0], np.cumsum(volume)))
+    index = np.arange(len(volume))
+    start = np.maximum(0, index - lookback)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (csum[index] - csum[start]) / (index - start)
+
+
+def rolling_mean(data, column, window):
+    return data[column].rolling(window=window).mean().to_numpy()
+
+
+def prior_high(data, lookback):
+    """Highest high of the `lookback` candles before each index"""
+    return data['high'].rolling(window=lookback).max().shift(1).to_numpy()
+
+
+def prior_mean_volume(data, lookback):
+    """Mean volume of the `lookback` candles before each index, summed like Series.mean()"""
+    volume, = _cols(data, 'volume')
+    return np.concatenate(([np.nan], _trailing_mean(volume, lookback)[:-1]))
+
+
+def _close_open_position(actions):
+    """Sell on the last candle if a position is still open, as the loop strategies do"""
+    traded = np.flatnonzero(actions)
+    if len(traded) and actions[traded[-1]] == BUY and traded[-1] != len(actions) - 1:
+        actions[-1] = SELL
+    return actions
+
+
+# === ARB Strategies ===
+def arb_breakout_strategy(data):
+    """
+    Classic breakout strategy: Price breaking above recent resistance + volume spike.
+    """
+    close, volume = _cols(data, 'close', 'volume')
+    resistance = data['high'].rolling(window=20).max().shift(1).to_numpy()
+    volume_ma = data['volume'].rolling(window=20).mean().to_numpy()
+
+    entry = _after_warmup((close > resistance) & (volume > volume_ma), 20)
+    exit_ = _after_warmup(close < resistance, 20)
+    return _gated(entry, exit_)
+
+
+def arb_bull_trend_refined(df, trailing_sl_pct=0.03):
+    """EMA 12/26 trend entry on above-average volume, exit on trailing stop or EMA cross down."""
+    close, volume = _cols(df, 'close', 'volume')
+    ema_fast = df['close'].ewm(span=12, adjust=False).mean().to_numpy()
+    ema_slow = df['close'].ewm(span=26, adjust=False).mean().to_numpy()
+    volume_avg = df['volume'].rolling(window=20).mean().to_numpy()
+
+    entry = _after_warmup((ema_fast > ema_slow) & (volume > volume_avg), 1)
+    trend_lost = ema_fast < ema_slow
+    keep = 1 - trailing_sl_pct
+
+    def test(i, lo, hi):
+        # Trailing stop at bar j is the highest close since entry (inclusive) times keep
+        trailing_stop = np.maximum.accumulate(close[i:hi])[lo - i:] * keep
+        return (close[lo:hi] < trailing_stop) | trend_lost[lo:hi]
+
+    return _walk_trades(entry, test)
+
+
+def calculate_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+
+    avg_gain = gain.rolling(window=period, min_periods=period).mean()
+    avg_loss = loss.rolling(window=period, min_periods=period).mean()
+
+    rs = avg_gain / avg_loss
+    rs = rs.replace([np.inf, -np.inf], np.nan).fillna(0)  # prevent inf/nan errors
+    rsi = 100 - (100 / (1 + rs))
+
+    return rsi
+
+
+def arb_oversold_bounce(df):
+    """Buy an up-close while RSI is oversold (< 30), sell once RSI recovers above 50."""
+    close = df['close']
+    rsi = calculate_rsi(close, period=14).to_numpy()
+    entry = (rsi < 30) & (close > close.shift(1)).to_numpy()
+    exit_ = rsi > 50
+    # A bar with RSI > 50 is only ever an exit bar
+    return _gated(entry & ~exit_, exit_)
+
+
+# === ETH Strategies ===
+def eth_bull_trend(data):
+    """Updated hybrid: RSI + MA crossover + volume filter."""
+    close, volume = _cols(data, 'close', 'volume')
+    # Mean of the 13 pct changes inside each 14-candle window, summed the way
+    # Series.mean() sums them so results match rolling(14).apply exactly
+    pct = data['close'].pct_change().to_numpy()
+    mean_change = np.full(len(close), np.nan)
+    if len(close) >= 14:
+        windows = np.lib.stride_tricks.sliding_window_view(pct[1:], 13)
+        mean_change[13:] = windows.sum(axis=1) / 13
+    rsi = 100 - (100 / (1 + mean_change))
+    ma50 = data['close'].rolling(50).mean().to_numpy()
+    ma200 = data['close'].rolling(200).mean().to_numpy()
+    vol_ma = data['volume'].rolling(20).mean().to_numpy()
+
+    entry = (ma50 > ma200) & (rsi < 50) & (close > ma50) & (volume > vol_ma)
+    exit_ = (rsi > 65) | (close < ma50)
+    return _gated(entry, exit_)
+
+
+def eth_choppy_durability(data):
+    """
+    Scalping breakout strategy for choppy ETH range.
+    Detects small ranges, enters on tiny breakout.
+    """
+    close, = _cols(data, 'close')
+    price_range = (data['high'].rolling(10).max() - data['low'].rolling(10).min())
+    range_avg = price_range.rolling(20).mean().to_numpy()
+    volatility = data['close'].pct_change().rolling(5).std()
+    volatility_ma = volatility.rolling(10).mean().to_numpy()
+    prev_close = data['close'].shift(1).to_numpy()
+
+    tight_range = price_range.to_numpy() < range_avg * 0.85
+    low_vol = volatility.to_numpy() < volatility_ma
+    breakout = close > prev_close * 1.005
+    entry = _after_warmup(tight_range & low_vol & breakout, 20)
+
+    def test(i, lo, hi):
+        # Take profit at +1%, stop loss at -1.5%
+        price_now = close[lo:hi]
+        return (price_now >= close[i] * 1.01) | (price_now <= close[i] * 0.985)
+
+    return _walk_trades(entry, test)
+
+
+def eth_bull_momentum(data):
+    """Trend strategy using EMA crossover + momentum confirmation"""
+    ema12 = data['close'].ewm(span=12).mean().to_numpy()
+    ema26 = data['close'].ewm(span=26).mean().to_numpy()
+    momentum = data['close'].diff(4).to_numpy()
+
+    return _gated((ema12 > ema26) & (momentum > 0), momentum < 0)
+
+
+# === LINK Strategies ===
+def link_reversion_strategy(data):
+    """
+    Mean reversion strategy using Bollinger Bands and RSI to capture cycles.
+    Signals are not gated by position: every qualifying candle fires.
+    """
+    close, = _cols(data, 'close')
+    bb_middle = data['close'].rolling(window=20).mean()
+    bb_std = data['close'].rolling(window=20).std()
+    bb_upper = (bb_middle + (2 * bb_std)).to_numpy()
+    bb_lower = (bb_middle - (2 * bb_std)).to_numpy()
+
+    delta = data['close'].diff()
+    gain = delta.clip(lower=0).rolling(14).mean()
+    loss = -delta.clip(upper=0).rolling(14).mean()
+    rsi = (100 - (100 / (1 + gain / loss))).to_numpy()
+
+    entry = (close <= bb_lower) & (rsi < 35)
+    exit_ = (close >= bb_upper) & (rsi > 65)
+
+    actions = np.zeros(len(close), dtype=np.int8)
+    actions[exit_] = SELL
+    actions[entry] = BUY
+    return actions
+
+
+def link_macd_filter_strategy(data):
+    """Tweaked MACD strategy with relaxed histogram threshold and wider exits."""
+    close, = _cols(data, 'close')
+    ema12 = data['close'].ewm(span=12, adjust=False).mean()
+    ema26 = data['close'].ewm(span=26, adjust=False).mean()
+    macd = ema12 - ema26
+    signal = macd.ewm(span=9, adjust=False).mean()
+    macd_hist = (macd - signal).to_numpy()
+    prev_hist = np.concatenate(([np.nan], macd_hist[:-1]))
+
+    entry = _after_warmup((macd_hist > 0.01) & (prev_hist <= 0), 2)
+    exit_ = _after_warmup((macd_hist < -0.01) | (close < ema26.to_numpy()), 2)
+    return _gated(entry, exit_)
+
+
+def link_ema_volume_strategy(data):
+    """
+    Revised: Fast EMA cross + momentum confirmation + early exit.
+    """
+    close, = _cols(data, 'close')
+    ema_fast = data['close'].ewm(span=5).mean().to_numpy()
+    ema_slow = data['close'].ewm(span=13).mean().to_numpy()
+    momentum = data['close'].diff(3).to_numpy()
+
+    entry = (ema_fast > ema_slow) & (momentum > 0)
+
+    def test(i, lo, hi):
+        # +6% take profit, -3% stop loss, or close below the slow EMA
+        price = close[lo:hi]
+        gain_pct = (price - close[i]) / close[i]
+        return (gain_pct > 0.06) | (gain_pct < -0.03) | (price < ema_slow[lo:hi])
+
+    return _walk_trades(entry, test)
+
+
+# === MATIC Strategies ===
+def matic_breakout_strategy(data):
+    """
+    Classic breakout strategy: Price breaking above recent resistance + volume spike.
+    """
+    return arb_breakout_strategy(data)
+
+
+def matic_adx_trend_strategy(data):
+    """Improved trend-following strategy using EMA cross and price momentum."""
+    close, = _cols(data, 'close')
+    ema_fast = data['close'].ewm(span=10).mean().to_numpy()
+    ema_slow = data['close'].ewm(span=30).mean().to_numpy()
+    momentum = (data['close'] - data['close'].shift(3)).to_numpy()
+
+    entry = (ema_fast > ema_slow) & (momentum > 0)
+    exit_ = (momentum < 0) | (close < ema_fast)
+    return _gated(entry, exit_)
+
+
+def matic_consolidation_break_strategy(data):
+    """
+    Identifies consolidation (low volatility) then breakout via price + volume.
+    """
+    close, volume = _cols(data, 'close', 'volume')
+    price_range = data['high'].rolling(window=10).max() - data['low'].rolling(window=10).min()
+    range_avg = price_range.rolling(window=10).mean().to_numpy()
+    volume_ma = data['volume'].rolling(window=20).mean().to_numpy()
+    prev_close = data['close'].shift(1).to_numpy()
+
+    low_volatility = price_range.to_numpy() < range_avg
+    volume_spike = volume > 1.2 * volume_ma
+    price_break = close > prev_close * 1.02
+
+    entry = _after_warmup(low_volatility & volume_spike & price_break, 20)
+    exit_ = _after_warmup(close < prev_close, 20)
+    return _gated(entry, exit_)
+
+
+# === DOGE Strategies ===
+def doge_tweet_spike_strategy(data):
+    """Loosened spike trigger and RSI limit to allow more entries."""
+    volume, = _cols(data, 'volume')
+    price_change = data['close'].pct_change().to_numpy()
+    volume_ma = data['volume'].rolling(window=10).mean().to_numpy()
+
+    delta = data['close'].diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = -delta.where(delta < 0, 0).rolling(14).mean()
+    rsi = (100 - (100 / (1 + gain / loss))).to_numpy()
+
+    spike = price_change > 0.015  # Lowered to 1.5%
+    volume_surge = volume > 0.75 * volume_ma
+    not_overbought = rsi < 80  # Was 75
+
+    entry = _after_warmup(spike & volume_surge & not_overbought, 15)
+    exit_ = _after_warmup(rsi > 85, 15)
+    return _gated(entry, exit_)
+
+
+def doge_meme_momentum_strategy(data):
+    """
+    Meme-fueled rally phase strategy. Trend-following using price, MA, and hype spike pattern.
+    """
+    close, = _cols(data, 'close')
+    ma_20 = data['close'].rolling(window=20).mean().to_numpy()
+    ma_50 = data['close'].rolling(window=50).mean().to_numpy()
+    prev_close = data['close'].shift(1).to_numpy()
+
+    trend_up = ma_20 > ma_50
+    big_candle = close > prev_close * 1.03  # >3% jump
+
+    entry = _after_warmup(trend_up & big_candle, 50)
+    exit_ = _after_warmup(close < ma_20, 50)
+    return _gated(entry, exit_)
+
+
+def doge_sentiment_consolidation_strategy(data):
+    """Loosen volatility and volume filters to trigger more"""
+    close, volume = _cols(data, 'close', 'volume')
+    price_range = data['high'].rolling(window=10).max() - data['low'].rolling(window=10).min()
+    range_avg = price_range.rolling(window=10).mean().to_numpy()
+    vol_ma = data['volume'].rolling(window=10).mean().to_numpy()
+    prev_close = data['close'].shift(1).to_numpy()
+
+    volatility_low = price_range.to_numpy() < 1.2 * range_avg
+    price_break = close > prev_close * 1.015
+    volume_pop = volume > vol_ma * 1.2
+
+    entry = _after_warmup(volatility_low & price_break & volume_pop, 10)
+    exit_ = _after_warmup(close < prev_close, 10)
+    return _gated(entry, exit_)
+
+
+# === Parameterised strategies (array ports of the tunable BeforeTariffs.py ones) ===
+def doge_breakout_strategy(data, lookback=5, take_profit_pct=0.05, stop_loss_pct=0.03, max_hold_periods=48, cache=None):
+    """
+    DOGE breakout above the recent high on a volume spike; exits on take profit,
+    stop loss, a fall back below the breakout level or after max_hold_periods candles.
+    """
+    cache = cache or IndicatorCache(data)
+    close, volume = _cols(data, 'close', 'volume')
+    resistance = cache.get(prior_high, lookback)
+    avg_volume = cache.get(prior_mean_volume, lookback)
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+
+    entry = (close > resistance) & (prev_close <= resistance) & (volume > avg_volume * 1.5)
+    entry = _after_warmup(entry, lookback)
+
+    def test(i, lo, hi):
+        price = close[lo:hi]
+        return ((price >= close[i] * (1 + take_profit_pct)) |
+                (price <= close[i] * (1 - stop_loss_pct)) |
+                (price < resistance[i]) |
+                (np.arange(lo, hi) - i >= max_hold_periods))
+
+    return _close_open_position(_walk_trades(entry, test))
+
+
+def _walk_with_breakeven(entry, close, cross_exit, trigger, lock, stop_loss):
+    """
+    Trade walk for the VWMA/RSI strategies: exit on cross_exit or when the close
+    falls to entry * (1 - stop_loss). Once a candle closes at entry * trigger or
+    higher, stop_loss is re-set so the stop sits at entry * lock; like the loop
+    versions, the adjusted stop_loss carries over into later trades.
+    """
+    n = len(entry)
+    actions = np.zeros(n, dtype=np.int8)
+    entries = np.flatnonzero(entry)
+    state = {'stop_loss': stop_loss}
+
+    def stop_fraction(i, lo, hi):
+        # stop_loss in force at each bar lo..hi-1: set by the latest trigger candle before it
+        entry_price = close[i]
+        span = close[i + 1:hi]
+        hit = span >= entry_price * trigger
+        last_hit = np.where(hit, np.arange(len(span)), -1)
+        np.maximum.accumulate(last_hit, out=last_hit)
+        # Shift by one: an update on a candle applies from the next candle on
+        last_hit = np.concatenate(([-1], last_hit[:-1]))[lo - i - 1:]
+        adjusted = (entry_price * lock) / span[np.maximum(last_hit, 0)]
+        return np.where(last_hit >= 0, adjusted, state['stop_loss'])
+
+    def test(i, lo, hi):
+        stop = stop_fraction(i, lo, hi)
+        return cross_exit[lo:hi] | (close[lo:hi] <= close[i] * (1 - stop))
+
+    k = 0
+    while k < len(entries):
+        i = entries[k]
+        actions[i] = BUY
+        j = _first_exit(i, n, test)
+        if j < 0:
+            break
+        actions[j] = SELL
+        # The stop in force on the exit candle carries over into the next trade
+        state['stop_loss'] = stop_fraction(i, j, j + 1)[0]
+        k = np.searchsorted(entries, j, side='right')
+    return _close_open_position(actions)
+
+
+def link_vwma_strategy(data, short_period=20, long_period=50, stop_loss=0.05, cache=None):
+    """
+    LINK VWMA crossover with volume confirmation; exits on the opposite cross or
+    the stop loss, which moves to entry + 2% once price is 10% up.
+    """
+    cache = cache or IndicatorCache(data)
+    close, volume = _cols(data, 'close', 'volume')
+    short = cache.get(vwma, short_period)
+    long_ = cache.get(vwma, long_period)
+    avg_volume = cache.get(average_volume_before, 5)
+    prev_short = np.concatenate(([np.nan], short[:-1]))
+    prev_long = np.concatenate(([np.nan], long_[:-1]))
+
+    entry = _after_warmup((prev_short <= prev_long) & (short > long_) & (volume > avg_volume), long_period)
+    cross_down = (prev_short >= prev_long) & (short < long_)
+    return _walk_with_breakeven(entry, close, cross_down, 1.1, 1.02, stop_loss)
+
+
+def doge_rsi_strategy(data, rsi_period=14, buy_threshold=30, sell_threshold=70, stop_loss=0.05, cache=None):
+    """
+    DOGE RSI cross up out of oversold with volume confirmation; exits when RSI
+    crosses into overbought or on the stop loss, which moves to entry + 5% once
+    price is 15% up.
+    """
+    cache = cache or IndicatorCache(data)
+    close, volume = _cols(data, 'close', 'volume')
+    rsi = cache.get(simple_rsi, rsi_period)
+    avg_volume = cache.get(average_volume_before, 5)
+    prev_rsi = np.concatenate(([np.nan], rsi[:-1]))
+
+    entry = (prev_rsi <= buy_threshold) & (rsi > buy_threshold) & (volume > avg_volume)
+    entry = _after_warmup(entry, rsi_period + 1)
+    cross_up = (prev_rsi <= sell_threshold) & (rsi > sell_threshold)
+    return _walk_with_breakeven(entry, close, cross_up, 1.15, 1.05, stop_loss)
+
+
+def optimize_link_strategy(data, rsi_period=14, rsi_max=40, ma_period=20, volume_ma_period=10,
+                           volume_factor=0.8, take_profit=0.05, stop_loss=0.05, cache=None):
+    """LINK pullback in an uptrend (RSI low, close above MA, normal volume) with fixed take profit / stop loss."""
+    cache = cache or IndicatorCache(data)
+    close, volume = _cols(data, 'close', 'volume')
+    rsi = cache.get(pandas_rsi, rsi_period)
+    ma_trend = cache.get(rolling_mean, 'close', ma_period)
+    volume_ma = cache.get(rolling_mean, 'volume', volume_ma_period)
+
+    entry = _after_warmup((rsi < rsi_max) & (close > ma_trend) & (volume > volume_factor * volume_ma), ma_period)
+
+    def test(i, lo, hi):
+        price = close[lo:hi]
+        return (price >= close[i] * (1 + take_profit)) | (price <= close[i] * (1 - stop_loss))
+
+    return _walk_trades(entry, test)
+
+
+def optimize_doge_strategy(data, fast_period=6, slow_period=18, volume_ma_period=12, momentum_period=4,
+                           volume_factor=1.2, take_profit=0.03, stop_loss=0.03, cache=None):
+    """DOGE MA-cross momentum entry on a volume spike with fixed take profit / stop loss."""
+    cache = cache or IndicatorCache(data)
+    close, volume = _cols(data, 'close', 'volume')
+    ma_fast = cache.get(rolling_mean, 'close', fast_period)
+    ma_slow = cache.get(rolling_mean, 'close', slow_period)
+    vol_ma = cache.get(rolling_mean, 'volume', volume_ma_period)
+    momentum = (data['close'] - data['close'].shift(momentum_period)).to_numpy()
+
+    entry = (ma_fast > ma_slow) & (momentum > 0) & (volume > volume_factor * vol_ma)
+    entry = _after_warmup(entry, slow_period)
+
+    def test(i, lo, hi):
+        price = close[lo:hi]
+        return (price >= close[i] * (1 + take_profit)) | (price <= close[i] * (1 - stop_loss))
+
+    return _walk_trades(entry, test)
+
+
+SIGNAL_MAP = {
+    "ETH": {
+        "eth_hybrid_trend_sentiment": eth_bull_trend,
+        "eth_choppy_durability": eth_choppy_durability,
+        "eth_strong_bull_momentum": eth_bull_momentum
+    },
+    "LINK": {
+        "link_mean_reversion": link_reversion_strategy,
+        "link_macd_downtrend_filter": link_macd_filter_strategy,
+        "link_cycle_momentum": link_ema_volume_strategy
+    },
+    "MATIC": {
+        "matic_breakout_clean": matic_breakout_strategy,
+        "matic_bull_trend": matic_adx_trend_strategy,
+        "matic_consolidation_then_break": matic_consolidation_break_strategy
+    },
+    "ARB": {
+        "arb_breakout_clean": arb_breakout_strategy,
+        "arb_bull_trend": arb_bull_trend_refined,
+        "arb_oversold_bounce": arb_oversold_bounce
+    },
+    "DOGE": {
+        "doge_tweet_spike_strategy": doge_tweet_spike_strategy,
+        "doge_meme_momentum_strategy": doge_meme_momentum_strategy,
+        "doge_sentiment_consolidation_strategy": doge_sentiment_consolidation_strategy
+    }
+}
@@ -3,6 +3,10 @@ from datetime import datetime, timedelta
 import time
 import yaml
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'live'))
+from whale_store import get_whale_store
 
 # Load config.yaml from parent directory's config folder
 config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'config.yaml')
@@ -31,6 +35,9 @@ def get_whale_alerts():
         print(f"\nWhale Transactions @ {datetime.now()}:")
         for tx in data['transactions']:
             print(f"{tx['amount']} {tx['symbol']} | From: {tx['from']['owner_type']} → To: {tx['to']['owner_type']}")
+        # Keep them in the whale store (data/whales); the overlapping windows are deduplicated by id
+        added = get_whale_store().add(data['transactions'])
+        print(f"Stored {added} new transactions")
     else:
         print("No whale transactions in last minute.")
 